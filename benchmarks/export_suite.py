@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+エクスポートのベンチマークスイート
+
+合成プロジェクト（大問数 × 数式の数 × 画像の枚数）の組み合わせごとに、
+HTMLExporter と利用可能な各PDF出力エンジンで出力し、
+処理時間・最大メモリ使用量（RSS）・出力サイズをCSVに記録する。
+メモリ使用量を正しく測るため、1回の計測ごとに別プロセスで実行する。
+
+使用例:
+    python benchmarks/export_suite.py --problems 5 20 80 --formulas 0 10 \\
+        --images 0 4 --image-size 1600x1200 --output results.csv
+"""
+
+import argparse
+import csv
+import importlib.util
+import itertools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.synthetic import make_project
+
+ENGINES = ('html', 'weasyprint', 'xhtml2pdf', 'webengine')
+
+CSV_FIELDS = ['engine', 'problems', 'formulas', 'images', 'image_size', 'run',
+              'wall_time_s', 'peak_rss_mb', 'output_bytes', 'pages', 'error']
+
+
+def peak_rss_mb() -> Optional[float]:
+    """このプロセスの最大メモリ使用量（MB）"""
+    try:
+        import resource
+    except ImportError:
+        # Windows
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+    
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux はKB、macOS はバイト単位
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def count_pages(path: Path) -> Optional[int]:
+    """PDFのページ数（pypdfがない場合はNone）"""
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return None
+    return len(PdfReader(path).pages)
+
+
+def engine_available(engine: str) -> bool:
+    """エンジンが計測可能かチェック（子プロセスと同じ条件で判定）"""
+    if engine == 'html':
+        return True
+    if engine == 'webengine':
+        return importlib.util.find_spec("PySide6") is not None and \
+            importlib.util.find_spec("PySide6.QtWebEngineCore") is not None
+    return importlib.util.find_spec(engine) is not None
+
+
+def run_single(case: dict) -> dict:
+    """1件を出力して計測（子プロセスで実行）"""
+    engine = case['engine']
+    width, height = (int(v) for v in case['image_size'].split('x'))
+    project = make_project(case['problems'], case['formulas'], case['images'], (width, height))
+    
+    app = None
+    if engine == 'webengine':
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        from PySide6.QtWidgets import QApplication
+        app = QApplication(sys.argv[:1])
+    
+    from src.models import ExportOptions
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        if engine == 'html':
+            from src.exporters import HTMLExporter
+            exporter = HTMLExporter()
+            options = ExportOptions(generate_answer_sheet=True)
+            output_path = Path(temp_dir) / "exam.html"
+        else:
+            from src.exporters.pdf_exporter import PDFExporter
+            exporter = PDFExporter()
+            options = ExportOptions(format='pdf', generate_answer_sheet=True, pdf_engine=engine)
+            output_path = Path(temp_dir) / "exam.pdf"
+        
+        start = time.perf_counter()
+        exporter.export(project, output_path, options)
+        wall_time = time.perf_counter() - start
+        
+        result = {
+            'wall_time_s': round(wall_time, 4),
+            'peak_rss_mb': peak_rss_mb(),
+            'output_bytes': output_path.stat().st_size,
+            'pages': count_pages(output_path) if engine != 'html' else None,
+        }
+    
+    del app
+    return result
+
+
+def run_case(case: dict, timeout: float) -> dict:
+    """別プロセスで1件を計測"""
+    command = [sys.executable, __file__, "--single", json.dumps(case)]
+    try:
+        completed = subprocess.run(command, capture_output=True, text=True,
+                                   encoding="utf-8", timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {'error': f"timeout ({timeout:.0f}s)"}
+    
+    if completed.returncode != 0:
+        lines = completed.stderr.strip().splitlines()
+        return {'error': lines[-1] if lines else f"exit code {completed.returncode}"}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="エクスポートのベンチマークスイート")
+    parser.add_argument("--problems", type=int, nargs="+", default=[5, 20], help="大問数")
+    parser.add_argument("--formulas", type=int, nargs="+", default=[5],
+                        help="大問1つあたりの数式の数")
+    parser.add_argument("--images", type=int, nargs="+", default=[0], help="画像の枚数")
+    parser.add_argument("--image-size", default="1200x900", help="画像の大きさ（幅x高さ）")
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=list(ENGINES),
+                        help="計測するエンジン（利用できないものは除外）")
+    parser.add_argument("--repeat", type=int, default=1, help="組み合わせごとの計測回数")
+    parser.add_argument("--timeout", type=float, default=600, help="1件あたりの制限時間（秒）")
+    parser.add_argument("--output", type=Path, default=Path("benchmark_results.csv"),
+                        help="結果のCSVファイル")
+    parser.add_argument("--single", help=argparse.SUPPRESS)
+    return parser
+
+
+def run_suite(args: argparse.Namespace) -> List[dict]:
+    """全ての組み合わせを計測してCSVに書き出す"""
+    engines = [engine for engine in args.engines if engine_available(engine)]
+    skipped = sorted(set(args.engines) - set(engines))
+    if skipped:
+        print(f"利用できないため除外: {', '.join(skipped)}")
+    
+    rows = []
+    with open(args.output, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        
+        for problems, formulas, images, engine in itertools.product(
+                args.problems, args.formulas, args.images, engines):
+            for run in range(1, args.repeat + 1):
+                case = {'engine': engine, 'problems': problems, 'formulas': formulas,
+                        'images': images, 'image_size': args.image_size}
+                row = {**case, 'run': run, **run_case(case, args.timeout)}
+                writer.writerow(row)
+                f.flush()
+                rows.append(row)
+                
+                if row.get('error'):
+                    print(f"{engine:<10} {problems:4d}問 数式{formulas:3d} 画像{images:3d}  失敗: {row['error']}")
+                else:
+                    rss = f"{row['peak_rss_mb']:8.1f} MB" if row['peak_rss_mb'] is not None else "       - MB"
+                    print(f"{engine:<10} {problems:4d}問 数式{formulas:3d} 画像{images:3d}  "
+                          f"{row['wall_time_s']:8.2f} 秒  {rss}  {row['output_bytes'] / 1024:10.1f} KB")
+    
+    print(f"結果を保存しました: {args.output}")
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.single:
+        print(json.dumps(run_single(json.loads(args.single))))
+        return 0
+    run_suite(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
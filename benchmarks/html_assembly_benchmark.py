@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTML組み立てベンチマーク: 解答用紙・問題ページのHTMLの組み立て時間と大きさ
+
+大問数を増やしながら（大問1つあたりの空欄数は固定）、
+AnswerSheetGenerator.generate_answer_sheet_html と HTMLExporter._generate_problems の
+組み立て時間を計測する。問題本文のMarkdown変換は事前に1回済ませておき（断片キャッシュ）、
+組み立てだけを計測する。
+
+結果は benchmarks/baselines/html_assembly.json の基準値と比較する。HTMLの大きさ
+（バイト数）は出力が変わっていないことの確認として一致を求め、時間は基準値の
+--tolerance 倍を超えたら失敗とする。
+
+使用例:
+    python benchmarks/html_assembly_benchmark.py
+    python benchmarks/html_assembly_benchmark.py --problems 500 --blanks 40 --repeat 10
+    python benchmarks/html_assembly_benchmark.py --write-baseline
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.models import ExportOptions, Problem
+from src.utils import AnswerSheetGenerator
+from src.exporters.html_exporter import HTMLExporter
+
+BASELINE_PATH = Path(__file__).parent / "baselines" / "html_assembly.json"
+
+# 空欄の記号（ア〜ン。小書きのカナも含めて82個）
+BLANK_LABELS = [chr(code) for code in range(ord("ア"), ord("ン") + 1)]
+
+
+def make_problems(problems: int, blanks: int) -> list:
+    """空欄を指定数ずつ含む大問のリストを生成"""
+    labels = " ".join(f"[{label}]" for label in BLANK_LABELS[:blanks])
+    return [Problem(content=f"次の空欄に当てはまる数を答えよ。（第{i + 1}問）\n\n{labels}", score="10")
+            for i in range(problems)]
+
+
+def measure(build, repeat: int) -> tuple:
+    """組み立てを繰り返し、(時間の中央値[ms], HTMLのバイト数) を返す"""
+    times = []
+    html = ""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        html = build()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), len(html.encode("utf-8"))
+
+
+def run(problem_counts, blanks: int, repeat: int) -> dict:
+    """大問数ごとに計測し、{"<大問数>x<空欄数>": {...}} を返す"""
+    results = {}
+    options = ExportOptions()
+    for count in problem_counts:
+        problems = make_problems(count, blanks)
+        generator = AnswerSheetGenerator()
+        exporter = HTMLExporter()
+        # 空欄の索引と本文のHTML断片を作っておく
+        generator.generate_answer_sheet_html(problems, options)
+        exporter._generate_problems(problems, options)
+        
+        sheet_ms, sheet_bytes = measure(
+            lambda: generator.generate_answer_sheet_html(problems, options), repeat)
+        pages_ms, pages_bytes = measure(
+            lambda: exporter._generate_problems(problems, options), repeat)
+        results[f"{count}x{blanks}"] = {
+            "answer_sheet_ms": round(sheet_ms, 2),
+            "answer_sheet_bytes": sheet_bytes,
+            "problem_pages_ms": round(pages_ms, 2),
+            "problem_pages_bytes": pages_bytes,
+        }
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """基準値と比較し、問題点のリストを返す"""
+    problems = []
+    for key, result in results.items():
+        expected = baseline.get(key)
+        if expected is None:
+            continue
+        for name in ("answer_sheet", "problem_pages"):
+            if result[f"{name}_bytes"] != expected[f"{name}_bytes"]:
+                problems.append(f"{key} {name}: 大きさが基準値と異なります"
+                                f"（{result[f'{name}_bytes']} / {expected[f'{name}_bytes']} バイト）")
+            # 1ms 未満の差は計測のぶれとして扱う
+            limit = max(expected[f"{name}_ms"] * tolerance, expected[f"{name}_ms"] + 1.0)
+            if result[f"{name}_ms"] > limit:
+                problems.append(f"{key} {name}: 基準値の {tolerance} 倍を超えました"
+                                f"（{result[f'{name}_ms']:.2f} / {expected[f'{name}_ms']:.2f} ms）")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTML組み立てのベンチマーク")
+    parser.add_argument("--problems", type=int, nargs="+", default=[50, 100, 250, 500], help="大問数")
+    parser.add_argument("--blanks", type=int, default=40, help="大問1つあたりの空欄数")
+    parser.add_argument("--repeat", type=int, default=5, help="計測回数")
+    parser.add_argument("--tolerance", type=float, default=3.0, help="時間の許容倍率")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="基準値のJSON")
+    parser.add_argument("--write-baseline", action="store_true", help="結果を基準値として保存")
+    args = parser.parse_args(argv)
+    
+    if not 0 < args.blanks <= len(BLANK_LABELS):
+        parser.error(f"--blanks は 1〜{len(BLANK_LABELS)} で指定してください")
+    
+    results = run(args.problems, args.blanks, args.repeat)
+    
+    baseline = {}
+    if args.baseline.exists():
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    
+    print(f"繰り返し: {args.repeat}")
+    print(f"  {'大問x空欄':<10} {'解答用紙':>10} {'問題ページ':>10} {'解答用紙':>12} {'問題ページ':>12}")
+    for key, result in results.items():
+        line = (f"  {key:<12} {result['answer_sheet_ms']:8.2f} ms {result['problem_pages_ms']:8.2f} ms"
+                f" {result['answer_sheet_bytes']:10d} B {result['problem_pages_bytes']:10d} B")
+        if key in baseline:
+            line += (f"  （基準値 {baseline[key]['answer_sheet_ms']:.2f} ms /"
+                     f" {baseline[key]['problem_pages_ms']:.2f} ms）")
+        print(line)
+    
+    if args.write_baseline:
+        baseline.update(results)
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8", newline="\n") as f:
+            json.dump(baseline, f, ensure_ascii=False, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"基準値を保存しました: {args.baseline}")
+        return 0
+    
+    problems = compare(results, baseline, args.tolerance)
+    for problem in problems:
+        print(f"  ※ {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PDF出力ベンチマーク: エンジン（QtWebEngine / WeasyPrint / xhtml2pdf）ごとの出力時間の比較
+
+QtWebEngineはオフスクリーンのQApplicationを起動して計測する。
+MathJaxはCDNから読み込むため、ネットワークの状態で結果が変わる点に注意。
+
+使用例:
+    python benchmarks/pdf_engines_benchmark.py --problems 10 --repeat 3
+"""
+
+import argparse
+import importlib.util
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.synthetic import make_project
+from src.models import ExportOptions
+
+
+def start_application():
+    """QtWebEngineを計測するためのQApplicationを起動（利用できない場合はNone）"""
+    if (importlib.util.find_spec("PySide6") is None
+            or importlib.util.find_spec("PySide6.QtWebEngineCore") is None):
+        return None
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication(sys.argv[:1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF出力エンジンのベンチマーク")
+    parser.add_argument("--problems", type=int, default=10, help="大問数")
+    parser.add_argument("--repeat", type=int, default=3, help="2回目以降の出力の回数")
+    args = parser.parse_args()
+    
+    app = start_application()
+    
+    from src.exporters.pdf_exporter import PDFExporter
+    
+    project = make_project(args.problems, formulas=2)
+    exporter = PDFExporter()
+    engines = [engine for engine in ExportOptions.PDF_ENGINES if exporter.is_available(engine)[0]]
+    if not engines:
+        print("利用できるPDF出力エンジンがないため、ベンチマークをスキップします")
+        return 0
+    
+    print(f"大問数: {args.problems}  繰り返し: {args.repeat}")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for engine in engines:
+            options = ExportOptions(format='pdf', generate_answer_sheet=True, pdf_engine=engine)
+            output_path = Path(temp_dir) / f"{engine}.pdf"
+            
+            times = []
+            for _ in range(args.repeat + 1):
+                start = time.perf_counter()
+                exporter.export(project, output_path, options)
+                times.append(time.perf_counter() - start)
+            
+            size_kb = output_path.stat().st_size / 1024
+            print(f"  {engine:<10}  初回 {times[0] * 1000:8.1f} ms  "
+                  f"2回目以降（中央値） {statistics.median(times[1:]) * 1000:8.1f} ms  "
+                  f"{size_kb:8.1f} KB")
+    
+    del app
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
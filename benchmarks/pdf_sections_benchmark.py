@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PDF出力ベンチマーク: セクション単位の並列レンダリングのプロセス数による出力時間の変化
+
+使用例:
+    python benchmarks/pdf_sections_benchmark.py --pages 40
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.synthetic import make_project
+from src.models import ExportOptions
+from src.exporters.pdf_sections import SectionedPDFRenderer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="並列PDFレンダリングのベンチマーク")
+    parser.add_argument("--pages", type=int, default=40, help="問題ページ数")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1,
+                        help="計測する最大プロセス数")
+    args = parser.parse_args()
+    
+    if not SectionedPDFRenderer.is_available():
+        print("weasyprint と pypdf がインストールされていないため、ベンチマークをスキップします")
+        return 0
+    
+    from src.exporters.pdf_exporter import PDFExporter
+    
+    project = make_project(args.pages, formulas=8)
+    workers_list = [1]
+    while workers_list[-1] * 2 <= args.max_workers:
+        workers_list.append(workers_list[-1] * 2)
+    
+    print(f"問題ページ数: {args.pages}  CPU数: {os.cpu_count()}")
+    baseline = None
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_path = Path(temp_dir) / "benchmark.pdf"
+        for workers in workers_list:
+            options = ExportOptions(format='pdf', generate_answer_sheet=True,
+                                    page_numbers=True, pdf_workers=workers)
+            exporter = PDFExporter()
+            try:
+                # ワーカーの起動とフォント解決を除くため、1回出力してから計測
+                exporter.export(project, output_path, options)
+                start = time.perf_counter()
+                exporter.export(project, output_path, options)
+                elapsed = time.perf_counter() - start
+            finally:
+                exporter.close()
+            
+            baseline = baseline or elapsed
+            print(f"  {workers:3d} プロセス: {elapsed:8.2f} 秒（{baseline / elapsed:4.1f} 倍）")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PDF出力ベンチマーク: レンダリングセッションの初回出力と2回目以降（ウォーム）の比較
+
+使用例:
+    python benchmarks/pdf_session_benchmark.py --problems 5 --repeat 5
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.synthetic import make_project
+from src.models import Project, ExportOptions
+from src.exporters import pdf_backends
+from src.exporters.pdf_session import PDFRenderSession
+
+
+def measure(exporter, project: Project, output_path: Path, options: ExportOptions) -> float:
+    """1回の出力時間（秒）"""
+    start = time.perf_counter()
+    exporter.export(project, output_path, options)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDFレンダリングセッションのベンチマーク")
+    parser.add_argument("--problems", type=int, default=5, help="大問数")
+    parser.add_argument("--repeat", type=int, default=5, help="ウォーム出力の回数")
+    args = parser.parse_args()
+    
+    if not pdf_backends.is_available('weasyprint'):
+        print("weasyprintがインストールされていないため、ベンチマークをスキップします")
+        return 0
+    
+    from src.exporters.pdf_exporter import PDFExporter
+    
+    project = make_project(args.problems, formulas=2)
+    options = ExportOptions(format='pdf', generate_answer_sheet=True)
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_path = Path(temp_dir) / "benchmark.pdf"
+        
+        # セッションを使い回さない場合（毎回フォント・CSSを解決）
+        cold = [measure(PDFExporter(session=PDFRenderSession()), project, output_path, options)
+                for _ in range(args.repeat)]
+        
+        # 同じセッションを使い回す場合
+        exporter = PDFExporter(session=PDFRenderSession())
+        first = measure(exporter, project, output_path, options)
+        warm = [measure(exporter, project, output_path, options) for _ in range(args.repeat)]
+    
+    print(f"大問数: {args.problems}  繰り返し: {args.repeat}")
+    print(f"  初回出力              : {first * 1000:8.1f} ms")
+    print(f"  ウォーム出力（中央値）: {statistics.median(warm) * 1000:8.1f} ms")
+    print(f"  毎回新規（中央値）    : {statistics.median(cold) * 1000:8.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JSONライブラリのベンチマーク: プロジェクトの保存・読み込み時間をライブラリごとに比較
+
+利用可能なJSONライブラリ（orjson・msgspec・標準の json）ごとに、次を計測する。
+    JSON変換/解析   Project.to_dict() の辞書を serializer.dumps / loads する時間
+    保存            Project.save（第2版: zip形式）
+    読み込み        Project.load と、すべての問題文の読み込み
+    第1版読み込み   JSON形式（第1版）の Project.load
+
+使用例:
+    python benchmarks/serializer_benchmark.py --problems 10 100 500 --images 0 20
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.synthetic import make_project
+from src.models import Project, serializer
+
+
+def median_ms(function, repeat: int) -> float:
+    """繰り返し実行した時間の中央値（ms）"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def load_all(path: Path):
+    """読み込んで、すべての問題文を参照する"""
+    for problem in Project.load(path).problems:
+        problem.content
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="JSONライブラリのベンチマーク")
+    parser.add_argument("--problems", type=int, nargs="+", default=[10, 100, 500], help="大問数")
+    parser.add_argument("--formulas", type=int, default=10, help="大問1つあたりの数式の数")
+    parser.add_argument("--images", type=int, nargs="+", default=[0], help="画像の枚数")
+    parser.add_argument("--image-size", default="800x600", help="画像の大きさ（幅x高さ）")
+    parser.add_argument("--repeat", type=int, default=5, help="計測回数")
+    args = parser.parse_args(argv)
+    
+    image_size = tuple(int(value) for value in args.image_size.split("x"))
+    backends = serializer.available_backends()
+    print(f"利用可能なJSONライブラリ: {', '.join(backends)}  繰り返し: {args.repeat}")
+    print(f"  {'大問':>4} {'画像':>4} {'ライブラリ':<8} {'JSON変換':>10} {'JSON解析':>10}"
+          f" {'保存':>10} {'読み込み':>10} {'第1版読込':>10}")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for problems in args.problems:
+            for images in args.images:
+                project = make_project(problems, formulas=args.formulas, images=images, image_size=image_size)
+                data = project.to_dict()
+                path = Path(temp_dir) / "benchmark.mep"
+                legacy_path = Path(temp_dir) / "legacy.mep"
+                legacy_path.write_bytes(json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8"))
+                
+                for backend in backends:
+                    serializer.set_backend(backend)
+                    encoded = serializer.dumps(data)
+                    dump_ms = median_ms(lambda: serializer.dumps(data), args.repeat)
+                    parse_ms = median_ms(lambda: serializer.loads(encoded), args.repeat)
+                    save_ms = median_ms(lambda: project.save(path), args.repeat)
+                    load_ms = median_ms(lambda: load_all(path), args.repeat)
+                    legacy_ms = median_ms(lambda: Project.load(legacy_path), args.repeat)
+                    print(f"  {problems:6d} {images:6d} {backend:<12} {dump_ms:8.1f}ms {parse_ms:8.1f}ms"
+                          f" {save_ms:8.1f}ms {load_ms:8.1f}ms {legacy_ms:8.1f}ms")
+    
+    serializer.set_backend()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
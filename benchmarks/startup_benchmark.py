@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+起動時間ベンチマーク: アプリ起動時に読み込むモジュールのコールドインポート時間
+
+毎回新しいPythonプロセスでインポートし、中央値を表示する。
+PDF出力ライブラリ（weasyprint・xhtml2pdf・pypdf）が起動時に読み込まれていないことも確認する。
+
+使用例:
+    python benchmarks/startup_benchmark.py --repeat 10
+"""
+
+import argparse
+import importlib.util
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+# 起動時に読み込まれてはいけないモジュール
+PDF_MODULES = ('weasyprint', 'xhtml2pdf', 'pypdf')
+
+# 計測用の子プロセスで実行するコード（インポート時間[ms]と読み込まれたPDFライブラリを出力）
+PROBE_CODE = '''
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - start) * 1000
+loaded = [name for name in {pdf_modules!r} if name in sys.modules]
+print(f"{{elapsed:.1f}} {{','.join(loaded)}}")
+'''
+
+
+def measure(module: str) -> tuple:
+    """新しいプロセスでモジュールをインポートし、(時間[ms], 読み込まれたPDFライブラリ) を返す"""
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE_CODE.format(module=module, pdf_modules=PDF_MODULES)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    elapsed, _, loaded = result.stdout.strip().partition(' ')
+    return float(elapsed), [name for name in loaded.split(',') if name]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="起動時間のベンチマーク")
+    parser.add_argument("--repeat", type=int, default=5, help="計測回数")
+    args = parser.parse_args(argv)
+    
+    modules = ["src.exporters"]
+    if importlib.util.find_spec("PySide6") is not None:
+        modules.append("src.main_window")
+    
+    print(f"繰り返し: {args.repeat}")
+    for module in modules:
+        times = []
+        loaded = []
+        for _ in range(args.repeat):
+            elapsed, loaded = measure(module)
+            times.append(elapsed)
+        note = f"  ※ 読み込まれたPDFライブラリ: {', '.join(loaded)}" if loaded else ""
+        print(f"  {module:<20} 中央値 {statistics.median(times):7.1f} ms"
+              f"（最小 {min(times):.1f} ms）{note}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
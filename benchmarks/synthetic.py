@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+ベンチマーク用の合成プロジェクト生成
+
+大問数・数式の密度・画像の枚数と大きさを指定して、再現可能な Project を生成する。
+画像は乱数で塗った PNG（圧縮がほとんど効かない、写真に近い最悪ケース）を
+data URI として問題文に埋め込む。
+"""
+
+import base64
+import random
+import struct
+import sys
+import zlib
+from pathlib import Path
+from typing import Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.models import Project, Problem
+
+BLANK_LABELS = "アイウエオカキクケコ"
+
+
+def make_png(width: int, height: int, seed: int = 0) -> bytes:
+    """乱数で塗ったRGBのPNGを生成"""
+    rng = random.Random(seed)
+    raw = b"".join(b"\x00" + rng.randbytes(width * 3) for _ in range(height))
+    
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return (struct.pack(">I", len(data)) + kind + data
+                + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF))
+    
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(raw, 6)) + chunk(b"IEND", b""))
+
+
+def make_formula(index: int, display: bool) -> str:
+    """数式を1つ生成（インラインとディスプレイで形を変える）"""
+    if display:
+        return f"$$\\int_0^{{{index + 1}}} \\frac{{x^{{{index + 2}}}}}{{1 + x^2}}\\,dx = [{BLANK_LABELS[index % 10]}]$$"
+    return f"$\\sqrt{{{index + 2}}} + \\frac{{{index}}}{{{index + 3}}}$"
+
+
+def make_project(problems: int = 10, formulas: int = 5, images: int = 0,
+                 image_size: Tuple[int, int] = (800, 600), seed: int = 0) -> Project:
+    """合成プロジェクトを生成
+    
+    Args:
+        problems: 大問数
+        formulas: 大問1つあたりの数式の数（半分をディスプレイ数式にする）
+        images: プロジェクト全体の画像の枚数（大問に順番に割り当てる）
+        image_size: 画像の大きさ（幅, 高さ）ピクセル
+        seed: 乱数の種（同じ値なら同じプロジェクトになる）
+    
+    Returns:
+        Project
+    """
+    project = Project()
+    project.title = f"合成試験（{problems}問・数式{formulas}・画像{images}）"
+    
+    image_markdown = [[] for _ in range(problems)]
+    for i in range(images if problems else 0):
+        data = base64.b64encode(make_png(*image_size, seed=seed * 100003 + i)).decode("ascii")
+        image_markdown[i % problems].append(f"![図{i + 1}](data:image/png;base64,{data})")
+    
+    for p in range(problems):
+        lines = [f"次の各問いに答えよ。（第{p + 1}問）"]
+        for f in range(formulas):
+            if f % 2:
+                lines.append(make_formula(f, display=True))
+            else:
+                lines.append(f"（{f // 2 + 1}）{make_formula(f, display=False)} の値を求めよ。")
+        lines.extend(image_markdown[p])
+        lines.append(f"答えは［{BLANK_LABELS[p % 10]}］である。")
+        project.add_problem(Problem(content="\n\n".join(lines), score="10"))
+    
+    return project
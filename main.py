@@ -4,6 +4,7 @@
 
 import sys
 import os
+import multiprocessing
 from pathlib import Path
 
 from PySide6.QtWidgets import QApplication
@@ -33,4 +34,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # PDF出力のワーカープロセス（spawn）を実行ファイル版でも起動できるようにする
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -0,0 +1,453 @@
+# -*- coding: utf-8 -*-
+"""コマンドライン一括エクスポート
+
+GUI（QApplication）を起動せずに、複数のプロジェクトファイルをまとめて出力する。
+
+使用例:
+    python -m src.cli export exams/*.mep --format pdf --jobs 8 --output-dir out
+    python -m src.cli class-set exam.mep --roster 3-1.csv --answer-sheet
+    python -m src.cli grade exam.mep --key key.csv --responses 3-1_answers.csv
+    python -m src.cli omr-read exam_omr.json scans/*.png --output 3-1_answers.csv
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from .models import Project, ExportOptions
+
+
+# ワーカープロセスごとに使い回すエクスポーター（断片キャッシュ等を共有）
+_exporters = {}
+
+
+def _get_exporter(export_format: str):
+    """出力形式に対応するエクスポーターを取得"""
+    if export_format not in _exporters:
+        if export_format == 'pdf':
+            from .exporters import PDFExporter
+            exporter = PDFExporter()
+            if not exporter.is_available()[0]:
+                raise ImportError("PDF出力には weasyprint または xhtml2pdf のインストールが必要です")
+            _exporters[export_format] = exporter
+        else:
+            from .exporters import HTMLExporter
+            _exporters[export_format] = HTMLExporter()
+    return _exporters[export_format]
+
+
+def export_project(project_path: Path, output_path: Path, options: ExportOptions) -> float:
+    """プロジェクト1件を出力
+    
+    Args:
+        project_path: プロジェクトファイル（.mep）のパス
+        output_path: 出力先パス
+        options: エクスポートオプション（表紙情報はプロジェクトの値で補完）
+    
+    Returns:
+        処理時間（秒）
+    """
+    start = time.perf_counter()
+    
+    project = Project.load(project_path)
+    options = with_project_cover(project, options)
+    
+    _get_exporter(options.format).export(project, output_path, options)
+    
+    return time.perf_counter() - start
+
+
+def with_project_cover(project: Project, options: ExportOptions) -> ExportOptions:
+    """指定のない表紙の項目をプロジェクトに保存された内容で補完"""
+    cover_data = project.cover_content if isinstance(project.cover_content, dict) else {}
+    cover_options = {k: v for k, v in cover_data.items()
+                     if k in ExportOptions.COVER_FIELDS and not getattr(options, k)}
+    return options.replace(**cover_options)
+
+
+def _export_worker(project_path: Path, output_path: Path,
+                   options: ExportOptions) -> Tuple[Path, Path, float, Optional[str]]:
+    """ワーカープロセスで実行する処理（例外は文字列にして返す）"""
+    try:
+        elapsed = export_project(project_path, output_path, options)
+        return project_path, output_path, elapsed, None
+    except Exception as e:
+        return project_path, output_path, 0.0, f"{type(e).__name__}: {e}"
+
+
+def expand_inputs(patterns: List[str]) -> List[Path]:
+    """入力パターンを展開（Windowsのシェルはワイルドカードを展開しないため）"""
+    paths = []
+    seen = set()
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        for match in matches:
+            path = Path(match)
+            if path not in seen:
+                seen.add(path)
+                paths.append(path)
+    return paths
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """引数パーサーを作成"""
+    parser = argparse.ArgumentParser(
+        prog="python -m src.cli",
+        description="Math Exam Creator コマンドライン一括エクスポート"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    export_parser = subparsers.add_parser("export", help="プロジェクトをHTML/PDFに一括出力")
+    export_parser.add_argument("inputs", nargs="+", help="プロジェクトファイル（.mep、ワイルドカード可）")
+    export_parser.add_argument("--format", choices=ExportOptions.FORMATS, default="html",
+                               help="出力形式（既定: html）")
+    export_parser.add_argument("--output-dir", type=Path, default=None,
+                               help="出力先ディレクトリ（既定: 入力ファイルと同じ場所）")
+    export_parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1,
+                               help="並列に処理するプロセス数（既定: CPU数）")
+    _add_layout_arguments(export_parser)
+    export_parser.add_argument("--pretypeset-math", action="store_true",
+                               help="数式を出力時にMathMLへ変換する（HTMLのみ）")
+    export_parser.add_argument("--minify", action="store_true", help="HTMLを圧縮する（HTMLのみ）")
+    export_parser.add_argument("--gzip", action="store_true", help="gzip圧縮版も出力する（HTMLのみ）")
+    export_parser.add_argument("--pdf-engine", choices=["weasyprint", "xhtml2pdf"], default="",
+                               help="PDF出力エンジン（既定: 自動選択）")
+    export_parser.add_argument("--pdf-workers", type=int, default=1,
+                               help="1ファイルのセクションを並列にレンダリングするプロセス数（PDFのみ、既定: 1）")
+    export_parser.add_argument("--pdf-cache", action="store_true",
+                               help="レンダリング済みのページを再利用する（PDFのみ）")
+    export_parser.add_argument("--pdf-chunk-pages", type=int, default=0,
+                               help="このページ数ごとに分けてレイアウトし、メモリ使用量を抑える（PDFのみ、既定: 分けない）")
+    
+    class_set_parser = subparsers.add_parser(
+        "class-set", help="名簿の生徒ごとに番号・氏名を印字したPDFを出力"
+    )
+    class_set_parser.add_argument("input", type=Path, help="プロジェクトファイル（.mep）")
+    class_set_parser.add_argument("--roster", type=Path, required=True,
+                                  help="名簿CSV（番号・氏名の列、見出し行は省略可）")
+    class_set_parser.add_argument("--output", type=Path, default=None,
+                                  help="出力先（既定: <プロジェクト名>_<名簿名>.pdf、--per-student ではディレクトリ）")
+    class_set_parser.add_argument("--per-student", action="store_true",
+                                  help="生徒ごとに別のファイルに出力する")
+    class_set_parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1,
+                                  help="重ね合わせを並列に処理するプロセス数（既定: CPU数）")
+    _add_layout_arguments(class_set_parser)
+    class_set_parser.set_defaults(format='pdf', pretypeset_math=False, minify=False, gzip=False,
+                                  pdf_engine='weasyprint', pdf_workers=1, pdf_cache=False,
+                                  pdf_chunk_pages=0)
+    
+    answer_key_parser = subparsers.add_parser(
+        "answer-key", help="問題文の空欄から解答キーCSV（正答・配点の記入用）を作成"
+    )
+    answer_key_parser.add_argument("input", type=Path, help="プロジェクトファイル（.mep）")
+    answer_key_parser.add_argument("--output", type=Path, default=None,
+                                   help="出力先（既定: <プロジェクト名>_key.csv、既存の正答・配点は引き継ぐ）")
+    
+    grade_parser = subparsers.add_parser("grade", help="解答キーで生徒の解答CSVを一括採点")
+    grade_parser.add_argument("input", type=Path, help="プロジェクトファイル（.mep）")
+    grade_parser.add_argument("--key", type=Path, required=True, help="解答キーCSV")
+    grade_parser.add_argument("--responses", type=Path, required=True,
+                              help="解答CSV（番号・氏名と、空欄ごとの列 1-ア 等）")
+    grade_parser.add_argument("--output", type=Path, default=None,
+                              help="得点の出力先（既定: <解答CSV名>_scores.csv）")
+    grade_parser.add_argument("--item-stats", type=Path, default=None,
+                              help="空欄ごとの正答率・識別力の出力先（既定: <解答CSV名>_items.csv）")
+    grade_parser.add_argument("--optional-count", type=int, default=1,
+                              help="合計に含める選択問題の数（得点の高いものから、既定: 1）")
+    
+    omr_sheet_parser = subparsers.add_parser(
+        "omr-sheet", help="マーク式解答用紙と、マーク欄の座標のマニフェスト（JSON）を作成"
+    )
+    omr_sheet_parser.add_argument("input", type=Path, help="プロジェクトファイル（.mep）")
+    omr_sheet_parser.add_argument("--format", choices=["html", "pdf"], default="pdf",
+                                  help="出力形式（既定: pdf、WeasyPrintが必要）")
+    omr_sheet_parser.add_argument("--output", type=Path, default=None,
+                                  help="出力先（既定: <プロジェクト名>_omr.<形式>、マニフェストは同名の .json）")
+    omr_sheet_parser.add_argument("--page-size", default="A4", help="用紙サイズ（既定: A4）")
+    omr_sheet_parser.add_argument("--choices", default=None,
+                                  help="選択肢（1文字ずつ、既定: -0123456789）")
+    omr_sheet_parser.add_argument("--number-digits", type=int, default=4,
+                                  help="受験番号のけた数（既定: 4）")
+    
+    omr_read_parser = subparsers.add_parser(
+        "omr-read", help="スキャンしたマーク式解答用紙を読み取り、解答CSVを作成"
+    )
+    omr_read_parser.add_argument("manifest", type=Path, help="omr-sheet で作成したマニフェスト（.json）")
+    omr_read_parser.add_argument("scans", nargs="+",
+                                 help="スキャン画像（生徒順・ページ順、ワイルドカード可）")
+    omr_read_parser.add_argument("--output", type=Path, required=True,
+                                 help="解答CSVの出力先（grade の --responses に指定できる）")
+    
+    return parser
+
+
+def _add_layout_arguments(parser: argparse.ArgumentParser):
+    """レイアウト・表示内容の引数（export・class-set 共通）"""
+    parser.add_argument("--page-size", default="A4", help="用紙サイズ（既定: A4）")
+    parser.add_argument("--problems-per-page", type=int, choices=[1, 2], default=1,
+                        help="1ページあたりの大問数")
+    parser.add_argument("--font-size", type=int, default=12, help="フォントサイズ（pt）")
+    parser.add_argument("--no-cover", action="store_true", help="表紙を含めない")
+    parser.add_argument("--answer-sheet", action="store_true", help="解答用紙を生成する")
+    parser.add_argument("--page-numbers", action="store_true", help="ページ番号を表示する")
+    parser.add_argument("--image-dpi", type=int, default=0,
+                        help="埋め込み画像を印刷時の解像度に合わせて縮小する（例: 150、既定: 縮小しない）")
+    parser.add_argument("--image-quality", type=int, default=85,
+                        help="縮小した写真のJPEG画質（1〜95、既定: 85）")
+
+
+def options_from_args(args: argparse.Namespace) -> ExportOptions:
+    """コマンドライン引数からエクスポートオプションを生成"""
+    is_html = args.format == 'html'
+    return ExportOptions(
+        format=args.format,
+        page_size=args.page_size,
+        problems_per_page=args.problems_per_page,
+        show_cover=not args.no_cover,
+        generate_answer_sheet=args.answer_sheet,
+        page_numbers=args.page_numbers,
+        font_size=args.font_size,
+        image_dpi=args.image_dpi,
+        image_quality=args.image_quality,
+        pretypeset_math=is_html and args.pretypeset_math,
+        minify_html=is_html and args.minify,
+        gzip_output=is_html and args.gzip,
+        pdf_engine='' if is_html else args.pdf_engine,
+        pdf_workers=1 if is_html else args.pdf_workers,
+        pdf_cache=not is_html and args.pdf_cache,
+        pdf_chunk_pages=0 if is_html else args.pdf_chunk_pages,
+        # 表紙の既定値はプロジェクトの値で補完する
+        subject=''
+    )
+
+
+def run_export(args: argparse.Namespace) -> int:
+    """exportサブコマンドを実行
+    
+    Returns:
+        終了コード（失敗したファイルがあれば1）
+    """
+    inputs = expand_inputs(args.inputs)
+    if not inputs:
+        print("入力ファイルが見つかりません", file=sys.stderr)
+        return 1
+    
+    options = options_from_args(args)
+    if args.output_dir is not None:
+        args.output_dir.mkdir(parents=True, exist_ok=True)
+    
+    tasks = []
+    for project_path in inputs:
+        output_dir = args.output_dir if args.output_dir is not None else project_path.parent
+        tasks.append((project_path, output_dir / f"{project_path.stem}.{options.format}", options))
+    
+    jobs = max(1, min(args.jobs, len(tasks)))
+    start = time.perf_counter()
+    
+    if jobs == 1:
+        results = (_export_worker(*task) for task in tasks)
+        failures = _report_results(results)
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = [executor.submit(_export_worker, *task) for task in tasks]
+            failures = _report_results(future.result() for future in as_completed(futures))
+    
+    total = time.perf_counter() - start
+    print(f"完了: {len(tasks) - failures}/{len(tasks)} 件（{total:.2f} 秒、{jobs} プロセス）")
+    return 1 if failures else 0
+
+
+def run_class_set(args: argparse.Namespace) -> int:
+    """class-setサブコマンドを実行
+    
+    Returns:
+        終了コード
+    """
+    from .exporters.class_set import ClassSetExporter, load_roster
+    
+    if not ClassSetExporter.is_available():
+        print("クラス分の出力には weasyprint と pypdf のインストールが必要です", file=sys.stderr)
+        return 1
+    
+    start = time.perf_counter()
+    project = Project.load(args.input)
+    students = load_roster(args.roster)
+    options = with_project_cover(project, options_from_args(args))
+    
+    output_path = args.output
+    if output_path is None:
+        output_path = args.input.with_name(f"{args.input.stem}_{args.roster.stem}")
+        if not args.per_student:
+            output_path = output_path.with_suffix('.pdf')
+    
+    exporter = ClassSetExporter(_get_exporter('pdf'), workers=args.jobs)
+    paths = exporter.export(project, students, output_path, options, per_student=args.per_student)
+    
+    total = time.perf_counter() - start
+    target = output_path if args.per_student else paths[0]
+    print(f"完了: {len(students)} 人分 -> {target}（{len(paths)} ファイル、{total:.2f} 秒）")
+    return 0
+
+
+def run_answer_key(args: argparse.Namespace) -> int:
+    """answer-keyサブコマンドを実行
+    
+    Returns:
+        終了コード
+    """
+    from .grading.grader import AnswerKey, read_key_answers
+    
+    project = Project.load(args.input)
+    output_path = args.output or args.input.with_name(f"{args.input.stem}_key.csv")
+    answers = read_key_answers(output_path) if output_path.exists() else None
+    
+    key = AnswerKey.from_project(project, answers)
+    key.write_template(output_path)
+    print(f"完了: 空欄 {len(key.items)} 個 -> {output_path}")
+    return 0
+
+
+def run_grade(args: argparse.Namespace) -> int:
+    """gradeサブコマンドを実行
+    
+    Returns:
+        終了コード
+    """
+    from .grading import AnswerKey, Grader
+    
+    if not Grader.is_available():
+        print("採点には numpy のインストールが必要です", file=sys.stderr)
+        return 1
+    
+    start = time.perf_counter()
+    try:
+        key = AnswerKey.load(args.key, Project.load(args.input))
+        result = Grader(key, optional_count=args.optional_count).grade_csv(args.responses)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    
+    stem = args.responses.with_suffix('')
+    scores_path = args.output or Path(f"{stem}_scores.csv")
+    items_path = args.item_stats or Path(f"{stem}_items.csv")
+    result.write_scores(scores_path)
+    result.write_item_statistics(items_path)
+    
+    total = time.perf_counter() - start
+    average = float(result.totals.mean()) if len(result.students) else 0.0
+    print(f"完了: {len(result.students)} 人 × {len(key.items)} 空欄（平均 {average:.1f} 点、{total:.2f} 秒）")
+    print(f"  得点: {scores_path}")
+    print(f"  空欄ごとの統計: {items_path}")
+    return 0
+
+
+def run_omr_sheet(args: argparse.Namespace) -> int:
+    """omr-sheetサブコマンドを実行
+    
+    Returns:
+        終了コード
+    """
+    from .utils.omr_sheet_generator import OMRSheetGenerator
+    
+    project = Project.load(args.input)
+    output_path = args.output or args.input.with_name(f"{args.input.stem}_omr.{args.format}")
+    manifest_path = output_path.with_suffix('.json')
+    
+    choices = list(args.choices) if args.choices else OMRSheetGenerator.DEFAULT_CHOICES
+    generator = OMRSheetGenerator(choices=choices, number_digits=args.number_digits)
+    manifest = generator.layout(project.problems, args.page_size, project.title)
+    if not manifest['blanks']:
+        print("問題文に空欄がありません", file=sys.stderr)
+        return 1
+    html_content = generator.generate_html(manifest)
+    
+    if args.format == 'pdf':
+        # マーク欄の位置をmm単位で再現できるのはWeasyPrintだけ
+        from .exporters import pdf_backends
+        if not pdf_backends.is_available('weasyprint'):
+            print("マーク式解答用紙のPDF出力には weasyprint のインストールが必要です", file=sys.stderr)
+            return 1
+        _get_exporter('pdf').export_with_weasyprint(html_content, output_path)
+    else:
+        output_path.write_text(html_content, encoding='utf-8')
+    generator.write_manifest(manifest, manifest_path)
+    
+    print(f"完了: 空欄 {len(manifest['blanks'])} 個・{manifest['pages']} ページ -> {output_path}")
+    print(f"  マニフェスト: {manifest_path}")
+    return 0
+
+
+def run_omr_read(args: argparse.Namespace) -> int:
+    """omr-readサブコマンドを実行
+    
+    Returns:
+        終了コード
+    """
+    from .grading.omr_reader import OMRReader
+    
+    if not OMRReader.is_available():
+        print("マーク式解答用紙の読み取りには numpy のインストールが必要です", file=sys.stderr)
+        return 1
+    
+    scans = expand_inputs(args.scans)
+    start = time.perf_counter()
+    reader = OMRReader.load(args.manifest)
+    try:
+        sheets = reader.read_files(scans)
+    except (ImportError, ValueError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    reader.write_responses(sheets, args.output)
+    
+    total = time.perf_counter() - start
+    unreadable = sum(1 for sheet in sheets if '?' in sheet.number)
+    print(f"完了: {len(sheets)} 人分（{len(scans)} 枚、{total:.2f} 秒）-> {args.output}")
+    if unreadable:
+        print(f"  受験番号を読み取れなかった用紙: {unreadable} 枚", file=sys.stderr)
+    return 0
+
+
+def _report_results(results) -> int:
+    """ファイルごとの結果を表示し、失敗件数を返す"""
+    failures = 0
+    for project_path, output_path, elapsed, error in results:
+        if error is None:
+            print(f"{elapsed:8.2f} 秒  {project_path} -> {output_path}", flush=True)
+        else:
+            failures += 1
+            print(f"  失敗      {project_path}: {error}", file=sys.stderr, flush=True)
+    return failures
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """エントリーポイント"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command in ("export", "class-set"):
+        # 範囲外の値（--image-dpi 50 等）は他の引数の誤りと同じく使い方とともに表示する
+        try:
+            options_from_args(args)
+        except ValueError as e:
+            parser.error(str(e))
+    if args.command == "export":
+        return run_export(args)
+    if args.command == "class-set":
+        return run_class_set(args)
+    if args.command == "answer-key":
+        return run_answer_key(args)
+    if args.command == "grade":
+        return run_grade(args)
+    if args.command == "omr-sheet":
+        return run_omr_sheet(args)
+    if args.command == "omr-read":
+        return run_omr_read(args)
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
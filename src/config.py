@@ -1,10 +1,11 @@
 # -*- coding: utf-8 -*-
 """設定管理モジュール"""
 
-import json
 from pathlib import Path
 from typing import Any, Optional
 
+from .models import serializer
+
 
 class Config:
     """アプリケーション設定を管理するクラス"""
@@ -27,16 +28,12 @@ class Config:
         try:
             if self.config_file.exists():
                 # UTF-8 で読み込み（BOM対応）
-                encodings = ['utf-8-sig', 'utf-8']
-                for encoding in encodings:
-                    try:
-                        with open(self.config_file, 'r', encoding=encoding) as f:
-                            self.settings = json.load(f)
-                        return
-                    except (UnicodeDecodeError, json.JSONDecodeError):
-                        continue
-                # 読み込み失敗時はデフォルト
-                self.settings = self._get_default_settings()
+                try:
+                    self.settings = serializer.loads(self.config_file.read_bytes().decode('utf-8-sig'))
+                    return
+                except ValueError:
+                    # 読み込み失敗時はデフォルト
+                    self.settings = self._get_default_settings()
             else:
                 self.settings = self._get_default_settings()
         except Exception as e:
@@ -48,8 +45,7 @@ class Config:
         try:
             self.config_dir.mkdir(parents=True, exist_ok=True)
             # UTF-8 で保存（改行コード統一）
-            with open(self.config_file, 'w', encoding='utf-8', newline='\n') as f:
-                json.dump(self.settings, f, indent=4, ensure_ascii=False)
+            self.config_file.write_bytes(serializer.dumps(self.settings, indent=4))
         except Exception as e:
             print(f"設定ファイルの保存に失敗しました: {e}")
     
@@ -9,6 +9,7 @@ from .script_output_dialog import ScriptOutputDialog
 from .math_editor_dialog import MathEditorDialog
 from .print_settings_dialog import PrintSettingsDialog
 from .print_preview_dialog import PrintPreviewDialog
+from .export_progress_dialog import ExportProgressDialog
 
 __all__ = [
     'ExportDialog',
@@ -18,5 +19,6 @@ __all__ = [
     'ScriptOutputDialog',
     'MathEditorDialog',
     'PrintSettingsDialog',
-    'PrintPreviewDialog'
+    'PrintPreviewDialog',
+    'ExportProgressDialog'
 ]
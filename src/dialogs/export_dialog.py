@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 """エクスポートダイアログ"""
 
+import os
+
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QFormLayout,
     QLineEdit, QCheckBox, QSpinBox, QPushButton,
@@ -8,6 +10,8 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import Qt
 
+from ..models import ExportOptions
+
 
 class ExportDialog(QDialog):
     """エクスポート設定ダイアログ"""
@@ -16,6 +20,10 @@ class ExportDialog(QDialog):
         super().__init__(parent)
         self.setWindowTitle("エクスポート設定")
         self.setMinimumWidth(450)
+        # PDF出力ライブラリの検出結果（_probe_pdf_backends で設定）
+        self.pdf_probed = False
+        self.auto_pdf_engine = None
+        self.sections_available = False
         self.init_ui()
     
     def init_ui(self):
@@ -38,31 +46,12 @@ class ExportDialog(QDialog):
         self.format_button_group.addButton(self.pdf_radio, 1)
         format_layout.addWidget(self.pdf_radio)
         
-        # PDF出力の利用可能性をチェック
-        from ..exporters import PDFExporter
-        
-        if PDFExporter is None:
-            # PDFExporterが全くインポートできない場合
-            self.pdf_radio.setEnabled(False)
-            pdf_note = QLabel("※ PDF出力には weasyprint のインストールが必要です\n"
-                            "  macOS: brew install cairo pango gdk-pixbuf libffi")
-            pdf_note.setStyleSheet("color: #ff6600; font-size: 10pt; margin-left: 20px;")
-            pdf_note.setWordWrap(True)
-            format_layout.addWidget(pdf_note)
-        else:
-            # PDFExporterがインポートできた場合、詳細チェック
-            pdf_exporter = PDFExporter()
-            available, library = pdf_exporter.is_available()
-            
-            if not available:
-                self.pdf_radio.setEnabled(False)
-                pdf_note = QLabel("※ PDF出力には weasyprint または xhtml2pdf のインストールが必要です")
-                pdf_note.setStyleSheet("color: #ff6600; font-size: 10pt; margin-left: 20px;")
-                format_layout.addWidget(pdf_note)
-            else:
-                pdf_note = QLabel(f"※ PDF出力エンジン: {library}")
-                pdf_note.setStyleSheet("color: #4caf50; font-size: 10pt; margin-left: 20px;")
-                format_layout.addWidget(pdf_note)
+        # PDF出力ライブラリは、PDFを選択した時に検出する（HTMLだけの出力では読み込まない。
+        # バックグラウンドでの検出が済んでいればその結果を使う）
+        self.pdf_note = QLabel("※ PDF出力ライブラリはPDFを選択した時に確認します")
+        self.pdf_note.setStyleSheet("color: #666; font-size: 10pt; margin-left: 20px;")
+        self.pdf_note.setWordWrap(True)
+        format_layout.addWidget(self.pdf_note)
         
         format_group.setLayout(format_layout)
         layout.addWidget(format_group)
@@ -100,6 +89,10 @@ class ExportDialog(QDialog):
         self.show_problem_numbers_check.setChecked(True)
         content_layout.addWidget(self.show_problem_numbers_check)
         
+        self.page_numbers_check = QCheckBox("ページ番号を表示（表紙を除く）")
+        self.page_numbers_check.setChecked(False)
+        content_layout.addWidget(self.page_numbers_check)
+        
         self.show_answers_check = QCheckBox("解答を表示")
         self.show_answers_check.setChecked(False)
         self.show_answers_check.setEnabled(False)
@@ -113,7 +106,7 @@ class ExportDialog(QDialog):
         self.generate_answer_sheet_check.setChecked(True)
         content_layout.addWidget(self.generate_answer_sheet_check)
         
-        answer_sheet_note = QLabel("※ 問題文から空欄（ア、イ、ウ等）を抽出して解答用紙を生成します")
+        answer_sheet_note = QLabel("※ 問題文から空欄（[ア]、［イ］、$\\boxed{ウ}$ 等）を抽出して解答用紙を生成します")
         answer_sheet_note.setStyleSheet("color: #666; font-size: 10pt; margin-left: 20px;")
         content_layout.addWidget(answer_sheet_note)
         
@@ -143,6 +136,136 @@ class ExportDialog(QDialog):
         style_group.setLayout(style_layout)
         layout.addWidget(style_group)
         
+        # 画像設定（HTML・PDF共通）
+        image_group = QGroupBox("画像")
+        image_layout = QFormLayout()
+        
+        self.image_dpi_combo = QComboBox()
+        image_resolutions = [
+            ("縮小しない（元の画像のまま）", 0),
+            ("150 dpi（標準）", 150),
+            ("200 dpi", 200),
+            ("300 dpi（高画質）", 300),
+        ]
+        for label, dpi in image_resolutions:
+            self.image_dpi_combo.addItem(label, dpi)
+        self.image_dpi_combo.setCurrentIndex(1)
+        image_layout.addRow("解像度:", self.image_dpi_combo)
+        
+        self.image_quality_spin = QSpinBox()
+        self.image_quality_spin.setRange(50, 95)
+        self.image_quality_spin.setValue(85)
+        image_layout.addRow("写真の画質:", self.image_quality_spin)
+        
+        from ..exporters.image_optimizer import ImageOptimizer
+        if ImageOptimizer().is_available():
+            image_note = QLabel("※ 印刷される大きさに合わせて貼り付けた写真を縮小し、ファイルサイズを抑えます")
+            image_note.setStyleSheet("color: #666; font-size: 10pt; margin-left: 10px;")
+        else:
+            self.image_dpi_combo.setCurrentIndex(0)
+            self.image_dpi_combo.setEnabled(False)
+            self.image_quality_spin.setEnabled(False)
+            image_note = QLabel("※ 画像の縮小には Pillow のインストールが必要です")
+            image_note.setStyleSheet("color: #ff6600; font-size: 10pt; margin-left: 10px;")
+        image_note.setWordWrap(True)
+        image_layout.addRow("", image_note)
+        
+        self.image_dpi_combo.currentIndexChanged.connect(
+            lambda index: self.image_quality_spin.setEnabled(bool(self.image_dpi_combo.itemData(index)))
+        )
+        
+        image_group.setLayout(image_layout)
+        layout.addWidget(image_group)
+        
+        # HTML出力設定（HTMLのみ）
+        size_group = QGroupBox("HTML出力オプション")
+        size_layout = QVBoxLayout()
+        
+        self.pretypeset_math_check = QCheckBox("数式を出力時に変換する（MathJax不要・オフライン表示可）")
+        self.pretypeset_math_check.setChecked(False)
+        size_layout.addWidget(self.pretypeset_math_check)
+        
+        from ..exporters.math_typesetter import MathTypesetter
+        if not MathTypesetter().is_available():
+            self.pretypeset_math_check.setEnabled(False)
+            math_note = QLabel("※ 数式の変換には latex2mathml のインストールが必要です")
+            math_note.setStyleSheet("color: #ff6600; font-size: 10pt; margin-left: 20px;")
+            size_layout.addWidget(math_note)
+        
+        self.minify_html_check = QCheckBox("HTMLを圧縮する（余分な空白・コメントを除去）")
+        self.minify_html_check.setChecked(False)
+        size_layout.addWidget(self.minify_html_check)
+        
+        self.gzip_output_check = QCheckBox("gzip圧縮版（.html.gz）も出力する")
+        self.gzip_output_check.setChecked(False)
+        size_layout.addWidget(self.gzip_output_check)
+        
+        size_note = QLabel("※ 数式・<pre>ブロック・埋め込み画像は変更されません")
+        size_note.setStyleSheet("color: #666; font-size: 10pt; margin-left: 20px;")
+        size_layout.addWidget(size_note)
+        
+        size_group.setLayout(size_layout)
+        layout.addWidget(size_group)
+        
+        # PDF選択時はHTML圧縮設定を無効化
+        self.html_radio.toggled.connect(size_group.setEnabled)
+        
+        # PDF出力設定（PDFのみ）
+        pdf_group = QGroupBox("PDF出力オプション")
+        pdf_layout = QFormLayout()
+        
+        self.pdf_engine_combo = QComboBox()
+        engines = [
+            ("自動", ''),
+            ("QtWebEngine（MathJaxで数式を描画）", 'webengine'),
+            ("WeasyPrint", 'weasyprint'),
+            ("xhtml2pdf", 'xhtml2pdf'),
+        ]
+        for label, engine in engines:
+            self.pdf_engine_combo.addItem(label, engine)
+        pdf_layout.addRow("出力エンジン:", self.pdf_engine_combo)
+        
+        self.pdf_workers_spin = QSpinBox()
+        self.pdf_workers_spin.setRange(1, os.cpu_count() or 1)
+        self.pdf_workers_spin.setValue(1)
+        self.pdf_workers_spin.setSuffix(" プロセス")
+        pdf_layout.addRow("並列レンダリング:", self.pdf_workers_spin)
+        
+        self.pdf_cache_check = QCheckBox("変更のないページを再利用する（再出力を高速化）")
+        # 有効にするとページごとのレンダリング・結合になり、ディスクにも保存するので既定は無効
+        self.pdf_cache_check.setChecked(False)
+        self.pdf_cache_check.setToolTip("レンダリングしたページを ~/.math_exam_creator/pdf_cache に保存し、"
+                                        "再出力では変更のあるページだけをレンダリングし直します")
+        pdf_layout.addRow("", self.pdf_cache_check)
+        
+        self.pdf_chunk_spin = QSpinBox()
+        self.pdf_chunk_spin.setRange(0, 100)
+        self.pdf_chunk_spin.setValue(0)
+        self.pdf_chunk_spin.setSpecialValueText("分けない")
+        self.pdf_chunk_spin.setSuffix(" ページごと")
+        self.pdf_chunk_spin.setToolTip("大きな試験をこのページ数ごとにレイアウトし、メモリ使用量を抑えます")
+        pdf_layout.addRow("分割レンダリング:", self.pdf_chunk_spin)
+        
+        self.workers_note = QLabel("※ 表紙・問題ページ・解答用紙を分けて並列に処理します（大きな試験向け。QtWebEngine では使用しません）")
+        self.workers_note.setStyleSheet("color: #666; font-size: 10pt; margin-left: 10px;")
+        self.workers_note.setWordWrap(True)
+        pdf_layout.addRow("", self.workers_note)
+        
+        # QtWebEngine は1回の描画でPDFにするため、並列・再利用・分割の設定を無効化
+        self.pdf_engine_combo.currentIndexChanged.connect(self._update_pdf_section_options)
+        self._update_pdf_section_options()
+        
+        pdf_group.setLayout(pdf_layout)
+        pdf_group.setEnabled(False)
+        layout.addWidget(pdf_group)
+        
+        self.pdf_radio.toggled.connect(pdf_group.setEnabled)
+        self.pdf_radio.toggled.connect(lambda checked: checked and self._probe_pdf_backends())
+        
+        from ..exporters import pdf_backends
+        if all(pdf_backends.is_probed(name) for name in pdf_backends.BACKEND_MODULES):
+            self._probe_pdf_backends()
+        
         # ボタン
         button_layout = QHBoxLayout()
         button_layout.addStretch()
@@ -171,7 +294,56 @@ class ExportDialog(QDialog):
         
         layout.addLayout(button_layout)
     
-    def get_options(self):
+    def _probe_pdf_backends(self):
+        """PDF出力ライブラリを検出し、利用できるエンジン・オプションを表示に反映（初回のみ）"""
+        if self.pdf_probed:
+            return
+        self.pdf_probed = True
+        
+        from ..exporters import PDFExporter, pdf_backends
+        from ..exporters.pdf_sections import SectionedPDFRenderer
+        
+        pdf_exporter = PDFExporter()
+        available, library = pdf_exporter.is_available()
+        # 「自動」を選んだ場合に使われるエンジン
+        self.auto_pdf_engine = library
+        
+        if not available:
+            # weasyprint はあるがネイティブライブラリ（cairo等）が見つからない場合は OSError
+            if (pdf_backends.unavailable_reason('weasyprint') or '').startswith('OSError'):
+                self.pdf_note.setText("※ PDF出力には weasyprint の依存ライブラリが必要です\n"
+                                      "  macOS: brew install cairo pango gdk-pixbuf libffi")
+            else:
+                self.pdf_note.setText("※ PDF出力には weasyprint または xhtml2pdf のインストールが必要です")
+            self.pdf_note.setStyleSheet("color: #ff6600; font-size: 10pt; margin-left: 20px;")
+            self.html_radio.setChecked(True)
+            self.pdf_radio.setEnabled(False)
+        else:
+            self.pdf_note.setText(f"※ PDF出力エンジン: {library}")
+            self.pdf_note.setStyleSheet("color: #4caf50; font-size: 10pt; margin-left: 20px;")
+        
+        for index in range(self.pdf_engine_combo.count()):
+            engine = self.pdf_engine_combo.itemData(index)
+            if engine and not pdf_exporter.is_available(engine)[0]:
+                self.pdf_engine_combo.model().item(index).setEnabled(False)
+        
+        self.sections_available = SectionedPDFRenderer.is_available()
+        if not self.sections_available:
+            self.workers_note.setText("※ 並列レンダリング・ページの再利用・分割レンダリングには weasyprint と pypdf のインストールが必要です")
+            self.workers_note.setStyleSheet("color: #ff6600; font-size: 10pt; margin-left: 10px;")
+        self._update_pdf_section_options()
+    
+    def _update_pdf_section_options(self):
+        """出力エンジンに応じて、セクション単位のレンダリングの設定を有効・無効にする"""
+        engine = self.pdf_engine_combo.currentData()
+        if not engine:
+            engine = self.auto_pdf_engine
+        enabled = self.sections_available and engine != 'webengine'
+        self.pdf_workers_spin.setEnabled(enabled)
+        self.pdf_cache_check.setEnabled(enabled)
+        self.pdf_chunk_spin.setEnabled(enabled)
+    
+    def get_options(self) -> ExportOptions:
         """設定値を取得"""
         line_spacing_map = {
             0: 1.5,
@@ -187,15 +359,28 @@ class ExportDialog(QDialog):
         }
         margin = margin_map.get(self.margin_combo.currentIndex(), "20mm")
         
-        return {
-            'format': 'html' if self.html_radio.isChecked() else 'pdf',
-            'page_size': self.page_size_combo.currentText(),
-            'problems_per_page': self.problems_per_page_spin.value(),
-            'show_cover': self.show_cover_check.isChecked(),
-            'show_problem_numbers': self.show_problem_numbers_check.isChecked(),
-            'show_answers': self.show_answers_check.isChecked(),
-            'generate_answer_sheet': self.generate_answer_sheet_check.isChecked(),
-            'font_size': self.font_size_spin.value(),
-            'line_spacing': line_spacing,
-            'margin': margin
-        }
+        # HTML出力オプションはHTML選択時のみ有効
+        is_html = self.html_radio.isChecked()
+        
+        # 「解答を表示」は未実装のためオプションに含めない
+        return ExportOptions(
+            format='html' if is_html else 'pdf',
+            page_size=self.page_size_combo.currentText(),
+            problems_per_page=self.problems_per_page_spin.value(),
+            show_cover=self.show_cover_check.isChecked(),
+            show_problem_numbers=self.show_problem_numbers_check.isChecked(),
+            generate_answer_sheet=self.generate_answer_sheet_check.isChecked(),
+            page_numbers=self.page_numbers_check.isChecked(),
+            font_size=self.font_size_spin.value(),
+            line_spacing=line_spacing,
+            margin=margin,
+            image_dpi=self.image_dpi_combo.currentData(),
+            image_quality=self.image_quality_spin.value(),
+            pretypeset_math=is_html and self.pretypeset_math_check.isChecked(),
+            minify_html=is_html and self.minify_html_check.isChecked(),
+            gzip_output=is_html and self.gzip_output_check.isChecked(),
+            pdf_engine='' if is_html else self.pdf_engine_combo.currentData(),
+            pdf_workers=1 if is_html or not self.pdf_workers_spin.isEnabled() else self.pdf_workers_spin.value(),
+            pdf_cache=not is_html and self.pdf_cache_check.isEnabled() and self.pdf_cache_check.isChecked(),
+            pdf_chunk_pages=0 if is_html or not self.pdf_chunk_spin.isEnabled() else self.pdf_chunk_spin.value()
+        )
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""PDF出力の進捗表示ダイアログ"""
+
+from pathlib import Path
+
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel,
+    QPushButton, QProgressBar
+)
+from PySide6.QtCore import Qt, QTimer, Signal
+
+from ..exporters.pdf_exporter import PDFExporter
+from ..exporters.pdf_worker import PDFExportProcess
+
+
+class ExportProgressDialog(QDialog):
+    """PDF出力をバックグラウンドで実行し、進捗を表示するダイアログ
+    
+    モードレスで表示するため、出力中もメインウィンドウを操作できる。
+    """
+    
+    export_finished = Signal(str, object)  # 出力先パス, ページ数
+    export_failed = Signal(str)            # エラーメッセージ
+    export_cancelled = Signal()
+    
+    # 進捗の確認間隔（ミリ秒）
+    POLL_INTERVAL = 100
+    # キャンセル後、強制終了するまでの待ち時間（ミリ秒）
+    KILL_TIMEOUT = 5000
+    
+    def __init__(self, export_process: PDFExportProcess, parent=None):
+        """
+        Args:
+            export_process: 開始前のPDF出力プロセス
+            parent: 親ウィジェット
+        """
+        super().__init__(parent)
+        self.export_process = export_process
+        self.stage_names = [name for name, _ in PDFExporter.STAGES]
+        self.stage_labels = dict(PDFExporter.STAGES)
+        self.poll_timer = QTimer(self)
+        self.poll_timer.timeout.connect(self._poll)
+        self.reap_timer = QTimer(self)
+        self.reap_timer.timeout.connect(self._reap)
+        self.cancel_elapsed = 0
+        self.init_ui()
+    
+    def init_ui(self):
+        """UIの初期化"""
+        self.setWindowTitle("PDFエクスポート")
+        self.setMinimumWidth(400)
+        self.setWindowModality(Qt.NonModal)
+        
+        layout = QVBoxLayout(self)
+        
+        file_label = QLabel(f"<b>出力先:</b> {Path(self.export_process.output_path).name}")
+        layout.addWidget(file_label)
+        
+        self.status_label = QLabel("開始しています...")
+        layout.addWidget(self.status_label)
+        
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, len(self.stage_names))
+        self.progress_bar.setValue(0)
+        layout.addWidget(self.progress_bar)
+        
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        
+        self.cancel_button = QPushButton("キャンセル")
+        self.cancel_button.clicked.connect(self.cancel)
+        button_layout.addWidget(self.cancel_button)
+        
+        layout.addLayout(button_layout)
+    
+    def start(self):
+        """出力を開始してダイアログを表示"""
+        self.export_process.start()
+        self.poll_timer.start(self.POLL_INTERVAL)
+        self.show()
+    
+    def cancel(self):
+        """出力を中止
+        
+        ワーカープロセスの終了は待たずに、終了するまで定期的に確認する
+        （終了後に途中まで書き出したファイルを削除してから閉じる）。
+        """
+        if self.reap_timer.isActive():
+            return
+        self.poll_timer.stop()
+        self.export_process.cancel()
+        self.status_label.setText("中止しています...")
+        self.cancel_button.setEnabled(False)
+        self.cancel_elapsed = 0
+        self.reap_timer.start(self.POLL_INTERVAL)
+    
+    def closeEvent(self, event):
+        """ウィンドウを閉じる時は実行中の出力を中止（終了を確認してから閉じる）"""
+        if self.export_process.is_running() or self.reap_timer.isActive():
+            self.cancel()
+            event.ignore()
+            return
+        event.accept()
+    
+    def _reap(self):
+        """キャンセルしたワーカープロセスの終了を確認"""
+        if not self.export_process.reap_cancelled():
+            self.cancel_elapsed += self.POLL_INTERVAL
+            if self.cancel_elapsed >= self.KILL_TIMEOUT:
+                self.export_process.kill()
+            return
+        self.reap_timer.stop()
+        self.export_cancelled.emit()
+        self.close()
+    
+    def _poll(self):
+        """ワーカープロセスからのメッセージを処理"""
+        for kind, value, detail in self.export_process.poll():
+            if kind == 'progress':
+                self._show_progress(value, detail)
+            elif kind == 'done':
+                self.poll_timer.stop()
+                self.progress_bar.setValue(len(self.stage_names))
+                self.export_finished.emit(value, detail)
+                self.close()
+                return
+            elif kind == 'error':
+                self.poll_timer.stop()
+                self.export_failed.emit(value)
+                self.close()
+                return
+    
+    def _show_progress(self, stage: str, detail):
+        """段階に応じて表示を更新"""
+        if stage not in self.stage_labels:
+            return
+        text = self.stage_labels[stage]
+        if stage == 'pages' and detail is not None:
+            text += f"（{detail} ページ）"
+        self.status_label.setText(text)
+        self.progress_bar.setValue(self.stage_names.index(stage) + 1)
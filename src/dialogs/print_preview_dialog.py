@@ -5,11 +5,12 @@ from PySide6.QtWidgets import (
     QLabel, QComboBox, QSpinBox, QMessageBox
 )
 from PySide6.QtWebEngineWidgets import QWebEngineView
-from PySide6.QtCore import Qt, QUrl, Signal, QTimer, QMarginsF
-from PySide6.QtGui import QPageLayout, QPageSize
+from PySide6.QtCore import Qt, QUrl, Signal, QTimer
 from PySide6.QtPrintSupport import QPrinter, QPrintDialog
 from typing import Dict, Optional
 
+from ..exporters.webengine_pdf import page_layout_from_settings
+
 
 class PrintPreviewDialog(QDialog):
     """印刷プレビューダイアログ"""
@@ -71,42 +72,8 @@ class PrintPreviewDialog(QDialog):
     
     def _apply_print_settings(self):
         """印刷設定をプリンターに適用"""
-        # 用紙サイズ
-        paper_size_map = {
-            'A4': QPageSize.PageSizeId.A4,
-            'A3': QPageSize.PageSizeId.A3,
-            'B4': QPageSize.PageSizeId.B4,
-            'B5': QPageSize.PageSizeId.B5,
-            'Letter': QPageSize.PageSizeId.Letter,
-            'Legal': QPageSize.PageSizeId.Legal,
-        }
-        paper_size = self.settings.get('paper_size', 'A4')
-        page_size_id = paper_size_map.get(paper_size, QPageSize.PageSizeId.A4)
-        
-        # 向き
-        orientation = self.settings.get('orientation', 'portrait')
-        qt_orientation = (QPageLayout.Orientation.Portrait 
-                         if orientation == 'portrait' 
-                         else QPageLayout.Orientation.Landscape)
-        
-        # マージン (mm)
-        left = float(self.settings.get('margin_left', 20))
-        top = float(self.settings.get('margin_top', 20))
-        right = float(self.settings.get('margin_right', 20))
-        bottom = float(self.settings.get('margin_bottom', 20))
-        
-        margins = QMarginsF(left, top, right, bottom)
-        
-        # QPageLayoutを作成（コンストラクタで一括設定）
-        # 引数: PageSize, Orientation, Margins, Units(Millimeter)
-        page_layout = QPageLayout(
-            QPageSize(page_size_id),
-            qt_orientation,
-            margins,
-            QPageLayout.Unit.Millimeter
-        )
-        
-        self.printer.setPageLayout(page_layout)
+        # PDF出力（QtWebEngine）と同じ変換を使う
+        self.printer.setPageLayout(page_layout_from_settings(self.settings))
     
     def _get_settings_info(self) -> str:
         """設定情報の文字列を取得"""
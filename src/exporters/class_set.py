@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+"""クラス分の個別PDF（名簿の番号・氏名を印字）
+
+試験本体は一度だけレンダリングし、表紙と解答用紙の番号・氏名欄に
+生徒ごとの文字だけを描いた薄いページを重ねる。
+生徒ごとに試験全体をレンダリングし直す必要がないため、40人分でも
+1回分のレンダリングとほとんど変わらない時間で出力できる。
+"""
+
+import html
+import io
+import math
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from ..models import Project, ExportOptions, Student, load_roster
+from . import pdf_backends
+
+
+# 番号・氏名欄の目印のid（HTMLExporter・AnswerSheetGenerator が出力する）
+FIELD_PREFIXES = {
+    'student-number': 'number',
+    'student-name': 'name',
+}
+
+
+def student_filename(stem: str, index: int, student: Student) -> str:
+    """生徒ごとの出力ファイル名（ファイル名に使えない文字は置き換える）"""
+    label = '_'.join(part for part in (student.number, student.name) if part) or f'{index + 1:02d}'
+    return re.sub(r'[\\/:*?"<>|\s]+', '_', f'{stem}_{label}') + '.pdf'
+
+
+def student_paths(output_dir: Path, title: str, students: Sequence[Student]) -> List[Path]:
+    """生徒ごとに出力する場合の各生徒の出力先"""
+    stem = title or 'exam'
+    return [Path(output_dir) / student_filename(stem, i, student) for i, student in enumerate(students)]
+
+
+def _compact(writer: 'PdfWriter'):
+    """生徒ごとに複製されたフォント・画像を1つにまとめる（pypdf 5以降）"""
+    if hasattr(writer, 'compress_identical_objects'):
+        writer.compress_identical_objects()
+
+
+def _stamp_students(base_pdf: bytes, overlay_pdf: bytes, field_pages: Sequence[int],
+                    overlay_starts: Sequence[int],
+                    output_paths: Optional[Sequence[str]] = None) -> Optional[bytes]:
+    """試験本体に生徒ごとの番号・氏名のページを重ねる（ワーカープロセスで実行）
+    
+    Args:
+        base_pdf: 試験本体のPDF
+        overlay_pdf: 全生徒分の番号・氏名のページ（生徒ごとに field_pages の枚数ずつ）
+        field_pages: 番号・氏名欄のある本体のページ番号（0始まり）
+        overlay_starts: 担当する生徒それぞれの overlay_pdf での開始ページ
+        output_paths: 生徒ごとの出力先（Noneの場合は1つにまとめたPDFを返す）
+    
+    Returns:
+        まとめたPDFのバイト列（生徒ごとに出力した場合はNone）
+    """
+    from pypdf import PdfReader, PdfWriter
+    
+    overlay = PdfReader(io.BytesIO(overlay_pdf))
+    merged = PdfWriter()
+    
+    for i, overlay_start in enumerate(overlay_starts):
+        writer = merged if output_paths is None else PdfWriter()
+        offset = len(writer.pages)
+        writer.append(PdfReader(io.BytesIO(base_pdf)))
+        for j, page_index in enumerate(field_pages):
+            writer.pages[offset + page_index].merge_page(overlay.pages[overlay_start + j])
+        
+        if output_paths is not None:
+            _compact(writer)
+            with open(output_paths[i], 'wb') as f:
+                writer.write(f)
+    
+    if output_paths is not None:
+        return None
+    output = io.BytesIO()
+    merged.write(output)
+    return output.getvalue()
+
+
+class ClassSetExporter:
+    """名簿の生徒ごとに番号・氏名を印字したPDFを出力するクラス
+    
+    使い方:
+        exporter = ClassSetExporter(PDFExporter(), workers=4)
+        exporter.export(project, load_roster('3-1.csv'), Path('3-1.pdf'), options)
+    """
+    
+    # 印字する文字の大きさと行の高さ（CSSのpx）
+    FONT_SIZE = '12pt'
+    LINE_HEIGHT = 20
+    
+    def __init__(self, pdf_exporter, workers: int = 1):
+        """
+        Args:
+            pdf_exporter: 試験本体のHTML・CSS・レンダリングセッションを提供するPDFExporter
+            workers: 重ね合わせに使うプロセス数
+        """
+        self.pdf_exporter = pdf_exporter
+        self.workers = max(1, workers)
+    
+    @staticmethod
+    def is_available() -> bool:
+        """クラス分の出力が利用可能かチェック（欄の位置の取得にWeasyPrintが必要）"""
+        return pdf_backends.is_available('weasyprint') and pdf_backends.is_available('pypdf')
+    
+    def export(self, project: Project, students: Sequence[Student], output_path: Path,
+               options: Union[ExportOptions, dict] = None, per_student: bool = False,
+               progress_callback: Optional[Callable[[str, Optional[int]], None]] = None) -> List[Path]:
+        """クラス分のPDFを出力
+        
+        Args:
+            project: プロジェクト
+            students: 名簿
+            output_path: 出力先（per_student の場合はディレクトリ）
+            options: エクスポートオプション
+            per_student: 生徒ごとに別のファイルに出力するか
+            progress_callback: 進捗通知コールバック（PDFExporter.STAGES と同じ段階名）
+        
+        Returns:
+            出力したファイルのパス
+        """
+        if not self.is_available():
+            raise ImportError("クラス分の出力には weasyprint と pypdf のインストールが必要です")
+        if not students:
+            raise ValueError("名簿に生徒がいません")
+        
+        options = ExportOptions.coerce(options).replace(format='pdf')
+        
+        def report(stage: str, detail: Optional[int] = None):
+            if progress_callback is not None:
+                progress_callback(stage, detail)
+        
+        # 試験本体は1回だけレンダリングし、番号・氏名欄の位置を取得する
+        report('html')
+        html_content = self.pdf_exporter._get_html_exporter()._generate_html(
+            project, options, inline_styles=False
+        )
+        report('layout')
+        document = self.pdf_exporter.get_session().render(
+            html_content, self.pdf_exporter._document_stylesheets(options)
+        )
+        fields = self.find_fields(document)
+        if not fields:
+            raise ValueError("番号・氏名欄がありません（表紙または解答用紙を含めてください）")
+        field_pages = sorted(fields)
+        base_pdf = document.write_pdf()
+        report('pages', len(document.pages) * len(students))
+        
+        report('write')
+        overlay_pdf = self._render_overlays(document.pages[0], fields, students)
+        
+        if per_student:
+            output_dir = Path(output_path)
+            output_dir.mkdir(parents=True, exist_ok=True)
+            paths = student_paths(output_dir, project.title, students)
+        else:
+            paths = [Path(output_path)]
+        
+        self._stamp(base_pdf, overlay_pdf, field_pages, len(students),
+                    [str(path) for path in paths] if per_student else None, paths[0])
+        return paths
+    
+    @staticmethod
+    def find_fields(document) -> Dict[int, List[Tuple[str, float, float]]]:
+        """レイアウト済みの本体から番号・氏名欄の位置を取得
+        
+        Returns:
+            {ページ番号: [(欄の種類 'number'/'name', x, y), ...]}（座標はCSSのpx）
+        """
+        fields = {}
+        for page_index, page in enumerate(document.pages):
+            for anchor, (x, y) in page.anchors.items():
+                for prefix, kind in FIELD_PREFIXES.items():
+                    if anchor.startswith(prefix):
+                        fields.setdefault(page_index, []).append((kind, x, y))
+        return fields
+    
+    def _render_overlays(self, page, fields: Dict[int, List[Tuple[str, float, float]]],
+                         students: Sequence[Student]) -> bytes:
+        """全生徒分の番号・氏名だけを描いたPDFを1回のレンダリングで生成
+        
+        生徒ごとに、番号・氏名欄のあるページの枚数ずつページを並べる。
+        """
+        pages = []
+        for student in students:
+            for page_index in sorted(fields):
+                values = ''.join(
+                    f'<div class="student-value" style="left: {x:.2f}px; '
+                    f'top: {y - self.LINE_HEIGHT / 2:.2f}px;">'
+                    f'{html.escape(getattr(student, kind))}</div>'
+                    for kind, x, y in fields[page_index]
+                )
+                pages.append(f'<div class="overlay-page">{values}</div>')
+        
+        html_content = f'<!DOCTYPE html><html lang="ja"><body>{"".join(pages)}</body></html>'
+        css_text = f'''@page {{
+            size: {page.width}px {page.height}px;
+            margin: 0;
+        }}
+        
+        body {{
+            margin: 0;
+            font-family: 'MS Mincho', 'Hiragino Mincho ProN', serif;
+        }}
+        
+        .overlay-page {{
+            position: relative;
+            width: {page.width}px;
+            height: {page.height}px;
+            overflow: hidden;
+        }}
+        
+        .overlay-page + .overlay-page {{
+            break-before: page;
+        }}
+        
+        .student-value {{
+            position: absolute;
+            white-space: nowrap;
+            font-size: {self.FONT_SIZE};
+            line-height: {self.LINE_HEIGHT}px;
+        }}'''
+        session = self.pdf_exporter.get_session()
+        key = ('class-set-overlay', page.width, page.height, self.FONT_SIZE, self.LINE_HEIGHT)
+        stylesheets = [session.stylesheet(key, lambda: css_text)]
+        return session.render(html_content, stylesheets).write_pdf()
+    
+    def _stamp(self, base_pdf: bytes, overlay_pdf: bytes, field_pages: List[int],
+               student_count: int, output_paths: Optional[List[str]], merged_path: Path):
+        """生徒を連続した組に分け、各組の重ね合わせを並列に処理"""
+        per_student_pages = len(field_pages)
+        workers = min(self.workers, student_count)
+        chunk_size = math.ceil(student_count / workers)
+        chunks = [range(start, min(start + chunk_size, student_count))
+                  for start in range(0, student_count, chunk_size)]
+        tasks = [(base_pdf, overlay_pdf, field_pages,
+                  [i * per_student_pages for i in chunk],
+                  [output_paths[i] for i in chunk] if output_paths is not None else None)
+                 for chunk in chunks]
+        
+        if workers == 1:
+            results = [_stamp_students(*task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(_stamp_students, *zip(*tasks)))
+        
+        if output_paths is not None:
+            return
+        
+        from pypdf import PdfReader, PdfWriter
+        
+        writer = PdfWriter()
+        for data in results:
+            writer.append(PdfReader(io.BytesIO(data)))
+        _compact(writer)
+        with open(merged_path, 'wb') as f:
+            writer.write(f)
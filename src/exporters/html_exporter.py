@@ -1,65 +1,132 @@
 """HTML出力機能"""
 
+import copy
+import gzip
+import hashlib
+import re
+from collections import OrderedDict
 from pathlib import Path
-from typing import List
+from typing import List, Optional, Sequence, Tuple, Union
 from datetime import datetime
-from ..models import Project, Problem
-from ..utils import MarkdownRenderer, AnswerSheetGenerator
+from ..models import Project, Problem, ExportOptions
+from ..utils import MarkdownRenderer, AnswerSheetGenerator, HTMLBuilder, HTMLMinifier
+from .math_typesetter import MathTypesetter
+from .image_optimizer import ImageOptimizer, content_width_mm
 
 
 class HTMLExporter:
     """HTMLエクスポーター"""
     
-    def __init__(self):
+    # 改ページ（表紙の後・問題ページの間に入れる）
+    PAGE_BREAK = '<div class="page-break"></div>'
+    
+    def __init__(self, max_fragments: int = 512):
+        """
+        Args:
+            max_fragments: キャッシュするHTML断片の最大数
+                （エクスポーターはセッション中使い回すため、古い版の本文の断片を残し続けない）
+        """
         self.renderer = MarkdownRenderer()
         self.answer_generator = AnswerSheetGenerator()
+        self.math_typesetter = MathTypesetter()
+        self.image_optimizer = ImageOptimizer()
+        # 問題本文のHTML断片キャッシュ（LRU。(本文のSHA-256, 断片層フィンガープリント, 画像の表示幅) → HTML）
+        self.max_fragments = max_fragments
+        self._fragment_cache = OrderedDict()
+        # ドキュメントCSSのキャッシュ（(テンプレート層フィンガープリント, 解答用紙の有無) → CSS）
+        self._style_cache = {}
     
-    def export(self, project: Project, output_path: Path, options: dict = None):
-        """プロジェクトをHTMLファイルとして出力（プラットフォーム互換）"""
-        if options is None:
-            options = {}
+    def export(self, project: Project, output_path: Path,
+               options: Union[ExportOptions, dict] = None) -> dict:
+        """プロジェクトをHTMLファイルとして出力（プラットフォーム互換）
+        
+        Args:
+            project: プロジェクト
+            output_path: 出力先パス
+            options: エクスポートオプション（ExportOptions または同じキーの辞書）
+                minify_html: 空白・コメントを除去して出力
+                pretypeset_math: 数式をMathMLに変換して出力（MathJax不要）
+                gzip_output: gzip圧縮版（.html.gz）も出力
+        
+        Returns:
+            出力サイズ情報（バイト単位）
+                original_size: 圧縮前のサイズ
+                output_size: 出力したHTMLのサイズ
+                compressed_size: gzip版のサイズ（出力しない場合はNone）
+        """
+        options = ExportOptions.coerce(options)
         
         html = self._generate_html(project, options)
+        original_size = len(html.encode('utf-8'))
+        
+        if options.minify_html:
+            html = HTMLMinifier().minify(html)
         
         # UTF-8 で保存（改行コード統一、Windows 互換）
-        with open(output_path, 'w', encoding='utf-8', newline='\n') as f:
-            f.write(html)
+        data = html.encode('utf-8')
+        with open(output_path, 'wb') as f:
+            f.write(data)
+        
+        compressed_size = None
+        if options.gzip_output:
+            # mtime=0 で同じ内容なら同じバイト列になるようにする
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+            with open(Path(str(output_path) + '.gz'), 'wb') as f:
+                f.write(compressed)
+            compressed_size = len(compressed)
+        
+        return {
+            'original_size': original_size,
+            'output_size': len(data),
+            'compressed_size': compressed_size
+        }
     
-    def _generate_html(self, project: Project, options: dict) -> str:
-        """HTML生成"""
+    def _generate_html(self, project: Project, options: Union[ExportOptions, dict] = None,
+                       inline_styles: bool = True) -> str:
+        """HTML生成
+        
+        Args:
+            project: プロジェクト
+            options: エクスポートオプション
+            inline_styles: CSSを<style>として埋め込むか
+                （Falseの場合は _document_styles のCSSを別途適用する）
+        """
+        options = ExportOptions.coerce(options)
         cover_html = self._generate_cover(project, options)
         problems_html = self._generate_problems(project.problems, options)
         
         # 解答用紙を生成（オプションで有効な場合）
         answer_sheet_html = ''
-        if options.get('generate_answer_sheet', False):
+        if options.generate_answer_sheet:
             answer_sheet_html = self.answer_generator.generate_answer_sheet_html(
                 project.problems, options
             )
         
-        return self._wrap_document(cover_html, problems_html, answer_sheet_html, project, options)
+        return self._wrap_document(cover_html, problems_html, answer_sheet_html, project, options,
+                                   inline_styles)
     
-    def _generate_cover(self, project: Project, options: dict) -> str:
+    def _generate_cover(self, project: Project, options: ExportOptions) -> str:
         """表紙生成"""
-        show_cover = options.get('show_cover', True)
-        if not show_cover:
+        if not options.show_cover:
             return ""
         
-        title = options.get('exam_title', project.title) or project.title
-        subtitle = options.get('exam_subtitle', '') or ''
-        date = options.get('exam_date', '') or ''
-        school = options.get('school_name', '') or ''
-        grade = options.get('grade', '') or ''
-        subject = options.get('subject', '数学') or '数学'
-        time_limit = options.get('time_limit', '') or ''
-        total_score = options.get('total_score', '') or ''
-        notes = options.get('notes', '') or ''
+        title = options.exam_title or project.title
+        subtitle = options.exam_subtitle
+        date = options.exam_date
+        school = options.school_name
+        grade = options.grade
+        subject = options.subject or '数学'
+        time_limit = options.time_limit
+        total_score = options.total_score
+        notes = options.notes
+        form_label = options.form_label
         
         cover_html = f'''
         <div class="cover-page">
             <div class="cover-content">
                 <h1 class="exam-title">{title}</h1>
                 {f'<p class="exam-subtitle">{subtitle}</p>' if subtitle else ''}
+                {f'<p class="exam-form">{form_label}型</p>' if form_label else ''}
                 <div class="exam-info">
                     {f'<p class="school-name">{school}</p>' if school else ''}
                     {f'<p class="grade">{grade}</p>' if grade else ''}
@@ -75,43 +142,45 @@ class HTMLExporter:
                     <table>
                         <tr>
                             <td class="label">組番号</td>
-                            <td class="field"></td>
+                            <td class="field"><div class="student-field" id="student-number-cover"></div></td>
                         </tr>
                         <tr>
                             <td class="label">氏名</td>
-                            <td class="field"></td>
+                            <td class="field"><div class="student-field" id="student-name-cover"></div></td>
                         </tr>
                     </table>
                 </div>
             </div>
         </div>
-        <div class="page-break"></div>
+        {self.PAGE_BREAK}
         '''
         
         return cover_html
     
-    def _generate_problems(self, problems: List[Problem], options: dict) -> str:
+    def _generate_problems(self, problems: List[Problem], options: ExportOptions) -> str:
         """問題生成（1-2問/ページ）"""
-        problems_html = ''
+        return self.PAGE_BREAK.join(self._generate_problem_pages(problems, options))
+    
+    def _generate_problem_pages(self, problems: List[Problem], options: ExportOptions) -> List[str]:
+        """問題をページ単位のHTMLに分けて生成"""
+        pages = []
+        page_html = HTMLBuilder()
         
-        show_problem_numbers = options.get('show_problem_numbers', True)
-        problems_per_page = options.get('problems_per_page', 1)
+        show_problem_numbers = options.show_problem_numbers
+        problems_per_page = options.problems_per_page
         
         # 日本語の問題番号変換
         japanese_numbers = ['一', '二', '三', '四', '五', '六', '七', '八', '九', '十']
         
+        form_label = options.form_label
+        
         for i, problem in enumerate(problems, 1):
-            problem_html = self.renderer.render(problem.content)
-            
-            import re
-            body_match = re.search(r'<body>(.*?)</body>', problem_html, re.DOTALL)
-            if body_match:
-                problem_content = body_match.group(1)
-            else:
-                problem_content = problem_html
+            problem_content = self._render_problem_fragment(problem, options)
             
             if (i - 1) % problems_per_page == 0:
-                problems_html += '<div class="problem-page">'
+                page_html.add('<div class="problem-page">')
+                if form_label:
+                    page_html.add(f'<div class="form-header">{form_label}型</div>')
             
             if show_problem_numbers:
                 # 日本語の問題番号を生成
@@ -134,7 +203,7 @@ class HTMLExporter:
                     elif problem_obj.problem_type == 'optional':
                         problem_type_display = '（選択問題）'
                 
-                problems_html += f'''
+                page_html.add(f'''
                 <div class="problem-container">
                     <div class="problem-header">
                         <h2 class="problem-title">{problem_title} {problem_type_display}</h2>
@@ -144,30 +213,244 @@ class HTMLExporter:
                         {problem_content}
                     </div>
                 </div>
-                '''
+                ''')
             else:
-                problems_html += f'''
+                page_html.add(f'''
                 <div class="problem-container">
                     <div class="problem-content">
                         {problem_content}
                     </div>
                 </div>
-                '''
+                ''')
             
             if i % problems_per_page == 0 or i == len(problems):
-                problems_html += '</div>'
-                if i < len(problems):
-                    problems_html += '<div class="page-break"></div>'
+                page_html.add('</div>')
+                pages.append(page_html.build())
+                page_html.clear()
+        
+        return pages
+    
+    def _render_problem_fragment(self, problem: Problem, options: ExportOptions) -> str:
+        """問題本文をHTML断片に変換（同じ内容は再レンダリングしない）"""
+        image_width = self._image_width_mm(options)
+        content = problem.content
+        key = (hashlib.sha256(content.encode('utf-8')).hexdigest(), options.fragment_fingerprint,
+               image_width)
+        
+        fragment = self._fragment_cache.get(key)
+        if fragment is not None:
+            self._fragment_cache.move_to_end(key)
+        else:
+            problem_html = self.renderer.render(content)
+            body_match = re.search(r'<body>(.*?)</body>', problem_html, re.DOTALL)
+            if body_match:
+                fragment = body_match.group(1)
+            else:
+                fragment = problem_html
+            
+            if self._use_pretypeset_math(options):
+                fragment = self.math_typesetter.typeset_html(fragment)
+            
+            if image_width is not None:
+                fragment = self.image_optimizer.optimize_html(
+                    fragment, image_width, options.image_dpi, options.image_quality
+                )
+            
+            self._fragment_cache[key] = fragment
+            if len(self._fragment_cache) > self.max_fragments:
+                self._fragment_cache.popitem(last=False)
         
-        return problems_html
+        return fragment
+    
+    def generate_sections(self, project: Project, options: Union[ExportOptions, dict] = None,
+                          inline_styles: bool = True,
+                          pages_per_section: int = 1) -> List[Tuple[str, str]]:
+        """改ページ位置で分割した独立のHTMLドキュメントを生成
+        
+        表紙・問題ページ・解答用紙は必ず改ページで区切られるため、
+        それぞれを別々にレイアウトしても一括の場合と同じページ割りになる。
+        
+        Args:
+            project: プロジェクト
+            options: エクスポートオプション
+            inline_styles: CSSを<style>として埋め込むか
+            pages_per_section: 1セクションにまとめる問題ページ数
+        
+        Returns:
+            (セクション名, HTML文字列) のリスト（出力順）
+        """
+        options = ExportOptions.coerce(options)
+        sections = []
+        
+        def wrap(cover_html='', problems_html='', answer_sheet_html=''):
+            # セクション末尾の改ページは単独でレイアウトすると空白ページになるため除く
+            return self._wrap_document(self._strip_trailing_page_break(cover_html),
+                                       self._strip_trailing_page_break(problems_html),
+                                       self._strip_trailing_page_break(answer_sheet_html),
+                                       project, options, inline_styles)
+        
+        if options.show_cover:
+            sections.append(('cover', wrap(cover_html=self._generate_cover(project, options))))
+        
+        pages = self._generate_problem_pages(project.problems, options)
+        for start in range(0, len(pages), pages_per_section):
+            group = pages[start:start + pages_per_section]
+            name = f'pages-{start + 1}' if len(group) == 1 else f'pages-{start + 1}-{start + len(group)}'
+            sections.append((name, wrap(problems_html=self.PAGE_BREAK.join(group))))
+        
+        if options.generate_answer_sheet:
+            answer_sheet_html = self.answer_generator.generate_answer_sheet_html(
+                project.problems, options
+            )
+            sections.append(('answer-sheet', wrap(answer_sheet_html=answer_sheet_html)))
+        
+        return sections
+    
+    @classmethod
+    def _strip_trailing_page_break(cls, body_html: str) -> str:
+        """末尾の改ページを除く"""
+        body_html = body_html.rstrip()
+        if body_html.endswith(cls.PAGE_BREAK):
+            body_html = body_html[:-len(cls.PAGE_BREAK)]
+        return body_html
+    
+    def generate_forms(self, project: Project, forms: List[Union[dict, Sequence[int]]],
+                       options: Union[ExportOptions, dict] = None,
+                       inline_styles: bool = True) -> List[str]:
+        """問題順・問題構成の異なる複数の型（A型・B型…）のHTMLを生成
+        
+        各問題のレンダリングは1回だけ行い、全ての型で断片を再利用する。
+        
+        Args:
+            project: プロジェクト
+            forms: 型の定義リスト。各要素は問題インデックス（0始まり）の並び、
+                または {'label': 'A', 'problems': [2, 0, 1], 'options': {...}} 形式の辞書
+                （label省略時はA, B, C…、options は型ごとに上書きする項目の辞書）
+            options: 全ての型に共通のエクスポートオプション
+            inline_styles: CSSを<style>として埋め込むか
+        
+        Returns:
+            型ごとのHTML文字列のリスト
+        """
+        return [self._generate_html(form_project, form_options, inline_styles)
+                for _, form_project, form_options in self.form_projects(project, forms, options)]
+    
+    def form_projects(self, project: Project, forms: List[Union[dict, Sequence[int]]],
+                      options: Union[ExportOptions, dict] = None) -> List[tuple]:
+        """型ごとのプロジェクトとエクスポートオプションを取得
+        
+        Args:
+            project: プロジェクト
+            forms: 型の定義リスト（generate_forms と同じ形式）
+            options: 全ての型に共通のエクスポートオプション
+        
+        Returns:
+            (型名, 問題を並べ替えたプロジェクト, 型ごとの上書きを反映した ExportOptions) のリスト
+        """
+        options = ExportOptions.coerce(options)
+        
+        result = []
+        for label, order, form_options in self._normalize_forms(project, forms):
+            form_project = copy.copy(project)
+            form_project.problems = [project.problems[index] for index in order]
+            result.append((label, form_project, options.replace(**form_options, form_label=label)))
+        
+        return result
+    
+    def export_forms(self, project: Project, output_path: Path,
+                     forms: List[Union[dict, Sequence[int]]],
+                     options: Union[ExportOptions, dict] = None) -> List[Path]:
+        """複数の型をHTMLファイルとして出力
+        
+        出力ファイル名は「<output_pathの名前>_<型名>.html」となる。
+        
+        Returns:
+            出力したファイルパスのリスト
+        """
+        output_path = Path(output_path)
+        paths = []
+        
+        for label, html in zip(self.form_labels(project, forms),
+                               self.generate_forms(project, forms, options)):
+            form_path = output_path.with_name(f"{output_path.stem}_{label}{output_path.suffix}")
+            with open(form_path, 'w', encoding='utf-8', newline='\n') as f:
+                f.write(html)
+            paths.append(form_path)
+        
+        return paths
+    
+    def form_labels(self, project: Project, forms: List[Union[dict, Sequence[int]]]) -> List[str]:
+        """型名のリストを取得"""
+        return [label for label, _, _ in self._normalize_forms(project, forms)]
+    
+    def _normalize_forms(self, project: Project, forms: List[Union[dict, Sequence[int]]]) -> list:
+        """型の定義を (型名, 問題インデックス列, 上書きオプション) に正規化"""
+        normalized = []
+        for i, form in enumerate(forms):
+            default_label = chr(ord('A') + i) if i < 26 else str(i + 1)
+            if isinstance(form, dict):
+                label = form.get('label') or default_label
+                order = list(form.get('problems', range(len(project.problems))))
+                form_options = form.get('options', {})
+            else:
+                label = default_label
+                order = list(form)
+                form_options = {}
+            
+            for index in order:
+                if not 0 <= index < len(project.problems):
+                    raise ValueError(f"型 {label} の問題番号が範囲外です: {index}")
+            
+            normalized.append((label, order, form_options))
+        
+        return normalized
+    
+    def _use_pretypeset_math(self, options: ExportOptions) -> bool:
+        """数式を事前組版するかどうか（ライブラリがない場合はMathJaxで描画）"""
+        return options.pretypeset_math and self.math_typesetter.is_available()
+    
+    def _image_width_mm(self, options: ExportOptions) -> Optional[float]:
+        """画像を縮小する場合は本文領域の幅（mm）、縮小しない場合はNone"""
+        if not options.image_dpi or not self.image_optimizer.is_available():
+            return None
+        return content_width_mm(options.page_size, options.margin)
+    
+    def _mathjax_scripts(self) -> str:
+        """MathJax読み込み用スクリプト"""
+        return '''<script src="https://polyfill.io/v3/polyfill.min.js?features=es6"></script>
+    <script id="MathJax-script" async src="https://cdn.jsdelivr.net/npm/mathjax@3/es5/tex-mml-chtml.js"></script>
+    <script>
+        MathJax = {
+            tex: {
+                inlineMath: [['$', '$']],
+                displayMath: [['$$', '$$']],
+                processEscapes: true,
+                packages: {'[+]': ['noerrors']}
+            },
+            options: {
+                skipHtmlTags: ['script', 'noscript', 'style', 'textarea', 'pre']
+            },
+            startup: {
+                pageReady: () => {
+                    return MathJax.startup.defaultPageReady().then(() => {
+                        console.log('MathJax loaded successfully');
+                    });
+                }
+            }
+        };
+    </script>'''
     
     def _wrap_document(self, cover_html: str, problems_html: str, 
-                       answer_sheet_html: str, project: Project, options: dict) -> str:
+                       answer_sheet_html: str, project: Project, options: ExportOptions,
+                       inline_styles: bool = True) -> str:
         """完全なHTMLドキュメントを生成"""
-        font_size = options.get('font_size', 12)
-        line_spacing = options.get('line_spacing', 1.8)
-        margin = options.get('margin', '20mm')
-        page_size = options.get('page_size', 'A4')
+        # 事前組版した場合はスクリプトを一切含めない
+        scripts = '' if self._use_pretypeset_math(options) else self._mathjax_scripts()
+        styles = ''
+        if inline_styles:
+            styles = f'''    <style>
+{self._document_styles(options, bool(answer_sheet_html))}
+    </style>'''
         
         return f'''<!DOCTYPE html>
 <html lang="ja">
@@ -175,30 +458,29 @@ class HTMLExporter:
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>{project.title}</title>
-    <script src="https://polyfill.io/v3/polyfill.min.js?features=es6"></script>
-    <script id="MathJax-script" async src="https://cdn.jsdelivr.net/npm/mathjax@3/es5/tex-mml-chtml.js"></script>
-    <script>
-        MathJax = {{
-            tex: {{
-                inlineMath: [['$', '$']],
-                displayMath: [['$$', '$$']],
-                processEscapes: true,
-                packages: {{'[+]': ['noerrors']}}
-            }},
-            options: {{
-                skipHtmlTags: ['script', 'noscript', 'style', 'textarea', 'pre']
-            }},
-            startup: {{
-                pageReady: () => {{
-                    return MathJax.startup.defaultPageReady().then(() => {{
-                        console.log('MathJax loaded successfully');
-                    }});
-                }}
-            }}
-        }};
-    </script>
-    <style>
-        @media print {{
+    {scripts}
+{styles}
+</head>
+<body>
+    {cover_html}
+    {problems_html}
+    {answer_sheet_html}
+</body>
+</html>'''
+    
+    def _document_styles(self, options: ExportOptions, include_answer_sheet: bool) -> str:
+        """ドキュメント全体のCSSを生成（テンプレート層のオプションごとにキャッシュ）"""
+        key = (options.template_fingerprint, include_answer_sheet)
+        styles = self._style_cache.get(key)
+        if styles is not None:
+            return styles
+        
+        font_size = options.font_size
+        line_spacing = options.line_spacing
+        margin = options.margin
+        page_size = options.page_size
+        
+        styles = f'''        @media print {{
             .page-break {{
                 page-break-after: always;
                 break-after: page;
@@ -253,6 +535,15 @@ class HTMLExporter:
             margin-bottom: 40px;
         }}
         
+        .exam-form {{
+            display: inline-block;
+            font-size: 16pt;
+            font-weight: bold;
+            border: 2px solid #000;
+            padding: 4px 20px;
+            margin-bottom: 30px;
+        }}
+        
         .exam-info {{
             margin: 40px 0;
             font-size: 12pt;
@@ -326,6 +617,13 @@ class HTMLExporter:
             padding: 25mm 20mm;
         }}
         
+        .form-header {{
+            text-align: right;
+            font-size: 10pt;
+            font-weight: bold;
+            margin-bottom: 10px;
+        }}
+        
         .problem-container {{
             margin-bottom: 50px;
         }}
@@ -459,12 +757,31 @@ class HTMLExporter:
             }}
         }}
         
-        {self.answer_generator.get_answer_sheet_styles() if answer_sheet_html else ''}
-    </style>
-</head>
-<body>
-    {cover_html}
-    {problems_html}
-    {answer_sheet_html}
-</body>
-</html>'''
+        {self.page_number_styles() if options.page_numbers else ''}
+        
+        {self.answer_generator.get_answer_sheet_styles() if include_answer_sheet else ''}'''
+        self._style_cache[key] = styles
+        return styles
+    
+    @staticmethod
+    def page_number_styles() -> str:
+        """ページ番号（フッター）のCSS
+        
+        番号は表紙を含む通しページ番号で、表紙には表示しない。
+        """
+        return '''@page {
+            @bottom-center {
+                content: counter(page) " / " counter(pages);
+                font-size: 9pt;
+            }
+        }
+        
+        @page cover {
+            @bottom-center {
+                content: none;
+            }
+        }
+        
+        .cover-page {
+            page: cover;
+        }'''
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""埋め込み画像の縮小・再圧縮（エクスポート時）
+
+スマートフォンで撮影した写真をそのまま貼り付けると、数千万画素の画像が
+HTML・PDFに埋め込まれ、ファイルサイズと出力時間が大きく増える。
+印刷される幅と解像度（DPI）から必要な画素数を求め、それを超える画像だけを縮小する。
+"""
+
+import base64
+import hashlib
+import io
+import math
+import re
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+# 画像処理ライブラリの動的インポート
+try:
+    from PIL import Image, ImageOps
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+
+# 用紙の幅（mm）
+PAGE_WIDTHS_MM = {
+    'A3': 297.0,
+    'A4': 210.0,
+    'A5': 148.0,
+    'B4': 257.0,
+    'B5': 182.0,
+    'Letter': 215.9,
+    'Legal': 215.9,
+}
+
+# CSSの長さの単位（mm換算）
+_UNIT_MM = {
+    'mm': 1.0,
+    'cm': 10.0,
+    'in': 25.4,
+    'pt': 25.4 / 72,
+    'px': 25.4 / 96,
+}
+
+# CSSの1pxは1/96インチ
+CSS_PX_PER_INCH = 96
+
+
+def _length_to_mm(value: str) -> float:
+    """CSSの長さ（'20mm' 等）をmmに変換（解釈できない値は0）"""
+    match = re.fullmatch(r'([\d.]+)\s*([a-z]*)', value.strip())
+    if not match:
+        return 0.0
+    number, unit = match.groups()
+    try:
+        return float(number) * _UNIT_MM.get(unit or 'px', 0.0)
+    except ValueError:
+        return 0.0
+
+
+def content_width_mm(page_size: str, margin: str) -> float:
+    """本文領域の幅（用紙の幅から左右の余白を除いたもの）
+    
+    Args:
+        page_size: 用紙サイズ（'A4' 等、不明な場合はA4として扱う）
+        margin: CSSの margin 指定（'20mm' や '15mm 20mm' 等）
+    
+    Returns:
+        本文領域の幅（mm）
+    """
+    width = PAGE_WIDTHS_MM.get(page_size.strip(), PAGE_WIDTHS_MM['A4'])
+    
+    values = margin.split()
+    if len(values) == 1:
+        left = right = values[0]
+    elif len(values) in (2, 3):
+        left = right = values[1]
+    elif len(values) == 4:
+        right, left = values[1], values[3]
+    else:
+        return width
+    
+    return max(width - _length_to_mm(left) - _length_to_mm(right), 1.0)
+
+
+class ImageOptimizer:
+    """HTML中の埋め込み画像（data URI）を印刷サイズに合わせて縮小・再圧縮するクラス
+    
+    画像ごとに一度だけデコードし、結果は (元画像のハッシュ, 目標の幅, 画質) を
+    キーにキャッシュする。同じ画像が複数の問題や型に現れても処理は1回で済む。
+    """
+    
+    # 処理対象の画像形式（SVGはベクター画像なので対象外）
+    IMG_PATTERN = re.compile(r'<img\b[^>]*>', re.IGNORECASE)
+    SRC_PATTERN = re.compile(
+        r'src=(["\'])data:image/(png|jpeg|jpg|gif|bmp|webp);base64,([A-Za-z0-9+/=\s]+)\1',
+        re.IGNORECASE
+    )
+    WIDTH_PATTERN = re.compile(r'\bwidth=(["\']?)(\d+(?:\.\d+)?)(px)?\1(?=[\s/>])', re.IGNORECASE)
+    
+    # PNGのまま保存する色数の上限（図・グラフ等の少色画像）
+    PNG_MAX_COLORS = 256
+    
+    def __init__(self, max_entries: int = 256):
+        """
+        Args:
+            max_entries: キャッシュする画像の最大数
+        """
+        self.max_entries = max_entries
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def is_available(self) -> bool:
+        """画像の縮小が利用可能かチェック"""
+        return PIL_AVAILABLE
+    
+    def optimize_html(self, content: str, max_width_mm: float, dpi: int, quality: int = 85) -> str:
+        """HTML中の埋め込み画像をすべて縮小・再圧縮
+        
+        Args:
+            content: HTML断片
+            max_width_mm: 画像が表示される領域の幅（mm）
+            dpi: 印刷時の解像度
+            quality: JPEGの画質（1〜95）
+        
+        Returns:
+            画像を置き換えたHTML
+        """
+        if not PIL_AVAILABLE:
+            raise ImportError("Pillowがインストールされていません")
+        
+        def replace_img(match):
+            tag = match.group(0)
+            src_match = self.SRC_PATTERN.search(tag)
+            if src_match is None:
+                return tag
+            
+            width_match = self.WIDTH_PATTERN.search(tag)
+            display_mm = max_width_mm
+            if width_match:
+                display_mm = min(float(width_match.group(2)) * 25.4 / CSS_PX_PER_INCH, max_width_mm)
+            
+            data = base64.b64decode(src_match.group(3))
+            result = self.optimize_image(data, display_mm, dpi, quality)
+            if result is None:
+                return tag
+            mime_type, optimized = result
+            src = f'src="data:{mime_type};base64,{base64.b64encode(optimized).decode("ascii")}"'
+            return tag[:src_match.start()] + src + tag[src_match.end():]
+        
+        return self.IMG_PATTERN.sub(replace_img, content)
+    
+    def optimize_image(self, data: bytes, display_mm: float, dpi: int,
+                       quality: int = 85) -> Optional[Tuple[str, bytes]]:
+        """画像1枚を縮小・再圧縮
+        
+        Args:
+            data: 元の画像データ
+            display_mm: 表示幅の上限（mm、width属性がない場合は本文領域の幅）
+            dpi: 印刷時の解像度
+            quality: JPEGの画質
+        
+        Returns:
+            (MIMEタイプ, 画像データ)。元の画像のままでよい場合はNone
+        """
+        target_px = max(1, math.ceil(display_mm / 25.4 * dpi))
+        key = (hashlib.sha256(data).hexdigest(), target_px, quality)
+        
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return self._cache[key]
+        
+        self.misses += 1
+        result = self._process(data, target_px, quality)
+        self._cache[key] = result
+        if len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return result
+    
+    def _process(self, data: bytes, target_px: int, quality: int) -> Optional[Tuple[str, bytes]]:
+        """デコード・縮小・再エンコード（変換できない画像はNone）"""
+        try:
+            image = Image.open(io.BytesIO(data))
+            # アニメーションGIF等は縮小すると動きが失われるため対象外
+            if getattr(image, 'n_frames', 1) > 1:
+                return None
+            image.load()
+        except Exception:
+            return None
+        
+        # 再エンコードでEXIFが失われるため、撮影時の向きを画素に反映しておく
+        image = ImageOps.exif_transpose(image)
+        
+        # 拡大はしない（元の画素数が足りない画像はそのまま）
+        resized = image.width > target_px
+        if resized:
+            height = max(1, round(image.height * target_px / image.width))
+            image = image.resize((target_px, height), Image.LANCZOS)
+        
+        mime_type, encoded = self._encode(image, quality)
+        if not resized and len(encoded) >= len(data):
+            return None
+        return mime_type, encoded
+    
+    def _encode(self, image: 'Image.Image', quality: int) -> Tuple[str, bytes]:
+        """内容に応じてJPEG（写真）かPNG（透過・少色の図）で保存"""
+        has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+        few_colors = image.getcolors(self.PNG_MAX_COLORS) is not None
+        
+        output = io.BytesIO()
+        if has_alpha or few_colors:
+            if image.mode not in ('1', 'L', 'LA', 'P', 'RGB', 'RGBA'):
+                image = image.convert('RGBA' if has_alpha else 'RGB')
+            image.save(output, format='PNG', optimize=True)
+            return 'image/png', output.getvalue()
+        
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        image.save(output, format='JPEG', quality=quality, optimize=True, progressive=True)
+        return 'image/jpeg', output.getvalue()
+    
+    def clear(self):
+        """キャッシュを破棄"""
+        self._cache.clear()
+        self.hits = 0
+        self.misses = 0
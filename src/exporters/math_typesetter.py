@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""数式の事前組版（エクスポート時にMathMLへ変換）"""
+
+import html
+import re
+from functools import lru_cache
+
+# MathML変換ライブラリの動的インポート
+try:
+    from latex2mathml.converter import convert as latex_to_mathml
+    LATEX2MATHML_AVAILABLE = True
+except ImportError:
+    LATEX2MATHML_AVAILABLE = False
+
+
+@lru_cache(maxsize=4096)
+def _typeset_formula(tex: str, display: bool) -> str:
+    """数式1つをMathMLに変換（数式ごとにキャッシュ）
+    
+    変換できない数式はTeXソースをそのまま表示する。
+    """
+    try:
+        return latex_to_mathml(tex.strip(), display='block' if display else 'inline')
+    except Exception:
+        source = f'$${tex}$$' if display else f'${tex}$'
+        return f'<code class="math-source">{html.escape(source)}</code>'
+
+
+class MathTypesetter:
+    """MarkdownRendererが出力した数式をMathMLに置き換えるクラス
+    
+    MathMLはブラウザがネイティブに描画するため、出力したHTMLは
+    MathJaxを読み込まずに（オフラインでも）即座に表示できる。
+    """
+    
+    # MarkdownRenderer._restore_math が出力する形式
+    DISPLAY_PATTERN = re.compile(r'<div class="math-display">\$\$(.*?)\$\$</div>', re.DOTALL)
+    INLINE_PATTERN = re.compile(r'<span class="math-inline">\$(.*?)\$</span>', re.DOTALL)
+    
+    def is_available(self) -> bool:
+        """事前組版が利用可能かチェック"""
+        return LATEX2MATHML_AVAILABLE
+    
+    def typeset(self, tex: str, display: bool = False) -> str:
+        """TeX数式をMathMLに変換
+        
+        Args:
+            tex: TeX数式（$記号を除いたもの）
+            display: ディスプレイ数式かどうか
+        
+        Returns:
+            MathMLのHTML文字列
+        """
+        if not LATEX2MATHML_AVAILABLE:
+            raise ImportError("latex2mathmlがインストールされていません")
+        return _typeset_formula(tex, display)
+    
+    def typeset_html(self, content: str) -> str:
+        """HTML中の数式をすべてMathMLに置き換え
+        
+        Args:
+            content: MarkdownRendererで変換したHTML
+        
+        Returns:
+            数式をMathMLに置き換えたHTML
+        """
+        content = self.DISPLAY_PATTERN.sub(
+            lambda m: f'<div class="math-display">{self.typeset(m.group(1), True)}</div>',
+            content
+        )
+        return self.INLINE_PATTERN.sub(
+            lambda m: f'<span class="math-inline">{self.typeset(m.group(1), False)}</span>',
+            content
+        )
+    
+    @staticmethod
+    def cache_info():
+        """変換キャッシュの統計を取得"""
+        return _typeset_formula.cache_info()
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""PDF出力ライブラリの検出（必要になった時に一度だけ）
+
+weasyprint は読み込むだけで cairo・pango・fonttools 等を初期化するため、
+起動時に import するとPDFを出力しない場合でもアプリの起動が遅くなる。
+ライブラリは最初に問い合わせがあった時（またはメインウィンドウの表示後に
+バックグラウンドで）一度だけ読み込み、結果をプロセス内で保持する。
+"""
+
+import importlib
+import threading
+from typing import Dict, Optional
+
+# 検出するライブラリ（名前 → 読み込むモジュール）
+BACKEND_MODULES = {
+    'weasyprint': ('weasyprint', 'weasyprint.text.fonts'),
+    'xhtml2pdf': ('xhtml2pdf.pisa',),
+    'pypdf': ('pypdf',),
+}
+
+# 検出結果（名前 → 利用可能か）と、利用できない理由
+_results: Dict[str, bool] = {}
+_errors: Dict[str, str] = {}
+_locks: Dict[str, threading.Lock] = {}
+
+
+def is_available(name: str) -> bool:
+    """ライブラリが利用可能かチェック（初回のみ実際に読み込む）
+    
+    Args:
+        name: BACKEND_MODULES のいずれか
+    
+    Returns:
+        利用可能かどうか
+    """
+    if name in _results:
+        return _results[name]
+    
+    # バックグラウンドで検出中の場合は完了を待つ
+    with _locks.setdefault(name, threading.Lock()):
+        if name not in _results:
+            try:
+                for module in BACKEND_MODULES[name]:
+                    importlib.import_module(module)
+                _results[name] = True
+            except (ImportError, OSError) as e:
+                # weasyprint はネイティブライブラリ（cairo等）がない場合に OSError になる
+                _errors[name] = f"{type(e).__name__}: {e}"
+                _results[name] = False
+    return _results[name]
+
+
+def unavailable_reason(name: str) -> Optional[str]:
+    """利用できない理由（検出前・利用可能な場合はNone）"""
+    return _errors.get(name)
+
+
+def is_probed(name: str) -> bool:
+    """検出が済んでいるか"""
+    return name in _results
+
+
+def probe_all():
+    """すべてのライブラリを検出"""
+    for name in BACKEND_MODULES:
+        is_available(name)
+
+
+def start_background_probe() -> threading.Thread:
+    """バックグラウンドのスレッドですべてのライブラリを検出
+    
+    最初のPDF出力時に待たされないよう、メインウィンドウの表示後に呼び出す。
+    """
+    thread = threading.Thread(target=probe_all, name="pdf-backend-probe", daemon=True)
+    thread.start()
+    return thread
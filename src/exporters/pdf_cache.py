@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""レンダリング済みPDFセクションのキャッシュ
+
+問題ページごとのHTMLとテンプレート層のCSSが同じなら、レイアウト結果のPDFも同じになる。
+一部の問題だけを修正して再出力する場合に、変更のないページをレイアウトし直さずに
+再利用する。PDF出力は毎回別プロセスで行うため、キャッシュはディスクに保存する。
+
+キャッシュはアプリを更新しても残るので、キーにはオプションの値ではなく
+CSSの本文とWeasyPrintの版を含める（CSSの定義やレイアウトエンジンが変われば別のキーになる）。
+"""
+
+import functools
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+
+@functools.lru_cache(maxsize=None)
+def weasyprint_version() -> str:
+    """インストールされているWeasyPrintの版（WeasyPrintを import せずにパッケージ情報から取得）"""
+    try:
+        from importlib import metadata
+        return metadata.version('weasyprint')
+    except Exception:
+        # パッケージ情報がない（importlib.metadata のない環境・凍結したアプリ等）
+        try:
+            import weasyprint
+            return weasyprint.__version__
+        except ImportError:
+            return ''
+
+
+class PDFSectionCache:
+    """セクションのHTML・CSSのフィンガープリントをキーにしたPDFキャッシュ
+    
+    エントリは1ファイル1セクションで、参照のたびに更新日時を更新し、
+    上限を超えたら古いものから削除する。
+    """
+    
+    DEFAULT_DIR = Path.home() / ".math_exam_creator" / "pdf_cache"
+    
+    def __init__(self, cache_dir: Optional[Path] = None, max_entries: int = 1000):
+        """
+        Args:
+            cache_dir: キャッシュの保存先（省略時は設定ディレクトリ内）
+            max_entries: 保持するセクション数の上限
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else self.DEFAULT_DIR
+        self.max_entries = max_entries
+    
+    @staticmethod
+    def key_for(html_content: str, css_text: str, renderer_version: Optional[str] = None) -> str:
+        """セクションのキャッシュキーを生成
+        
+        Args:
+            html_content: セクションのHTML
+            css_text: 適用するCSSの本文
+            renderer_version: レイアウトエンジンの版（省略時はインストールされているWeasyPrintの版）
+        """
+        if renderer_version is None:
+            renderer_version = weasyprint_version()
+        digest = hashlib.sha256(renderer_version.encode('utf-8'))
+        for part in (css_text, html_content):
+            digest.update(b'\0')
+            digest.update(part.encode('utf-8'))
+        return digest.hexdigest()
+    
+    def get(self, key: str) -> Optional[bytes]:
+        """キャッシュ済みのPDFを取得（ない場合はNone）"""
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+        # 最近使ったものを残すため更新日時を更新
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+    
+    def put(self, key: str, data: bytes):
+        """PDFをキャッシュに保存
+        
+        並列に出力しているプロセスと同じキーを書き込む可能性があるため、
+        一時ファイルに書いてから置き換える。
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, self._path(key))
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+    
+    def prune(self):
+        """上限を超えた古いエントリを削除"""
+        try:
+            entries = sorted(self.cache_dir.glob('*.pdf'), key=lambda p: p.stat().st_mtime)
+        except OSError:
+            return
+        for path in entries[:max(0, len(entries) - self.max_entries)]:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+    
+    def clear(self):
+        """キャッシュをすべて削除"""
+        for path in self.cache_dir.glob('*.pdf'):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+    
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pdf"
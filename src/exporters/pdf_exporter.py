@@ -1,66 +1,134 @@
 # -*- coding: utf-8 -*-
 """PDF出力機能"""
 
+import importlib.util
+import sys
 from pathlib import Path
-from typing import Optional
-from ..models import Project
+from typing import Callable, List, Optional, Sequence, Union
+from ..models import Project, ExportOptions
+from . import pdf_backends
+from .pdf_session import PDFRenderSession, get_default_session
+from .pdf_sections import SectionedPDFRenderer
+from .pdf_cache import PDFSectionCache
 
-# PDF生成ライブラリの動的インポート
-try:
-    from weasyprint import HTML, CSS
-    WEASYPRINT_AVAILABLE = True
-except ImportError:
-    WEASYPRINT_AVAILABLE = False
 
-try:
-    from xhtml2pdf import pisa
-    XHTML2PDF_AVAILABLE = True
-except ImportError:
-    XHTML2PDF_AVAILABLE = False
+# 進捗通知コールバック（段階名, 詳細）
+ProgressCallback = Callable[[str, Optional[int]], None]
+
+
+def webengine_usable() -> bool:
+    """QtWebEngineでPDF出力できるか（QApplicationが起動しているプロセスのみ）
+    
+    CLI等からQtを読み込んでしまわないよう、既に読み込まれている場合だけ確認する。
+    """
+    qt_widgets = sys.modules.get('PySide6.QtWidgets')
+    if qt_widgets is None or qt_widgets.QApplication.instance() is None:
+        return False
+    return importlib.util.find_spec('PySide6.QtWebEngineCore') is not None
 
 
 class PDFExporter:
     """PDFエクスポーター"""
     
-    def __init__(self):
+    # 進捗の段階（段階名, 表示名）
+    STAGES = [
+        ('html', 'HTMLを生成しています'),
+        ('layout', 'ページをレイアウトしています'),
+        ('pages', 'ページ数を確定しました'),
+        ('write', 'PDFを書き出しています'),
+    ]
+    
+    # 自動選択時の優先順位
+    # QtWebEngine は MathJax を実行できるが、並列・再利用・分割レンダリングと中断に対応せず、
+    # MathJax をCDNから読み込むため、WeasyPrint がなければ使う（明示的に選ぶこともできる）
+    ENGINE_PRIORITY = ('weasyprint', 'webengine', 'xhtml2pdf')
+    
+    def __init__(self, session: Optional[PDFRenderSession] = None,
+                 cache: Optional[PDFSectionCache] = None,
+                 print_settings: Optional[dict] = None):
+        """
+        Args:
+            session: WeasyPrintのレンダリングセッション
+                （省略時はプロセス共有の既定セッションを使う）
+            cache: レンダリング済みページのキャッシュ
+                （省略時は pdf_cache オプション指定時に既定の保存先を使う）
+            print_settings: 印刷設定（QtWebEngineでの用紙の向き・余白に使用）
+        """
         self.html_exporter = None
+        self.session = session
+        self.cache = cache
+        self.print_settings = print_settings or {}
+        self.section_renderer = None
     
-    def is_available(self) -> tuple:
+    def is_available(self, engine: str = '') -> tuple:
         """PDF出力が利用可能かチェック
         
+        ライブラリは初回の問い合わせ時に読み込む（pdf_backends を参照）。
+        エンジンを指定した場合はそのエンジンだけを確認する。
+        
+        Args:
+            engine: 使用するエンジン（空文字の場合は ENGINE_PRIORITY の順に自動選択）
+        
         Returns:
             (利用可能か, 利用可能なライブラリ名)
         """
-        if WEASYPRINT_AVAILABLE:
-            return (True, "weasyprint")
-        elif XHTML2PDF_AVAILABLE:
-            return (True, "xhtml2pdf")
-        else:
+        def usable(name: str) -> bool:
+            if name == 'webengine':
+                return webengine_usable()
+            return name in pdf_backends.BACKEND_MODULES and pdf_backends.is_available(name)
+        
+        if engine:
+            if usable(engine):
+                return (True, engine)
             return (False, None)
+        
+        for name in self.ENGINE_PRIORITY:
+            if usable(name):
+                return (True, name)
+        return (False, None)
+    
+    def get_session(self) -> PDFRenderSession:
+        """WeasyPrintのレンダリングセッションを取得"""
+        if self.session is None:
+            self.session = get_default_session()
+        return self.session
     
-    def export_with_weasyprint(self, html_content: str, output_path: Path):
+    def export_with_weasyprint(self, html_content: str, output_path: Path,
+                               progress_callback: Optional[ProgressCallback] = None,
+                               stylesheets: Optional[list] = None):
         """WeasyprintでPDF出力
         
         Args:
             html_content: HTML文字列
             output_path: 出力先パス
+            progress_callback: 進捗通知コールバック
+            stylesheets: 追加で適用する解析済みCSS（セッションから取得したもの）
         """
-        if not WEASYPRINT_AVAILABLE:
+        if not pdf_backends.is_available('weasyprint'):
             raise ImportError("weasyprintがインストールされていません")
         
-        # HTMLからPDFを生成
-        HTML(string=html_content).write_pdf(output_path)
+        # レイアウトと書き出しを分けて進捗を通知
+        self._report(progress_callback, 'layout')
+        document = self.get_session().render(html_content, stylesheets)
+        self._report(progress_callback, 'pages', len(document.pages))
+        self._report(progress_callback, 'write')
+        document.write_pdf(output_path)
     
-    def export_with_xhtml2pdf(self, html_content: str, output_path: Path):
+    def export_with_xhtml2pdf(self, html_content: str, output_path: Path,
+                              progress_callback: Optional[ProgressCallback] = None):
         """xhtml2pdfでPDF出力
         
         Args:
             html_content: HTML文字列
             output_path: 出力先パス
+            progress_callback: 進捗通知コールバック
         """
-        if not XHTML2PDF_AVAILABLE:
+        if not pdf_backends.is_available('xhtml2pdf'):
             raise ImportError("xhtml2pdfがインストールされていません")
+        from xhtml2pdf import pisa
         
+        # xhtml2pdfはレイアウトと書き出しが一体のため段階をまとめて通知
+        self._report(progress_callback, 'layout')
         with open(output_path, 'wb') as output_file:
             pisa_status = pisa.CreatePDF(
                 html_content.encode('utf-8'),
@@ -71,28 +139,145 @@ class PDFExporter:
             if pisa_status.err:
                 raise Exception(f"PDF生成中にエラーが発生しました: {pisa_status.err}")
     
-    def export(self, project: Project, output_path: Path, options: dict = None):
+    def export_with_webengine(self, html_content: str, output_path: Path,
+                              progress_callback: Optional[ProgressCallback] = None,
+                              options: Optional[ExportOptions] = None):
+        """QtWebEngineでPDF出力（MathJaxの描画完了を待ってから出力）
+        
+        Args:
+            html_content: HTML文字列（CSS・MathJaxを埋め込んだもの）
+            output_path: 出力先パス
+            progress_callback: 進捗通知コールバック
+            options: エクスポートオプション（用紙サイズに使用）
+        """
+        if not webengine_usable():
+            raise ImportError("QtWebEngineでのPDF出力にはQApplicationの起動が必要です")
+        
+        from .webengine_pdf import get_shared_renderer, page_layout_from_settings
+        
+        page_layout = page_layout_from_settings(
+            self.print_settings, options.page_size if options is not None else None
+        )
+        
+        # Chromiumはレイアウトと書き出しが一体のため段階をまとめて通知
+        self._report(progress_callback, 'layout')
+        if not get_shared_renderer().render(html_content, str(output_path), page_layout):
+            raise Exception("QtWebEngineでのPDF生成に失敗しました")
+    
+    def export(self, project: Project, output_path: Path,
+               options: Union[ExportOptions, dict] = None,
+               progress_callback: Optional[ProgressCallback] = None):
         """プロジェクトをPDFファイルとして出力
         
         Args:
             project: プロジェクト
             output_path: 出力先パス
-            options: エクスポートオプション
+            options: エクスポートオプション（ExportOptions または同じキーの辞書）
+            progress_callback: 進捗通知コールバック（段階名は STAGES を参照）
+        """
+        options = ExportOptions.coerce(options)
+        
+        # まずHTMLを生成（WeasyPrintではCSSを埋め込まず、解析済みのものを適用する）
+        self._report(progress_callback, 'html')
+        
+        if self._uses_sections(options):
+            self._get_section_renderer(options.pdf_workers).render(
+                self._get_html_exporter(), project, output_path, options,
+                self.get_session(), progress_callback,
+                cache=self._get_cache() if options.pdf_cache else None
+            )
+            return
+        
+        html_content = self._get_html_exporter()._generate_html(
+            project, options, inline_styles=not self._uses_session(options)
+        )
+        self._write_pdf(html_content, output_path, options, progress_callback)
+    
+    def export_forms(self, project: Project, output_path: Path,
+                     forms: List[Union[dict, Sequence[int]]],
+                     options: Union[ExportOptions, dict] = None) -> List[Path]:
+        """複数の型（A型・B型…）をPDFファイルとして出力
+        
+        各問題のレンダリングは1回だけ行い、全ての型で再利用する。
+        出力ファイル名は「<output_pathの名前>_<型名>.pdf」となる。
+        
+        Args:
+            project: プロジェクト
+            output_path: 出力先パス（型名を付加して使用）
+            forms: 型の定義リスト（HTMLExporter.generate_forms と同じ形式）
+            options: 全ての型に共通のエクスポートオプション
+        
+        Returns:
+            出力したファイルパスのリスト
         """
-        if options is None:
-            options = {}
+        output_path = Path(output_path)
+        paths = []
+        
+        # 型ごとの上書き（文字サイズ・余白・用紙等）はCSSにも反映させるため、
+        # HTMLとCSSの両方を型ごとのオプションで生成する
+        for label, form_project, form_options in self._get_html_exporter().form_projects(
+                project, forms, options):
+            form_path = output_path.with_name(f"{output_path.stem}_{label}{output_path.suffix}")
+            self.export(form_project, form_path, form_options)
+            paths.append(form_path)
         
+        return paths
+    
+    def _get_html_exporter(self):
+        """HTMLExporterを取得（断片キャッシュを共有するため使い回す）"""
         # HTMLExporterを遅延インポート（循環インポート回避）
         if self.html_exporter is None:
             from .html_exporter import HTMLExporter
             self.html_exporter = HTMLExporter()
+        return self.html_exporter
+    
+    def _uses_sections(self, options: ExportOptions) -> bool:
+        """セクション単位のレンダリングを使うか（pypdfがない場合は一括レンダリング）"""
+        return ((options.pdf_workers > 1 or options.pdf_cache or options.pdf_chunk_pages)
+                and self._uses_session(options) and SectionedPDFRenderer.is_available())
+    
+    def _get_cache(self) -> PDFSectionCache:
+        """レンダリング済みページのキャッシュを取得"""
+        if self.cache is None:
+            self.cache = PDFSectionCache()
+        return self.cache
+    
+    def _get_section_renderer(self, workers: int) -> SectionedPDFRenderer:
+        """並列レンダリング用のレンダラーを取得（ワーカープロセスは使い回す）"""
+        if self.section_renderer is None or self.section_renderer.workers != workers:
+            self.close()
+            self.section_renderer = SectionedPDFRenderer(workers)
+        return self.section_renderer
+    
+    def close(self):
+        """並列レンダリング用のワーカープロセスを終了"""
+        if self.section_renderer is not None:
+            self.section_renderer.close()
+            self.section_renderer = None
+    
+    def _uses_session(self, options: ExportOptions) -> bool:
+        """レンダリングセッション（外部CSS）を使って出力するか"""
+        return self.is_available(options.pdf_engine)[1] == "weasyprint"
+    
+    def _document_stylesheets(self, options: ExportOptions) -> list:
+        """ドキュメントCSSをセッションから取得（テンプレート層ごとに一度だけ解析）"""
+        html_exporter = self._get_html_exporter()
+        include_answer_sheet = options.generate_answer_sheet
+        key = ('document', options.template_fingerprint, include_answer_sheet)
+        return [self.get_session().stylesheet(
+            key, lambda: html_exporter._document_styles(options, include_answer_sheet)
+        )]
+    
+    def _write_pdf(self, html_content: str, output_path: Path, options: ExportOptions,
+                   progress_callback: Optional[ProgressCallback] = None):
+        """利用可能なライブラリでHTMLをPDF出力
         
-        # まずHTMLを生成
-        html_content = self.html_exporter._generate_html(project, options)
-        
-        # 利用可能なライブラリでPDF出力
-        available, library = self.is_available()
+        WeasyPrintの場合、html_content は inline_styles=False で生成したものを渡す。
+        """
+        available, library = self.is_available(options.pdf_engine)
         
+        if not available and options.pdf_engine:
+            raise ImportError(f"PDF出力エンジン {options.pdf_engine} は利用できません")
         if not available:
             raise ImportError(
                 "PDF出力には以下のいずれかのライブラリが必要です:\n"
@@ -102,9 +287,18 @@ class PDFExporter:
             )
         
         if library == "weasyprint":
-            self.export_with_weasyprint(html_content, output_path)
+            self.export_with_weasyprint(html_content, output_path, progress_callback,
+                                        self._document_stylesheets(options))
         elif library == "xhtml2pdf":
-            self.export_with_xhtml2pdf(html_content, output_path)
+            self.export_with_xhtml2pdf(html_content, output_path, progress_callback)
+        elif library == "webengine":
+            self.export_with_webengine(html_content, output_path, progress_callback, options)
+    
+    @staticmethod
+    def _report(progress_callback: Optional[ProgressCallback], stage: str, detail: int = None):
+        """進捗を通知"""
+        if progress_callback is not None:
+            progress_callback(stage, detail)
     
     def get_install_instructions(self) -> str:
         """インストール手順を取得"""
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""セクション単位の並列PDFレンダリング
+
+表紙・問題ページ・解答用紙は必ず改ページで区切られているため、
+別々のプロセスでレイアウトしてから順番に結合しても同じページ割りになる。
+WeasyPrintのレイアウトは1プロセス1コアで動くので、大きな試験では
+セクションを分けることで利用できるコア数に応じて出力時間を短縮できる。
+また、WeasyPrintは文書全体のレイアウトを保持したまま書き出すため、
+セクションごとにレイアウトして一時ファイルへ書き出すことで、
+メモリ使用量を最大のセクション1つ分に抑えられる。
+"""
+
+import io
+import math
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Hashable, Iterator, List, Optional, Union
+
+from ..models import Project, ExportOptions
+from . import pdf_backends
+from .pdf_session import PDFRenderSession, get_default_session
+from .pdf_cache import PDFSectionCache
+
+
+def _render_section(html_content: str, css_key: Hashable, css_text: str,
+                    session: Optional[PDFRenderSession] = None) -> bytes:
+    """1セクションをPDFにする
+    
+    ワーカープロセスではプロセス共有のセッションを使い回す。
+    
+    Returns:
+        PDFのバイト列
+    """
+    session = session or get_default_session()
+    stylesheets = [session.stylesheet(css_key, lambda: css_text)]
+    return session.render(html_content, stylesheets).write_pdf()
+
+
+class SectionedPDFRenderer:
+    """セクションごとに別プロセスでレンダリングし、結合してPDFを出力するクラス
+    
+    ページ番号はセクションごとにリセットされてしまうため、セクションは番号なしで
+    レンダリングし、結合後に通し番号だけのページを重ねる。
+    キャッシュを使う場合は問題ページ1枚ごとにセクションを分け、
+    変更のあったページだけをレンダリングする。
+    """
+    
+    # 1プロセスあたりのセクション数の目安（ページごとの重さの偏りをならすため）
+    SECTIONS_PER_WORKER = 2
+    
+    def __init__(self, workers: int):
+        """
+        Args:
+            workers: レンダリングに使うプロセス数
+        """
+        self.workers = workers
+        self._executor = None
+        # 直近の出力の統計（セクション数, キャッシュから再利用した数）
+        self.last_stats = {'sections': 0, 'cached': 0}
+    
+    @staticmethod
+    def is_available() -> bool:
+        """並列レンダリングが利用可能かチェック"""
+        return pdf_backends.is_available('weasyprint') and pdf_backends.is_available('pypdf')
+    
+    def render(self, html_exporter, project: Project, output_path: Path, options: ExportOptions,
+               session: PDFRenderSession,
+               progress_callback: Optional[Callable[[str, Optional[int]], None]] = None,
+               cache: Optional[PDFSectionCache] = None) -> int:
+        """プロジェクトをセクションに分けてレンダリングし、1つのPDFに結合
+        
+        Args:
+            html_exporter: セクションのHTMLとCSSを生成するHTMLExporter
+            project: プロジェクト
+            output_path: 出力先パス
+            options: エクスポートオプション
+            session: ページ番号の重ね合わせに使うセッション
+            progress_callback: 進捗通知コールバック（PDFExporter.STAGES と同じ段階名）
+            cache: レンダリング済みセクションのキャッシュ（Noneの場合は使わない）
+        
+        Returns:
+            総ページ数
+        """
+        from pypdf import PdfReader, PdfWriter
+        
+        def report(stage: str, detail: Optional[int] = None):
+            if progress_callback is not None:
+                progress_callback(stage, detail)
+        
+        # セクションはページ番号なしで生成し、CSSは各ワーカーで一度だけ解析させる
+        section_options = options.replace(page_numbers=False)
+        include_answer_sheet = options.generate_answer_sheet
+        css_key = ('document', section_options.template_fingerprint, include_answer_sheet)
+        css_text = html_exporter._document_styles(section_options, include_answer_sheet)
+        
+        if cache is not None:
+            # ページの区切りが他のページの増減に左右されないよう1ページずつに分ける
+            pages_per_section = 1
+        else:
+            page_count = math.ceil(len(project.problems) / options.problems_per_page)
+            section_count = self.workers * self.SECTIONS_PER_WORKER
+            pages_per_section = max(1, math.ceil(page_count / section_count))
+            if options.pdf_chunk_pages:
+                pages_per_section = min(pages_per_section, options.pdf_chunk_pages)
+        sections = [html for _, html in html_exporter.generate_sections(
+            project, section_options, inline_styles=False, pages_per_section=pages_per_section
+        )]
+        
+        # 分割レンダリングでは、レンダリングしたセクションをすぐに一時ファイルへ書き出す
+        spool_dir = tempfile.mkdtemp(prefix='math_exam_pdf_') if options.pdf_chunk_pages else None
+        try:
+            results = self._collect_sections(sections, css_key, css_text, session, cache, spool_dir,
+                                             report)
+            
+            readers = [PdfReader(result if isinstance(result, str) else io.BytesIO(result))
+                       for result in results]
+            total_pages = sum(len(reader.pages) for reader in readers)
+            report('pages', total_pages)
+            
+            report('write')
+            writer = PdfWriter()
+            for reader in readers:
+                for page in reader.pages:
+                    writer.add_page(page)
+            
+            if options.page_numbers:
+                cover_pages = len(readers[0].pages) if options.show_cover else 0
+                overlay = self._render_page_numbers(html_exporter, total_pages, cover_pages,
+                                                    options, session)
+                for page, number_page in zip(writer.pages, PdfReader(io.BytesIO(overlay)).pages):
+                    page.merge_page(number_page)
+            
+            with open(output_path, 'wb') as f:
+                writer.write(f)
+        finally:
+            if spool_dir is not None:
+                shutil.rmtree(spool_dir, ignore_errors=True)
+        
+        return total_pages
+    
+    def _collect_sections(self, sections: List[str], css_key: Hashable, css_text: str,
+                          session: PDFRenderSession, cache: Optional[PDFSectionCache],
+                          spool_dir: Optional[str], report) -> List[Union[bytes, str]]:
+        """各セクションのPDFを揃える（キャッシュにないものだけをレンダリング）
+        
+        Returns:
+            セクションごとのPDF（spool_dir を指定した場合は一時ファイルのパス）
+        """
+        def keep(i: int, data: bytes) -> Union[bytes, str]:
+            if spool_dir is None:
+                return data
+            path = os.path.join(spool_dir, f'{i:05d}.pdf')
+            with open(path, 'wb') as f:
+                f.write(data)
+            return path
+        
+        results = [None] * len(sections)
+        keys = []
+        if cache is not None:
+            keys = [PDFSectionCache.key_for(html, css_text) for html in sections]
+            for i, key in enumerate(keys):
+                data = cache.get(key)
+                if data is not None:
+                    results[i] = keep(i, data)
+        missing = [i for i, result in enumerate(results) if result is None]
+        
+        report('layout')
+        for i, data in zip(missing, self._render_sections([sections[i] for i in missing],
+                                                          css_key, css_text, session)):
+            results[i] = keep(i, data)
+            if cache is not None:
+                cache.put(keys[i], data)
+        if cache is not None and missing:
+            cache.prune()
+        self.last_stats = {'sections': len(sections), 'cached': len(sections) - len(missing)}
+        
+        return results
+    
+    def _render_sections(self, sections: List[str], css_key: Hashable, css_text: str,
+                         session: PDFRenderSession) -> Iterator[bytes]:
+        """セクションを順にPDFにする（複数プロセスが使える場合は並列に処理）
+        
+        1つずつ返すので、受け取った側がすぐに書き出せば
+        同時にメモリ上にあるのはレンダリング中のセクションだけになる。
+        """
+        if self.workers == 1 or len(sections) <= 1:
+            return (_render_section(html, css_key, css_text, session) for html in sections)
+        
+        return self._get_executor().map(_render_section, sections,
+                                        [css_key] * len(sections),
+                                        [css_text] * len(sections))
+    
+    def _render_page_numbers(self, html_exporter, total_pages: int, cover_pages: int,
+                             options: ExportOptions, session: PDFRenderSession) -> bytes:
+        """通しページ番号だけを描いたPDF（本文と同じ用紙・余白）を生成"""
+        pages = ''.join(
+            '<div class="cover-page"></div>' if i < cover_pages else '<div></div>'
+            for i in range(total_pages)
+        )
+        html_content = f'<!DOCTYPE html><html lang="ja"><body>{pages}</body></html>'
+        
+        css_text = f'''@page {{
+            size: {options.page_size};
+            margin: {options.margin};
+        }}
+        
+        body > div + div {{
+            break-before: page;
+        }}
+        
+        {html_exporter.page_number_styles()}'''
+        key = ('page-numbers', options.page_size, options.margin)
+        stylesheets = [session.stylesheet(key, lambda: css_text)]
+        return session.render(html_content, stylesheets).write_pdf()
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """ワーカープロセスを取得（セッションを活かすため出力をまたいで使い回す）"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+    
+    def close(self):
+        """ワーカープロセスを終了"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""WeasyPrintのレンダリングセッション
+
+フォント設定の解決と共通CSSの解析は、小さな試験ではPDF出力時間の大半を占める。
+セッションはこれらを保持し、同じプロセス内の複数回の出力
+（GUIでの再出力、CLIのワーカープロセスで処理する複数ファイル）で使い回す。
+"""
+
+from typing import Callable, Dict, Hashable, List, Optional
+
+from . import pdf_backends
+
+
+class PDFRenderSession:
+    """フォント設定と解析済みCSSを保持するWeasyPrintセッション
+    
+    CSSはテンプレート層のフィンガープリント等をキーにして一度だけ解析する。
+    同じ FontConfiguration で解析したCSSでないと @font-face が共有されないため、
+    CSSとフォント設定は必ず同じセッションから取得する。
+    """
+    
+    def __init__(self):
+        if not pdf_backends.is_available('weasyprint'):
+            raise ImportError("weasyprintがインストールされていません")
+        from weasyprint.text.fonts import FontConfiguration
+        self.font_config = FontConfiguration()
+        # 解析済みCSS（キー → CSS）
+        self._stylesheets: Dict[Hashable, 'CSS'] = {}
+        self.render_count = 0
+    
+    def stylesheet(self, key: Hashable, css_factory: Callable[[], str]) -> 'CSS':
+        """解析済みCSSを取得（未解析の場合のみ css_factory を呼び出して解析）
+        
+        Args:
+            key: CSSを識別するキー（内容が同じなら同じキーにする）
+            css_factory: CSS文字列を返す関数
+        
+        Returns:
+            WeasyPrintのCSSオブジェクト
+        """
+        stylesheet = self._stylesheets.get(key)
+        if stylesheet is None:
+            from weasyprint import CSS
+            stylesheet = CSS(string=css_factory(), font_config=self.font_config)
+            self._stylesheets[key] = stylesheet
+        return stylesheet
+    
+    def render(self, html_content: str, stylesheets: Optional[List['CSS']] = None,
+               base_url: Optional[str] = None):
+        """HTMLをレイアウト
+        
+        Args:
+            html_content: HTML文字列
+            stylesheets: 追加で適用する解析済みCSS
+            base_url: 相対パス解決の基準URL
+        
+        Returns:
+            WeasyPrintのDocument（pages, write_pdf を持つ）
+        """
+        from weasyprint import HTML
+        
+        self.render_count += 1
+        return HTML(string=html_content, base_url=base_url).render(
+            stylesheets=stylesheets or [],
+            font_config=self.font_config
+        )
+    
+    def clear(self):
+        """解析済みCSSを破棄（フォント設定は保持）"""
+        self._stylesheets.clear()
+    
+    @property
+    def stylesheet_count(self) -> int:
+        """保持している解析済みCSSの数"""
+        return len(self._stylesheets)
+
+
+# プロセスごとに共有する既定のセッション
+_default_session: Optional[PDFRenderSession] = None
+
+
+def get_default_session() -> PDFRenderSession:
+    """プロセス共有の既定セッションを取得（初回呼び出し時に生成）"""
+    global _default_session
+    if _default_session is None:
+        _default_session = PDFRenderSession()
+    return _default_session
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""PDF出力のバックグラウンド実行（別プロセス）
+
+WeasyPrintのレイアウトは大きな試験で数十秒かかるため、GUIスレッドを
+止めないよう別プロセスで実行し、進捗をキューで受け取る。
+Qtには依存しないので、GUI以外（CLI等）からも利用できる。
+"""
+
+import multiprocessing
+import os
+import queue
+import signal
+import sys
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple, Union
+
+from ..models import Project, ExportOptions
+
+
+def _run_export(project_data: dict, output_path: str, options: ExportOptions, message_queue,
+                students: Optional[Sequence] = None, per_student: bool = False):
+    """ワーカープロセスで実行する処理
+    
+    書き出しは一時ファイルに行い、完了後に出力先へ置き換える
+    （キャンセル時に中途半端なPDFが残らないようにするため）。
+    名簿（students）を指定した場合はクラス分のPDFを出力し、per_student では
+    output_path をディレクトリとして生徒ごとのファイルを直接書き出す。
+    """
+    from .pdf_exporter import PDFExporter
+    from .class_set import ClassSetExporter
+    
+    # キャンセル（terminate）時も並列レンダリングのワーカーを後始末する
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(1))
+    
+    exporter = PDFExporter()
+    temp_path = PDFExportProcess.temp_path_for(output_path)
+    page_count = None
+    
+    def on_progress(stage: str, detail: Optional[int]):
+        nonlocal page_count
+        if stage == 'pages':
+            page_count = detail
+        message_queue.put(('progress', stage, detail))
+    
+    try:
+        project = Project.from_dict(project_data)
+        if students is None:
+            exporter.export(project, temp_path, options, progress_callback=on_progress)
+        else:
+            class_set = ClassSetExporter(exporter, workers=os.cpu_count() or 1)
+            class_set.export(project, students, output_path if per_student else temp_path,
+                             options, per_student=per_student, progress_callback=on_progress)
+        if not per_student:
+            os.replace(temp_path, output_path)
+        message_queue.put(('done', output_path, page_count))
+    except Exception as e:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        message_queue.put(('error', f"{type(e).__name__}: {e}", None))
+    finally:
+        exporter.close()
+
+
+class PDFExportProcess:
+    """PDF出力を別プロセスで実行するクラス
+    
+    使い方:
+        process = PDFExportProcess(project, output_path, options)
+        process.start()
+        # 定期的に呼び出してメッセージを受け取る
+        for kind, value, detail in process.poll():
+            ...
+        # 途中で中止する場合（終了の確認も定期的に行う）
+        process.cancel()
+        while not process.reap_cancelled():
+            ...
+    
+    メッセージ:
+        ('progress', 段階名, 詳細)  段階名は PDFExporter.STAGES を参照
+        ('done', 出力先パス, ページ数)
+        ('error', エラーメッセージ, None)
+    """
+    
+    def __init__(self, project: Project, output_path: Path,
+                 options: Union[ExportOptions, dict] = None,
+                 students: Optional[Sequence] = None, per_student: bool = False):
+        """
+        Args:
+            project: プロジェクト
+            output_path: 出力先パス（per_student の場合はディレクトリ）
+            options: エクスポートオプション
+            students: クラス分のPDFを出力する場合の名簿（Student のリスト）
+            per_student: 生徒ごとに別のファイルに出力するか
+        """
+        # 編集中の内容が変わっても影響しないよう、開始時点の内容を複製して渡す
+        self.project_data = project.to_dict()
+        self.output_path = str(output_path)
+        self.options = ExportOptions.coerce(options)
+        self.students = list(students) if students is not None else None
+        self.per_student = per_student
+        
+        # Qtを使うプロセスでのforkは安全でないため常にspawnを使う
+        self._context = multiprocessing.get_context('spawn')
+        self._queue = self._context.Queue()
+        self._process = None
+        self._finished = False
+        self._cancelled = False
+        # 開始前からあったファイルの更新時刻（キャンセル時に今回の出力だけを削除するため）
+        self._existing_outputs = {}
+    
+    @staticmethod
+    def temp_path_for(output_path: str) -> str:
+        """書き出し中の一時ファイルのパス"""
+        return f"{output_path}.part"
+    
+    def output_paths(self) -> List[Path]:
+        """出力するファイルのパス（per_student の場合は生徒ごとのファイル）"""
+        if self.per_student and self.students is not None:
+            from .class_set import student_paths
+            return student_paths(Path(self.output_path), self.project_data.get('title', ''), self.students)
+        return [Path(self.output_path)]
+    
+    def start(self):
+        """バックグラウンドで出力を開始"""
+        self._existing_outputs = {
+            path: path.stat().st_mtime_ns for path in self.output_paths() if path.exists()
+        }
+        # 並列レンダリングで子プロセスを作るため daemon にはしない
+        # （終了時の後始末は cancel() で行う）
+        self._process = self._context.Process(
+            target=_run_export,
+            args=(self.project_data, self.output_path, self.options, self._queue,
+                  self.students, self.per_student)
+        )
+        self._process.start()
+    
+    def poll(self) -> List[Tuple[str, object, object]]:
+        """届いているメッセージをすべて取得（ブロックしない）"""
+        messages = []
+        while True:
+            try:
+                message = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            messages.append(message)
+            if message[0] in ('done', 'error'):
+                self._finished = True
+        
+        # メッセージを送らずにプロセスが終了した場合（強制終了等）
+        if not self._finished and self._process is not None and not self._process.is_alive():
+            # 終了したプロセスの送信済みメッセージはパイプに残っているので待つ必要はない
+            self._finished = True
+            try:
+                messages.append(self._queue.get_nowait())
+            except queue.Empty:
+                messages.append(('error', f"PDF出力プロセスが異常終了しました（終了コード {self._process.exitcode}）", None))
+        
+        return messages
+    
+    def is_running(self) -> bool:
+        """実行中かどうか"""
+        return self._process is not None and not self._finished and self._process.is_alive()
+    
+    def cancel(self):
+        """出力を中止（ブロックしない）
+        
+        ワーカープロセスに終了を要求して、今回書き出したファイルを削除する。
+        プロセスの終了は待たないので、呼び出し側は reap_cancelled() が True を
+        返すまで定期的に呼び出すこと（終了までに書き出されたファイルも削除する）。
+        """
+        if self._process is not None and self._process.is_alive():
+            self._process.terminate()
+        self._finished = True
+        self._cancelled = True
+        self._remove_partial_outputs()
+    
+    def kill(self):
+        """終了要求に応じないワーカープロセスを強制終了"""
+        if self._process is not None and self._process.is_alive():
+            self._process.kill()
+    
+    def reap_cancelled(self) -> bool:
+        """キャンセル後、ワーカープロセスが終了したかを確認（ブロックしない）
+        
+        Returns:
+            終了した場合はTrue（残っていたファイルも削除済み）
+        """
+        if self._process is not None and self._process.is_alive():
+            return False
+        if self._cancelled:
+            self._remove_partial_outputs()
+        return True
+    
+    def _remove_partial_outputs(self):
+        """書き出し途中の一時ファイルと、今回出力した生徒ごとのファイルを削除"""
+        paths = [Path(self.temp_path_for(self.output_path))]
+        if self.per_student:
+            paths += [path for path in self.output_paths()
+                      if path.exists() and self._existing_outputs.get(path) != path.stat().st_mtime_ns]
+        for path in paths:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
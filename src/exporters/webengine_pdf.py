@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""QtWebEngineによるPDF出力
+
+WeasyPrint・xhtml2pdfはJavaScriptを実行しないため、MathJaxの数式がTeXのまま出力される。
+アプリに同梱のQtWebEngine（Chromium）でHTMLを読み込み、MathJaxの描画完了を
+待ってから printToPdf で出力する。Chromiumの起動は重いため、ページは使い回す。
+
+QApplication が起動しているプロセス（GUI）でのみ使用できる。
+"""
+
+import os
+import tempfile
+from typing import Optional
+
+from PySide6.QtCore import QObject, QEventLoop, QMarginsF, QTimer, QUrl, Signal
+from PySide6.QtGui import QPageLayout, QPageSize
+from PySide6.QtWebEngineCore import QWebEnginePage, QWebEngineSettings
+
+
+# 印刷設定の用紙名 → QPageSize
+PAGE_SIZE_IDS = {
+    'A3': QPageSize.PageSizeId.A3,
+    'A4': QPageSize.PageSizeId.A4,
+    'B4': QPageSize.PageSizeId.B4,
+    'B5': QPageSize.PageSizeId.B5,
+    'Letter': QPageSize.PageSizeId.Letter,
+    'Legal': QPageSize.PageSizeId.Legal,
+}
+
+# 印刷設定に余白がない場合の余白（mm。印刷プレビューとQtWebEngineでのPDF出力で共通）
+DEFAULT_MARGINS_MM = {
+    'margin_left': 20,
+    'margin_top': 20,
+    'margin_right': 20,
+    'margin_bottom': 20,
+}
+
+
+def page_layout_from_settings(settings: dict, paper_size: Optional[str] = None) -> QPageLayout:
+    """印刷設定（PrintSettingsDialog.get_settings の形式）からページレイアウトを作成
+    
+    Args:
+        settings: 印刷設定
+        paper_size: 用紙サイズ（指定した場合は印刷設定より優先）
+    
+    Returns:
+        QPageLayout（単位はミリメートル）
+    """
+    # 「A4 (210 x 297 mm)」形式と「A4」形式のどちらも受け付ける
+    name = (paper_size or settings.get('paper_size') or 'A4').split()[0]
+    page_size_id = PAGE_SIZE_IDS.get(name, QPageSize.PageSizeId.A4)
+    
+    orientation = (QPageLayout.Orientation.Landscape
+                   if settings.get('orientation') == 'landscape'
+                   else QPageLayout.Orientation.Portrait)
+    
+    margins = QMarginsF(*(float(settings.get(key, DEFAULT_MARGINS_MM[key]))
+                          for key in ('margin_left', 'margin_top', 'margin_right', 'margin_bottom')))
+    
+    return QPageLayout(QPageSize(page_size_id), orientation, margins, QPageLayout.Unit.Millimeter)
+
+
+class _MathJaxAwarePage(QWebEnginePage):
+    """MathJaxの描画完了（コンソール出力）を通知するページ"""
+    
+    mathjax_done = Signal()
+    
+    # HTMLExporter._mathjax_scripts が描画完了時に出力するメッセージ
+    MATHJAX_DONE_MESSAGE = 'MathJax loaded successfully'
+    
+    def javaScriptConsoleMessage(self, level, message, line_number, source_id):
+        if self.MATHJAX_DONE_MESSAGE in message:
+            self.mathjax_done.emit()
+
+
+class WebEnginePDFRenderer(QObject):
+    """オフスクリーンのQWebEnginePageでHTMLをPDFに出力するクラス
+    
+    同時に処理できるのは1件のみ。出力が終わると finished シグナルを送る。
+    """
+    
+    finished = Signal(str, bool)  # 出力先パス, 成功したか
+    
+    # MathJaxの完了が通知されない場合（オフラインでCDNに接続できない等）の待ち時間（ミリ秒）
+    MATHJAX_TIMEOUT = 30000
+    
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.page = _MathJaxAwarePage(self)
+        # ローカルの一時ファイルからCDNのMathJaxを読み込めるようにする
+        self.page.settings().setAttribute(
+            QWebEngineSettings.WebAttribute.LocalContentCanAccessRemoteUrls, True
+        )
+        self.page.loadFinished.connect(self._on_load_finished)
+        self.page.mathjax_done.connect(self._on_mathjax_done)
+        self.page.pdfPrintingFinished.connect(self._on_pdf_printed)
+        
+        self.timeout_timer = QTimer(self)
+        self.timeout_timer.setSingleShot(True)
+        self.timeout_timer.timeout.connect(self._print)
+        
+        self._output_path = None
+        self._page_layout = None
+        self._html_path = None
+        self._loaded = False
+        self._mathjax_done = False
+        self._printing = False
+    
+    def is_busy(self) -> bool:
+        """出力中かどうか"""
+        return self._output_path is not None
+    
+    def render_async(self, html_content: str, output_path: str, page_layout: QPageLayout):
+        """HTMLをPDFに出力（完了は finished シグナルで通知）
+        
+        Raises:
+            RuntimeError: 別の出力が処理中の場合
+        """
+        if self.is_busy():
+            raise RuntimeError("別のPDF出力を処理中です")
+        
+        self._output_path = str(output_path)
+        self._page_layout = page_layout
+        self._loaded = False
+        self._mathjax_done = False
+        self._printing = False
+        
+        # setHtml は2MBまでのため、画像を含む大きなHTMLにも対応できるようファイル経由で読み込む
+        fd, self._html_path = tempfile.mkstemp(suffix='.html')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(html_content)
+        self.page.load(QUrl.fromLocalFile(self._html_path))
+    
+    def render(self, html_content: str, output_path: str, page_layout: QPageLayout) -> bool:
+        """HTMLをPDFに出力し、完了まで待つ（イベントループを回しながら待機）
+        
+        Returns:
+            成功したか
+        """
+        loop = QEventLoop()
+        result = []
+        
+        def on_finished(path: str, success: bool):
+            result.append(success)
+            loop.quit()
+        
+        self.finished.connect(on_finished)
+        try:
+            self.render_async(html_content, output_path, page_layout)
+            if not result:
+                loop.exec()
+        finally:
+            self.finished.disconnect(on_finished)
+        
+        return result[0]
+    
+    def _on_load_finished(self, ok: bool):
+        if not self.is_busy() or self._loaded:
+            return
+        if not ok:
+            self._finish(False)
+            return
+        
+        self._loaded = True
+        # 事前組版したHTML等、MathJaxを読み込まない場合はすぐに出力
+        self.page.runJavaScript(
+            "document.getElementById('MathJax-script') !== null",
+            0,
+            self._on_mathjax_checked
+        )
+    
+    def _on_mathjax_checked(self, has_mathjax):
+        if not self.is_busy():
+            return
+        if not has_mathjax or self._mathjax_done:
+            self._print()
+        else:
+            self.timeout_timer.start(self.MATHJAX_TIMEOUT)
+    
+    def _on_mathjax_done(self):
+        # 読み込み完了より先に通知される場合もあるため記録しておく
+        self._mathjax_done = True
+        if self._loaded:
+            self._print()
+    
+    def _print(self):
+        if not self.is_busy() or self._printing:
+            return
+        self._printing = True
+        self.timeout_timer.stop()
+        self.page.printToPdf(self._output_path, self._page_layout)
+    
+    def _on_pdf_printed(self, file_path: str, success: bool):
+        if self.is_busy():
+            self._finish(success)
+    
+    def _finish(self, success: bool):
+        output_path = self._output_path
+        self._output_path = None
+        self.timeout_timer.stop()
+        if self._html_path and os.path.exists(self._html_path):
+            os.remove(self._html_path)
+        self._html_path = None
+        self.finished.emit(output_path, success)
+
+
+# プロセス共有のレンダラー（Chromiumの起動を1回にするため使い回す）
+_shared_renderer: Optional[WebEnginePDFRenderer] = None
+
+
+def get_shared_renderer() -> WebEnginePDFRenderer:
+    """プロセス共有のレンダラーを取得（QApplication の起動後に呼び出すこと）"""
+    global _shared_renderer
+    if _shared_renderer is None:
+        _shared_renderer = WebEnginePDFRenderer()
+    return _shared_renderer
@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+"""採点パッケージ"""
+
+from .grader import AnswerKey, Grader, GradeResult, KeyItem
+from .omr_reader import OMRReader, OMRSheet
+
+__all__ = ['AnswerKey', 'Grader', 'GradeResult', 'KeyItem', 'OMRReader', 'OMRSheet']
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""マーク式解答用紙（OMR）の読み取り
+
+OMRSheetGenerator が書き出したマニフェストの座標から、スキャン画像の
+マーク欄の中心付近を配列の添字で一度に切り出し、塗りつぶされた割合で
+判定する。画像の中を探索するのは四隅の位置合わせマークの近くだけで、
+その位置から用紙のずれ・拡大縮小・わずかな傾きを補正する。
+
+使い方:
+    reader = OMRReader.load("exam_omr.json")
+    sheets = reader.read_files(["scan_001.png", "scan_002.png"])
+    reader.write_responses(sheets, "answers.csv")   # grade サブコマンドでそのまま採点できる
+"""
+
+import csv
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Sequence, Union
+
+# 数値計算ライブラリの動的インポート
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# 画像処理ライブラリの動的インポート（画像ファイルの読み込みのみ）
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+
+# 読み取れなかったけた・複数マークの表記
+MULTIPLE_MARKS = '*'
+UNREADABLE_DIGIT = '?'
+
+
+@dataclass
+class OMRSheet:
+    """1人分の読み取り結果
+    
+    Attributes:
+        number: 受験番号（読み取れないけたは '?'）
+        answers: 列名（'1-ア' 等）→ マークした選択肢（なしは ''、複数は '*'）
+    """
+    number: str
+    answers: Dict[str, str]
+
+
+class OMRReader:
+    """マニフェストの座標でスキャン画像を読み取るクラス"""
+    
+    def __init__(self, manifest: Dict, threshold: float = 0.4, dark_level: int = 128):
+        """
+        Args:
+            manifest: OMRSheetGenerator.layout() の結果
+            threshold: マークとみなす、マーク欄の内側の暗い画素の割合
+            dark_level: 暗い画素とみなす明るさ（0〜255）
+        """
+        self.manifest = manifest
+        self.threshold = threshold
+        self.dark_level = dark_level
+        self.choices = np.array(manifest['choices'])
+        self.pages = manifest['pages']
+        self.item_ids = [blank['item_id'] for blank in manifest['blanks']]
+        
+        # ページごとのマーク欄の中心（mm）。空欄は選択肢の数ずつ、受験番号は10個ずつ並ぶ
+        self._centers = []
+        self._page_blanks = []
+        for page in range(self.pages):
+            blanks = [blank for blank in manifest['blanks'] if blank['page'] == page]
+            points = [(x, blank['y']) for blank in blanks for x in blank['x']]
+            if page == 0:
+                points += [(digit['x'], y) for digit in manifest['student_number'] for y in digit['y']]
+            self._centers.append(np.array(points, dtype=float).reshape(-1, 2))
+            self._page_blanks.append([blank['item_id'] for blank in blanks])
+    
+    @classmethod
+    def load(cls, path: Union[str, Path], **kwargs) -> 'OMRReader':
+        """マニフェストのJSONから作成"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f), **kwargs)
+    
+    @staticmethod
+    def is_available() -> bool:
+        """読み取りに必要なライブラリ（NumPy）が利用可能かチェック"""
+        return NUMPY_AVAILABLE
+    
+    def read_sheet(self, images: Sequence['np.ndarray']) -> OMRSheet:
+        """1人分のページの画像を読み取る
+        
+        Args:
+            images: ページ順の画像（グレースケールまたはRGBの配列）
+        
+        Returns:
+            読み取り結果
+        """
+        if len(images) != self.pages:
+            raise ValueError(f"画像の枚数が解答用紙のページ数（{self.pages}）と一致しません")
+        
+        answers = {}
+        number = ''
+        choice_count = len(self.choices)
+        for page, image in enumerate(images):
+            gray = self._grayscale(image)
+            marked = self._fill_ratios(gray, page) >= self.threshold
+            
+            blank_count = len(self._page_blanks[page])
+            blank_marks = marked[:blank_count * choice_count].reshape(blank_count, choice_count)
+            for item_id, answer in zip(self._page_blanks[page], self._decode(blank_marks, self.choices)):
+                answers[item_id] = answer
+            
+            if page == 0 and self.manifest['student_number']:
+                digit_marks = marked[blank_count * choice_count:].reshape(-1, 10)
+                digits = self._decode(digit_marks, np.array(list('0123456789')))
+                number = ''.join(digit if len(digit) == 1 and digit != MULTIPLE_MARKS
+                                 else UNREADABLE_DIGIT for digit in digits)
+        
+        return OMRSheet(number, {item_id: answers[item_id] for item_id in self.item_ids})
+    
+    def read_files(self, paths: Sequence[Union[str, Path]]) -> List[OMRSheet]:
+        """スキャン画像のファイルを読み取る（ページ数ずつ1人分として扱う）
+        
+        Args:
+            paths: 画像ファイルのパス（生徒順・ページ順）
+        
+        Returns:
+            生徒ごとの読み取り結果
+        """
+        if not PIL_AVAILABLE:
+            raise ImportError("画像ファイルの読み込みには Pillow のインストールが必要です")
+        if len(paths) % self.pages:
+            raise ValueError(f"画像の枚数が解答用紙のページ数（{self.pages}）の倍数ではありません")
+        
+        sheets = []
+        for start in range(0, len(paths), self.pages):
+            images = []
+            for path in paths[start:start + self.pages]:
+                with Image.open(path) as image:
+                    images.append(np.asarray(image.convert('L')))
+            sheets.append(self.read_sheet(images))
+        return sheets
+    
+    def write_responses(self, sheets: Sequence[OMRSheet], path: Union[str, Path]):
+        """読み取り結果を解答CSV（番号と空欄ごとの列）に書き出す"""
+        with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['番号'] + self.item_ids)
+            for sheet in sheets:
+                writer.writerow([sheet.number] + [sheet.answers[item_id] for item_id in self.item_ids])
+    
+    @staticmethod
+    def _grayscale(image: 'np.ndarray') -> 'np.ndarray':
+        """グレースケールの配列にする"""
+        image = np.asarray(image)
+        if image.ndim == 3:
+            image = image[..., :3].mean(axis=2)
+        return image
+    
+    @staticmethod
+    def _decode(marks: 'np.ndarray', choices: 'np.ndarray') -> 'np.ndarray':
+        """マークの有無（行ごと）から選択肢を求める（なしは ''、複数は '*'）"""
+        counts = marks.sum(axis=1)
+        selected = choices[marks.argmax(axis=1)] if len(choices) else np.array([])
+        return np.where(counts == 1, selected, np.where(counts == 0, '', MULTIPLE_MARKS))
+    
+    def _fill_ratios(self, gray: 'np.ndarray', page: int) -> 'np.ndarray':
+        """ページのすべてのマーク欄の内側の暗い画素の割合"""
+        centers = self._to_pixels(self._centers[page], gray)
+        if not len(centers):
+            return np.zeros(0)
+        
+        # マーク欄の枠線にかからない内側（直径の6割）を k×k 点で標本化
+        scale = gray.shape[1] / self.manifest['page_width_mm']
+        radius = 0.3 * self.manifest['bubble_diameter_mm'] * scale
+        k = max(3, int(round(2 * radius)))
+        offsets = np.linspace(-radius, radius, k)
+        ys = np.rint(centers[:, 1, None, None] + offsets[None, :, None]).astype(int)
+        xs = np.rint(centers[:, 0, None, None] + offsets[None, None, :]).astype(int)
+        ys = np.clip(ys, 0, gray.shape[0] - 1)
+        xs = np.clip(xs, 0, gray.shape[1] - 1)
+        return (gray[ys, xs] < self.dark_level).mean(axis=(1, 2))
+    
+    def _to_pixels(self, points: 'np.ndarray', gray: 'np.ndarray') -> 'np.ndarray':
+        """用紙上の座標（mm）を画像の座標（画素）に変換
+        
+        用紙全体を読み取った画像として拡大率を求め、四隅の位置合わせマークが
+        見つかればその位置に合わせて補正する（アフィン変換）。
+        """
+        height, width = gray.shape[:2]
+        scale = np.array([width / self.manifest['page_width_mm'],
+                          height / self.manifest['page_height_mm']])
+        expected = np.array(self.manifest['registration_marks'], dtype=float)
+        found = self._find_marks(gray, expected * scale, self.manifest['mark_size_mm'] * scale)
+        if found is None:
+            return points * scale
+        
+        source = np.hstack([expected, np.ones((len(expected), 1))])
+        transform, *_ = np.linalg.lstsq(source, found, rcond=None)
+        return np.hstack([points, np.ones((len(points), 1))]) @ transform
+    
+    def _find_marks(self, gray: 'np.ndarray', expected: 'np.ndarray',
+                    size: 'np.ndarray') -> 'np.ndarray':
+        """位置合わせマークの中心を、予想位置の周囲の暗い画素の重心から求める
+        
+        Returns:
+            マークの中心（画素）。見つからないマークがあればNone
+        """
+        found = []
+        for x, y in expected:
+            # マークの一辺の1.5倍の範囲を探す（それ以上ずれた画像は拡大率だけで読む）
+            left, right = int(max(0, x - 1.5 * size[0])), int(min(gray.shape[1], x + 1.5 * size[0]))
+            top, bottom = int(max(0, y - 1.5 * size[1])), int(min(gray.shape[0], y + 1.5 * size[1]))
+            ys, xs = np.nonzero(gray[top:bottom, left:right] < self.dark_level)
+            if len(xs) < 0.5 * size[0] * size[1]:
+                return None
+            found.append((left + xs.mean(), top + ys.mean()))
+        return np.array(found)
@@ -5,7 +5,7 @@ from PySide6.QtWidgets import (
     QSplitter, QTabWidget, QMenuBar, QMenu, QToolBar,
     QMessageBox, QFileDialog, QLabel, QInputDialog, QDialog  # QDialogを追加
 )
-from PySide6.QtCore import Qt, QSize
+from PySide6.QtCore import Qt, QSize, QTimer
 from PySide6.QtGui import QAction, QKeySequence
 from pathlib import Path
 import json
@@ -16,7 +16,7 @@ import subprocess
 from .config import config
 from .styles import Styles
 from .widgets import ProblemEditor
-from .models import Project, Problem
+from .models import Project, Problem, ExportOptions
 from .version import get_version, get_release_notes
 
 
@@ -24,18 +24,35 @@ from .version import get_version, get_release_notes
 class MainWindow(QMainWindow):
     """メインウィンドウクラス"""
     
+    # ウィンドウ表示からPDF出力ライブラリの検出を始めるまでの時間（ミリ秒）
+    PDF_PROBE_DELAY = 1000
+    
+    # バックグラウンドの保存の完了を確認する間隔（ミリ秒）
+    SAVE_POLL_INTERVAL = 100
+    
     def __init__(self):
         super().__init__()
         self.current_project = Project()
         self.problem_editors = []
+        # バックグラウンドで実行中の保存（ProjectSave）と、その完了を確認するタイマー
+        self._save_task = None
+        self._save_timer = QTimer(self)
+        self._save_timer.setInterval(self.SAVE_POLL_INTERVAL)
+        self._save_timer.timeout.connect(self._check_save)
         self.init_ui()
         self.load_window_settings()
         self.update_window_title()
         # メニューとツールバーが作成された後に外部スクリプトメニューを更新
         # QTimer.singleShotで次のイベントループで実行
-        from PySide6.QtCore import QTimer
         QTimer.singleShot(0, self.update_external_scripts_menu)
         QTimer.singleShot(0, self.update_script_button_menu)
+        # PDF出力ライブラリは起動を遅くしないよう、ウィンドウの表示後に裏で読み込む
+        QTimer.singleShot(self.PDF_PROBE_DELAY, self._start_pdf_backend_probe)
+    
+    def _start_pdf_backend_probe(self):
+        """PDF出力ライブラリの検出をバックグラウンドで開始"""
+        from .exporters import pdf_backends
+        pdf_backends.start_background_probe()
     
     def init_ui(self):
         """UIの初期化"""
@@ -79,6 +96,10 @@ class MainWindow(QMainWindow):
         export_html_action.triggered.connect(self.export_html)
         file_menu.addAction(export_html_action)       
         
+        class_set_action = QAction("クラス分のPDFを作成(&C)...", self)
+        class_set_action.triggered.connect(self.export_class_set)
+        file_menu.addAction(class_set_action)
+        
         exit_action = QAction("終了(&X)", self)
         exit_action.setShortcut(QKeySequence.Quit)
         exit_action.triggered.connect(self.close)
@@ -296,14 +317,19 @@ class MainWindow(QMainWindow):
         
         # テキスト変更シグナルをUNDO/REDO更新に接続
         problem_editor.text_changed.connect(self.update_undo_redo_actions)
+        problem_editor.blank_count_changed.connect(
+            lambda count, editor=problem_editor: self._update_problem_tab_title(editor)
+        )
         
         problem_number = len(self.problem_editors)
         self.tab_widget.addTab(problem_editor, f"問題 {problem_number}")
         self.tab_widget.setCurrentWidget(problem_editor)
+        self._update_problem_tab_title(problem_editor, f"問題 {problem_number}")
         
         # プロジェクトに問題を追加
         problem = Problem(f"問題 {problem_number}", "")
         self.current_project.add_problem(problem)
+        problem_editor.set_problem(problem)
         
         self.statusBar().showMessage(f"問題 {problem_number} を追加しました")
     
@@ -344,12 +370,34 @@ class MainWindow(QMainWindow):
     
     def on_tab_changed(self, index: int):
         """タブが切り替わったときの処理"""
+        widget = self.tab_widget.widget(index)
+        if isinstance(widget, ProblemEditor):
+            widget.load_problem_text()
         self.update_undo_redo_actions()
     
     def _update_tab_titles(self):
         """タブのタイトルを更新"""
         for i, editor in enumerate(self.problem_editors):
-            self.tab_widget.setTabText(i + 1, f"問題 {i + 1}")
+            self._update_problem_tab_title(editor, f"問題 {i + 1}")
+    
+    def _update_problem_tab_title(self, editor: ProblemEditor, title: str = None):
+        """問題タブのタイトルを更新（空欄があれば数を併記）
+        
+        Args:
+            editor: 問題エディタ
+            title: 新しいタイトル（Noneは現在のタイトルのまま空欄の数だけ更新）
+        """
+        if title is not None:
+            editor.tab_title = title
+        
+        index = self.tab_widget.indexOf(editor)
+        if index < 0:
+            return
+        
+        text = editor.tab_title
+        if editor.blank_count:
+            text += f"（空欄{editor.blank_count}）"
+        self.tab_widget.setTabText(index, text)
     
     def update_window_title(self):
         """ウィンドウタイトルを更新"""
@@ -375,6 +423,11 @@ class MainWindow(QMainWindow):
             if not self.save_project():
                 return
         
+        # 保存はバックグラウンドで行うので、完了を待ってから現在のプロジェクトを捨てる
+        # （失敗した場合は捨てない）
+        if not self._finish_save():
+            return
+        
         # 新規プロジェクト作成
         self.current_project = Project()
         self.problem_editors.clear()
@@ -402,6 +455,10 @@ class MainWindow(QMainWindow):
         if not file_path:
             return
         
+        # 実行中の保存の完了を待ってから現在のプロジェクトを置き換える（失敗した場合は開かない）
+        if not self._finish_save():
+            return
+        
         try:
             self.current_project = Project.load(Path(file_path))
             
@@ -419,16 +476,20 @@ class MainWindow(QMainWindow):
                 # cover_content は辞書形式なのでそのまま設定
                 self.cover_editor.set_cover_data(self.current_project.cover_content)
             
-            # 問題を読み込み
+            # 問題を読み込み（問題文はタブを開いた時に読み込む）
             for i, problem in enumerate(self.current_project.problems):
                 problem_editor = ProblemEditor()
-                problem_editor.set_text(problem.content)
                 if hasattr(problem, 'score'):
                     problem_editor.set_score(problem.score)
                 if hasattr(problem, 'problem_type'):
                     problem_editor.set_problem_type(problem.problem_type)
+                problem_editor.bind_problem(problem)
+                problem_editor.blank_count_changed.connect(
+                    lambda count, editor=problem_editor: self._update_problem_tab_title(editor)
+                )
                 self.problem_editors.append(problem_editor)
                 self.tab_widget.addTab(problem_editor, f"問題 {i + 1}")
+                self._update_problem_tab_title(problem_editor, f"問題 {i + 1}")
             
             self.update_window_title()
             self.statusBar().showMessage(f"プロジェクトを開きました: {Path(file_path).name}")
@@ -462,7 +523,11 @@ class MainWindow(QMainWindow):
         return self._do_save()
     
     def _do_save(self) -> bool:
-        """実際の保存処理"""
+        """実際の保存処理（書き出しはバックグラウンドで行い、完了は _check_save で確認）"""
+        # 前の保存が終わっていなければ待つ（同じファイルに同時に書き出さない）
+        if not self._finish_save():
+            return False
+        
         try:
             # 表紙データをプロジェクトに保存
             self.current_project.cover_content = self.cover_editor.get_cover_data()
@@ -470,13 +535,18 @@ class MainWindow(QMainWindow):
             # エディタの内容をプロジェクトに保存
             for i, editor in enumerate(self.problem_editors):
                 if i < len(self.current_project.problems):
-                    self.current_project.problems[i].content = editor.get_text()
-                    self.current_project.problems[i].score = editor.get_score()
-                    self.current_project.problems[i].problem_type = editor.get_problem_type()
+                    problem = self.current_project.problems[i]
+                    # 問題文は編集のたびに問題へ反映済み。未表示のタブ（text_loaded が False）の
+                    # 問題文は読み込まずに、保存時に元のファイルから写す
+                    if editor.text_loaded and editor.problem is not problem:
+                        problem.content = editor.get_text()
+                    problem.score = editor.get_score()
+                    problem.problem_type = editor.get_problem_type()
             
-            self.current_project.save(self.current_project.file_path)
+            self._save_task = self.current_project.save_in_background(self.current_project.file_path)
+            self._save_timer.start()
             self.update_window_title()
-            self.statusBar().showMessage(f"保存しました: {self.current_project.file_path.name}")
+            self.statusBar().showMessage(f"保存しています: {self.current_project.file_path.name}")
             return True
         
         except Exception as e:
@@ -486,6 +556,35 @@ class MainWindow(QMainWindow):
             )
             return False
     
+    def _check_save(self):
+        """バックグラウンドの保存が終わっていれば後処理する"""
+        if self._save_task is None or self._save_task.is_done():
+            self._finish_save()
+    
+    def _finish_save(self) -> bool:
+        """バックグラウンドの保存の完了を待って後処理する
+        
+        Returns:
+            保存していない、または保存に成功したか
+        """
+        task = self._save_task
+        self._save_timer.stop()
+        if task is None:
+            return True
+        
+        self._save_task = None
+        try:
+            task.finish()
+        except Exception as e:
+            self.statusBar().showMessage("保存に失敗しました")
+            QMessageBox.critical(
+                self, "エラー",
+                f"保存に失敗しました（前の版は残っています）:\n{str(e)}"
+            )
+            return False
+        self.statusBar().showMessage(f"保存しました: {task.file_path.name}")
+        return True
+    
     def insert_inline_math(self):
         """インライン数式を挿入"""
         current_widget = self.tab_widget.currentWidget()
@@ -792,6 +891,9 @@ class MainWindow(QMainWindow):
         """印刷リクエストを処理"""
         action = settings.get('action')
         
+        # PDF出力（QtWebEngine）でも同じ用紙の向き・余白を使うため保存
+        config.set('print', {k: v for k, v in settings.items() if k != 'action'})
+        
         if action == 'preview':
             self.show_print_preview(settings)
         elif action == 'print':
@@ -822,29 +924,16 @@ class MainWindow(QMainWindow):
         try:
             exporter = HTMLExporter()
             
-            # 印刷設定をエクスポートオプションに変換
-            export_options = {
-                'show_cover': settings.get('print_cover', True),
-                'show_problem_numbers': True,
-                'generate_answer_sheet': settings.get('print_answer_sheet', False),
-                'page_size': self._convert_paper_size(settings.get('paper_size', 'A4 (210 x 297 mm)')),
-                'margin': f"{settings.get('margin_top', 15)}mm {settings.get('margin_right', 20)}mm "
-                         f"{settings.get('margin_bottom', 15)}mm {settings.get('margin_left', 20)}mm",
-            }
-            
-            # 表紙情報を設定
-            cover_data = self.cover_editor.get_cover_data()
-            export_options.update({
-                'exam_title': cover_data.get('title', self.current_project.title),
-                'exam_subtitle': cover_data.get('subtitle', ''),
-                'exam_date': cover_data.get('date', ''),
-                'school_name': cover_data.get('school', ''),
-                'grade': cover_data.get('grade', ''),
-                'subject': cover_data.get('subject', '数学'),
-                'time_limit': cover_data.get('time_limit', ''),
-                'total_score': cover_data.get('total_score', ''),
-                'notes': cover_data.get('notes', ''),
-            })
+            # 印刷設定をエクスポートオプションに変換（表紙情報を含む）
+            export_options = ExportOptions(
+                show_cover=settings.get('print_cover', True),
+                show_problem_numbers=True,
+                generate_answer_sheet=settings.get('print_answer_sheet', False),
+                page_size=self._convert_paper_size(settings.get('paper_size', 'A4 (210 x 297 mm)')),
+                margin=f"{settings.get('margin_top', 15)}mm {settings.get('margin_right', 20)}mm "
+                       f"{settings.get('margin_bottom', 15)}mm {settings.get('margin_left', 20)}mm",
+                **self.cover_editor.get_cover_data()
+            )
             
             html_content = exporter._generate_html(self.current_project, export_options)
             
@@ -985,7 +1074,11 @@ class MainWindow(QMainWindow):
         
         from PySide6.QtWidgets import QInputDialog
         
-        current_name = self.tab_widget.tabText(index)
+        widget = self.tab_widget.widget(index)
+        if isinstance(widget, ProblemEditor):
+            current_name = widget.tab_title
+        else:
+            current_name = self.tab_widget.tabText(index)
         new_name, ok = QInputDialog.getText(
             self,
             "問題名を変更",
@@ -994,7 +1087,10 @@ class MainWindow(QMainWindow):
         )
         
         if ok and new_name.strip():
-            self.tab_widget.setTabText(index, new_name.strip())
+            if isinstance(widget, ProblemEditor):
+                self._update_problem_tab_title(widget, new_name.strip())
+            else:
+                self.tab_widget.setTabText(index, new_name.strip())
             self.is_modified = True
             self.statusBar().showMessage(f"問題名を「{current_name}」から「{new_name.strip()}」に変更しました。")
     
@@ -1065,28 +1161,210 @@ class MainWindow(QMainWindow):
     def closeEvent(self, event):
         """ウィンドウを閉じる時の処理"""
         self.save_window_settings()
+        
+        # 実行中の保存は完了を待つ（失敗した場合は閉じない）
+        if not self._finish_save():
+            event.ignore()
+            return
+        
+        # 実行中のPDF出力を中止（ワーカープロセスを残さない）
+        from .dialogs import ExportProgressDialog
+        for progress_dialog in self.findChildren(ExportProgressDialog):
+            progress_dialog.close()
+        
         event.accept()
 
+    def _format_export_sizes(self, stats: dict) -> str:
+        """エクスポートのサイズ情報を表示用文字列に変換"""
+        def kb(size: int) -> str:
+            return f"{size / 1024:,.1f} KB"
+        
+        text = kb(stats['output_size'])
+        if stats['output_size'] != stats['original_size']:
+            text = f"{kb(stats['original_size'])} → {text}"
+        if stats.get('compressed_size') is not None:
+            text += f"、gzip: {kb(stats['compressed_size'])}"
+        return text
+
+    def _sync_project_for_export(self, cover_data: dict):
+        """エディタの内容と表紙データをプロジェクトに反映"""
+        for i, editor in enumerate(self.problem_editors):
+            if i < len(self.current_project.problems):
+                self.current_project.problems[i].content = editor.get_text()
+                self.current_project.problems[i].score = editor.get_score()
+                self.current_project.problems[i].problem_type = editor.get_problem_type()
+        
+        # 表紙データをプロジェクトに保存（JSON形式）
+        self.current_project.cover_content = json.dumps(cover_data, ensure_ascii=False)
+    
+    def export_class_set(self):
+        """名簿の生徒ごとに番号・氏名を印字したPDFを作成"""
+        from .dialogs import ExportDialog
+        from .exporters.class_set import ClassSetExporter, load_roster
+        
+        if not ClassSetExporter.is_available():
+            QMessageBox.warning(
+                self, "PDF出力エラー",
+                "クラス分のPDFの作成には weasyprint と pypdf のインストールが必要です:\n\n"
+                "  pip install weasyprint pypdf"
+            )
+            return
+        
+        roster_path, _ = QFileDialog.getOpenFileName(
+            self, "名簿を選択", str(Path.home()),
+            "CSV Files (*.csv);;All Files (*)"
+        )
+        if not roster_path:
+            return
+        
+        try:
+            students = load_roster(roster_path)
+        except (OSError, UnicodeDecodeError, ValueError) as e:
+            QMessageBox.critical(self, "エラー", f"名簿を読み込めませんでした:\n{str(e)}")
+            return
+        
+        dialog = ExportDialog(self)
+        if dialog.exec() != QDialog.Accepted:
+            return
+        
+        # 欄の位置はWeasyPrintのレイアウトから取得するため、エンジンは固定する
+        cover_data = self.cover_editor.get_cover_data()
+        options = dialog.get_options().replace(format='pdf', pdf_engine='weasyprint', **cover_data)
+        
+        answer = QMessageBox.question(
+            self, "クラス分のPDF",
+            f"{len(students)} 人分のPDFを作成します。\n\n"
+            "生徒ごとに別のファイルに出力しますか？\n"
+            "（「いいえ」を選ぶと1つのPDFにまとめます）",
+            QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel,
+            QMessageBox.No
+        )
+        if answer == QMessageBox.Cancel:
+            return
+        per_student = answer == QMessageBox.Yes
+        
+        default_name = f"{self.current_project.title}_{Path(roster_path).stem}"
+        if per_student:
+            output_path = QFileDialog.getExistingDirectory(self, "出力先のフォルダを選択", str(Path.home()))
+        else:
+            output_path, _ = QFileDialog.getSaveFileName(
+                self, "クラス分のPDFを保存", str(Path.home() / f"{default_name}.pdf"),
+                "PDF Files (*.pdf);;All Files (*)"
+            )
+        if not output_path:
+            return
+        
+        self._sync_project_for_export(cover_data)
+        self._start_pdf_export(Path(output_path), options, students=students, per_student=per_student)
+        self.statusBar().showMessage(f"{len(students)} 人分のPDFを出力しています")
+    
+    def _start_pdf_export(self, output_path: Path, options: ExportOptions,
+                          students=None, per_student: bool = False):
+        """PDF出力を別プロセスで開始（進捗ダイアログ付き・キャンセル可能）
+        
+        students を指定した場合は名簿の生徒ごとに番号・氏名を印字したPDFを出力する。
+        """
+        from .dialogs import ExportProgressDialog
+        from .exporters.pdf_worker import PDFExportProcess
+        
+        progress_dialog = ExportProgressDialog(
+            PDFExportProcess(self.current_project, output_path, options,
+                             students=students, per_student=per_student), self
+        )
+        progress_dialog.setAttribute(Qt.WA_DeleteOnClose)
+        progress_dialog.export_finished.connect(self._on_pdf_export_finished)
+        progress_dialog.export_failed.connect(self._on_pdf_export_failed)
+        progress_dialog.export_cancelled.connect(
+            lambda: self.statusBar().showMessage("PDFエクスポートを中止しました")
+        )
+        progress_dialog.start()
+    
+    def _start_webengine_pdf_export(self, output_path: Path, options: ExportOptions):
+        """QtWebEngineでPDF出力を開始（MathJaxの描画を待つ間もUIは操作可能）"""
+        from .exporters import HTMLExporter
+        from .exporters.webengine_pdf import get_shared_renderer, page_layout_from_settings
+        
+        renderer = get_shared_renderer()
+        if renderer.is_busy():
+            QMessageBox.information(self, "PDFエクスポート", "前のPDF出力が完了するまでお待ちください。")
+            return
+        
+        if not getattr(self, '_webengine_export_connected', False):
+            renderer.finished.connect(self._on_webengine_pdf_finished)
+            self._webengine_export_connected = True
+        
+        html_content = HTMLExporter()._generate_html(self.current_project, options)
+        page_layout = page_layout_from_settings(config.get('print', {}), options.page_size)
+        renderer.render_async(html_content, str(output_path), page_layout)
+    
+    def _on_webengine_pdf_finished(self, file_path: str, success: bool):
+        """QtWebEngineでのPDF出力の完了"""
+        if success:
+            self._on_pdf_export_finished(file_path, None)
+        else:
+            self._on_pdf_export_failed("QtWebEngineでのPDF生成に失敗しました")
+    
+    def _on_pdf_export_finished(self, file_path: str, page_count):
+        """PDF出力の完了"""
+        pages = f"（{page_count} ページ）" if page_count else ""
+        self.statusBar().showMessage(f"PDFファイルを出力しました: {Path(file_path).name}{pages}")
+        self._ask_open_exported_file(file_path, "PDF")
+    
+    def _on_pdf_export_failed(self, message: str):
+        """PDF出力の失敗"""
+        self.statusBar().showMessage("PDFエクスポートに失敗しました")
+        if message.startswith("ImportError"):
+            QMessageBox.warning(
+                self, "PDF出力エラー",
+                f"PDF出力には追加のライブラリが必要です:\n\n{message}\n\n"
+                "以下のコマンドでインストールしてください:\n"
+                "  pip install weasyprint\n"
+                "または\n"
+                "  pip install xhtml2pdf"
+            )
+        else:
+            QMessageBox.critical(
+                self, "エラー",
+                f"エクスポートに失敗しました:\n{message}"
+            )
+    
+    def _ask_open_exported_file(self, file_path: str, kind: str):
+        """出力したファイルを開くか確認"""
+        reply = QMessageBox.question(
+            self, "エクスポート完了",
+            f"{kind}ファイルを出力しました。\n開きますか？",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        
+        if reply == QMessageBox.Yes:
+            try:
+                # プラットフォーム固有のファイルオープン
+                if sys.platform == 'win32':  # Windows
+                    os.startfile(file_path)
+                elif sys.platform == 'darwin':  # macOS
+                    subprocess.Popen(['open', file_path])
+                else:  # Linux
+                    subprocess.Popen(['xdg-open', file_path])
+            except Exception as e:
+                # フォールバック: webbrowser
+                import webbrowser
+                webbrowser.open(f'file://{os.path.abspath(file_path)}')
+
     def export_html(self):
         """HTMLまたはPDFとしてエクスポート"""
         from .dialogs import ExportDialog
         from .exporters import HTMLExporter, PDFExporter
         
-        # PDF Exporterが利用できない場合の確認
-        if PDFExporter is None:
-            # PDF選択時にエラーメッセージを表示
-            pass  # ExportDialogで制御
-        
-        # エクスポート設定ダイアログを表示
+        # エクスポート設定ダイアログを表示（PDFが利用できない場合はダイアログで選択不可）
         dialog = ExportDialog(self)
         if dialog.exec() != QDialog.Accepted:
             return
         
         options = dialog.get_options()
-        export_format = options.get('format', 'html')
+        export_format = options.format
         
-        # PDFが選択されたがPDFExporterが利用できない場合
-        if export_format == 'pdf' and PDFExporter is None:
+        # PDFが選択されたがPDF出力ライブラリが利用できない場合
+        if export_format == 'pdf' and not PDFExporter().is_available(options.pdf_engine)[0]:
             QMessageBox.warning(
                 self, "PDF出力エラー",
                 "PDF出力には追加のライブラリが必要です。\n\n"
@@ -1099,7 +1377,7 @@ class MainWindow(QMainWindow):
         
         # 表紙データを追加
         cover_data = self.cover_editor.get_cover_data()
-        options.update(cover_data)
+        options = options.replace(**cover_data)
         
         # 保存先を選択
         if export_format == 'pdf':
@@ -1122,67 +1400,26 @@ class MainWindow(QMainWindow):
             return
         
         try:
-            # エディタの内容をプロジェクトに保存
-            for i, editor in enumerate(self.problem_editors):
-                if i < len(self.current_project.problems):
-                    self.current_project.problems[i].content = editor.get_text()
-                    self.current_project.problems[i].score = editor.get_score()
-                    self.current_project.problems[i].problem_type = editor.get_problem_type()
-            
-            # 表紙データをプロジェクトに保存（JSON形式）
-            self.current_project.cover_content = json.dumps(cover_data, ensure_ascii=False)
+            self._sync_project_for_export(cover_data)
             
             # エクスポート
             if export_format == 'pdf':
-                exporter = PDFExporter()
-                exporter.export(self.current_project, Path(file_path), options)
-                self.statusBar().showMessage(f"PDFファイルを出力しました: {Path(file_path).name}")
-                
-                # 確認ダイアログ
-                reply = QMessageBox.question(
-                    self, "エクスポート完了",
-                    "PDFファイルを出力しました。\n開きますか？",
-                    QMessageBox.Yes | QMessageBox.No
-                )
-                
-                if reply == QMessageBox.Yes:
-                    try:
-                        # プラットフォーム固有のファイルオープン
-                        if sys.platform == 'win32':  # Windows
-                            os.startfile(file_path)
-                        elif sys.platform == 'darwin':  # macOS
-                            subprocess.Popen(['open', file_path])
-                        else:  # Linux
-                            subprocess.Popen(['xdg-open', file_path])
-                    except Exception as e:
-                        # フォールバック: webbrowser
-                        import webbrowser
-                        webbrowser.open(f'file://{os.path.abspath(file_path)}')
+                # PDFはバックグラウンドで出力（完了は _on_pdf_export_finished で受け取る）
+                _, engine = PDFExporter().is_available(options.pdf_engine)
+                if engine == 'webengine':
+                    self._start_webengine_pdf_export(Path(file_path), options)
+                else:
+                    # ワーカープロセスでも同じエンジンを使うよう確定させて渡す
+                    self._start_pdf_export(Path(file_path), options.replace(pdf_engine=engine or ''))
+                self.statusBar().showMessage(f"PDFを出力しています: {Path(file_path).name}")
             else:
                 exporter = HTMLExporter()
-                exporter.export(self.current_project, Path(file_path), options)
-                self.statusBar().showMessage(f"HTMLファイルを出力しました: {Path(file_path).name}")
-                
-                # 確認ダイアログ
-                reply = QMessageBox.question(
-                    self, "エクスポート完了",
-                    "HTMLファイルを出力しました。\n開きますか？",
-                    QMessageBox.Yes | QMessageBox.No
+                stats = exporter.export(self.current_project, Path(file_path), options)
+                self.statusBar().showMessage(
+                    f"HTMLファイルを出力しました: {Path(file_path).name}"
+                    f"（{self._format_export_sizes(stats)}）"
                 )
-                
-                if reply == QMessageBox.Yes:
-                    try:
-                        # プラットフォーム固有のファイルオープン
-                        if sys.platform == 'win32':  # Windows
-                            os.startfile(file_path)
-                        elif sys.platform == 'darwin':  # macOS
-                            subprocess.Popen(['open', file_path])
-                        else:  # Linux
-                            subprocess.Popen(['xdg-open', file_path])
-                    except Exception as e:
-                        # フォールバック: webbrowser
-                        import webbrowser
-                        webbrowser.open(f'file://{os.path.abspath(file_path)}')
+                self._ask_open_exported_file(file_path, "HTML")
         
         except ImportError as e:
             QMessageBox.warning(
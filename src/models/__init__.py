@@ -2,5 +2,8 @@
 """データモデルパッケージ"""
 
 from .project import Project, Problem
+from .export_options import ExportOptions
+from .roster import Student, load_roster
+from . import serializer
 
-__all__ = ['Project', 'Problem']
+__all__ = ['Project', 'Problem', 'ExportOptions', 'Student', 'load_roster']
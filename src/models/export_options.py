@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""エクスポートオプションデータモデル"""
+
+import hashlib
+import json
+from dataclasses import dataclass, asdict, fields, replace
+from functools import cached_property
+from typing import Any, Dict, Optional, Union
+
+
+@dataclass(frozen=True)
+class ExportOptions:
+    """エクスポートオプション（不変・ハッシュ可能）
+    
+    キャッシュのキーとして使えるよう、内容から安定したフィンガープリントを生成する。
+    フィンガープリントは層ごとに分かれており、例えばフォントサイズの変更は
+    テンプレート層だけを無効化し、問題ごとのHTML断片は再利用できる。
+    """
+    
+    # 出力形式
+    format: str = 'html'
+    
+    # ページレイアウト
+    page_size: str = 'A4'
+    problems_per_page: int = 1
+    
+    # 表示内容
+    show_cover: bool = True
+    show_problem_numbers: bool = True
+    generate_answer_sheet: bool = False
+    page_numbers: bool = False
+    
+    # スタイル
+    font_size: int = 12
+    line_spacing: float = 1.8
+    margin: str = '20mm'
+    
+    # 表紙（CoverEditor.get_cover_data と同じキー）
+    exam_title: str = ''
+    exam_subtitle: str = ''
+    exam_date: str = ''
+    school_name: str = ''
+    grade: str = ''
+    subject: str = '数学'
+    time_limit: str = ''
+    total_score: str = ''
+    notes: str = ''
+    
+    # 型（A型・B型…）
+    form_label: str = ''
+    
+    # HTML出力
+    pretypeset_math: bool = False
+    minify_html: bool = False
+    gzip_output: bool = False
+    
+    # 埋め込み画像を印刷時の解像度に合わせて縮小する（0は元の画像のまま）
+    image_dpi: int = 0
+    # 縮小した写真のJPEG画質
+    image_quality: int = 85
+    
+    # PDF出力エンジン（空文字は自動選択、PDF_ENGINES のいずれか）
+    pdf_engine: str = ''
+    # PDF出力（セクションを並列にレンダリングするプロセス数、1は一括レンダリング）
+    pdf_workers: int = 1
+    # レンダリング済みのページをキャッシュし、変更のないページを再利用する
+    pdf_cache: bool = False
+    # このページ数ごとに分けてレイアウトし、順に書き出す（0は分けない）
+    # レイアウト中のメモリ使用量が最大のひとまとまり分に抑えられる
+    pdf_chunk_pages: int = 0
+    
+    # 表紙の項目（プロジェクトの cover_content から補完できるもの）
+    COVER_FIELDS = ('exam_title', 'exam_subtitle', 'exam_date', 'school_name', 'grade',
+                    'subject', 'time_limit', 'total_score', 'notes')
+    
+    # テンプレート層（ドキュメント全体のCSS）に影響する項目
+    TEMPLATE_FIELDS = ('page_size', 'font_size', 'line_spacing', 'margin', 'page_numbers')
+    
+    # 問題ごとのHTML断片に影響する項目
+    FRAGMENT_FIELDS = ('pretypeset_math', 'image_dpi', 'image_quality')
+    
+    FORMATS = ('html', 'pdf')
+    
+    PDF_ENGINES = ('weasyprint', 'xhtml2pdf', 'webengine')
+    
+    def __post_init__(self):
+        if self.format not in self.FORMATS:
+            raise ValueError(f"不明な出力形式です: {self.format}")
+        if self.problems_per_page < 1:
+            raise ValueError(f"1ページあたりの大問数は1以上にしてください: {self.problems_per_page}")
+        if self.pdf_engine and self.pdf_engine not in self.PDF_ENGINES:
+            raise ValueError(f"不明なPDF出力エンジンです: {self.pdf_engine}")
+        if self.pdf_workers < 1:
+            raise ValueError(f"PDF出力のプロセス数は1以上にしてください: {self.pdf_workers}")
+        if self.pdf_chunk_pages < 0:
+            raise ValueError(f"分割レンダリングのページ数は0以上にしてください: {self.pdf_chunk_pages}")
+        # 画面表示の解像度（96dpi）未満にすると width 属性のない画像の表示サイズが変わる
+        if self.image_dpi and not 96 <= self.image_dpi <= 1200:
+            raise ValueError(f"画像の解像度は96〜1200dpiにしてください: {self.image_dpi}")
+        if not 1 <= self.image_quality <= 95:
+            raise ValueError(f"画像の画質は1〜95にしてください: {self.image_quality}")
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ExportOptions':
+        """辞書から生成
+        
+        Raises:
+            ValueError: 不明なキーが含まれている場合
+        """
+        known = {f.name for f in fields(cls)}
+        unknown = sorted(set(data) - known)
+        if unknown:
+            raise ValueError(f"不明なエクスポートオプションです: {', '.join(unknown)}")
+        return cls(**data)
+    
+    @classmethod
+    def coerce(cls, options: Optional[Union['ExportOptions', Dict[str, Any]]]) -> 'ExportOptions':
+        """None・辞書・ExportOptions のいずれかを ExportOptions に変換"""
+        if options is None:
+            return cls()
+        if isinstance(options, cls):
+            return options
+        return cls.from_dict(options)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """辞書に変換"""
+        return asdict(self)
+    
+    def replace(self, **changes) -> 'ExportOptions':
+        """一部の値を変更したコピーを生成"""
+        return replace(self, **changes)
+    
+    @cached_property
+    def fingerprint(self) -> str:
+        """全項目のフィンガープリント（プロセスをまたいでも同じ値）"""
+        return self._digest(self.to_dict())
+    
+    @cached_property
+    def template_fingerprint(self) -> str:
+        """テンプレート層のフィンガープリント"""
+        return self._digest({name: getattr(self, name) for name in self.TEMPLATE_FIELDS})
+    
+    @cached_property
+    def fragment_fingerprint(self) -> str:
+        """問題ごとのHTML断片のフィンガープリント"""
+        return self._digest({name: getattr(self, name) for name in self.FRAGMENT_FIELDS})
+    
+    @staticmethod
+    def _digest(values: Dict[str, Any]) -> str:
+        payload = json.dumps(values, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
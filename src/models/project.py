@@ -1,11 +1,13 @@
 # -*- coding: utf-8 -*-
 """プロジェクトデータモデル"""
 
-import json
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 import sys
+import threading
+
+from .project_file import ProjectArchive, open_project_file, write_archive
 
 # プラットフォーム互換性のための設定
 if sys.platform.startswith('win'):
@@ -20,17 +22,104 @@ class Problem:
     def __init__(self, title: str = "", content: str = "", score: str = "", 
                  problem_type: str = "required"):
         self.title = title
-        self.content = content
+        self._content = content
+        self._source = None  # 問題文の読み込み元（プロジェクトファイルから遅延読み込みする場合）
+        self._blank_index = None  # 空欄の索引（最初に参照した時に作成）
         self.score = score  # 配点（例: "15", "20点"）
         self.problem_type = problem_type  # "required" (必答) or "optional" (選択)
         self.created_at = datetime.now().isoformat()
         self.updated_at = datetime.now().isoformat()
     
+    @property
+    def content(self) -> str:
+        """問題文（プロジェクトファイルから開いた問題は最初に参照した時に読み込む）"""
+        source = self._source
+        if source is None:
+            return self._content
+        
+        content = self._content
+        if content is None:
+            content = self._content = source.read()
+        source.touch(self)
+        return content
+    
+    @content.setter
+    def content(self, content: str):
+        if content != self._content:
+            self._detach()
+            self._content = content
+            self._blank_index = None
+    
+    @property
+    def content_loaded(self) -> bool:
+        """問題文がメモリにあるか"""
+        return self._content is not None
+    
+    @property
+    def blank_index(self):
+        """空欄の索引（BlankIndex）"""
+        if self._blank_index is None:
+            from ..utils.blank_scanner import BlankIndex
+            self._blank_index = BlankIndex(self.content)
+        return self._blank_index
+    
+    def update_content(self, content: str, position: int, removed: int, added: int):
+        """エディタでの編集を反映（空欄の索引は編集箇所だけ走査し直す）
+        
+        Args:
+            content: 編集後の問題文
+            position: 編集した位置
+            removed: 削除した文字数
+            added: 追加した文字数
+        """
+        self.blank_index.update(content, position, removed, added)
+        self._detach()
+        self._content = content
+    
+    def _attach(self, source):
+        """問題文の読み込み元を設定（編集していない問題文はLRUで捨てられる）"""
+        self._detach()
+        self._source = source
+        if self._content is not None:
+            source.touch(self)
+    
+    def _attach_saved(self, source, saved_content):
+        """保存した問題文と同じなら、保存先を読み込み元にする（保存中に編集された問題は除く）
+        
+        Args:
+            source: 保存先の読み込み元
+            saved_content: 保存した問題文、または複製した読み込み元（_save_snapshot の content）
+        """
+        if isinstance(saved_content, str):
+            if self._source is None and self._content != saved_content:
+                return
+        elif self._source is not saved_content:
+            return
+        self._attach(source)
+    
+    def _detach(self):
+        """読み込み元と切り離す（直後に問題文を設定する。編集した問題文は捨てない）"""
+        if self._source is not None:
+            self._source.forget(self)
+            self._source = None
+    
+    def _unload(self):
+        """問題文をメモリから捨てる（ContentCache から呼ばれる。空欄の索引は残す）"""
+        if self._source is not None:
+            self._content = None
+    
     def to_dict(self) -> Dict[str, Any]:
         """辞書に変換"""
+        return self._to_dict(self.content)
+    
+    def _save_snapshot(self) -> Dict[str, Any]:
+        """保存用の辞書（編集していない問題文は読み込まず、読み込み元の ContentSource を入れる）"""
+        return self._to_dict(self._source if self._source is not None else self._content)
+    
+    def _to_dict(self, content) -> Dict[str, Any]:
         return {
             "title": self.title,
-            "content": self.content,
+            "content": content,
             "score": self.score,
             "problem_type": self.problem_type,
             "created_at": self.created_at,
@@ -75,11 +164,18 @@ class Project:
     
     def to_dict(self) -> Dict[str, Any]:
         """辞書に変換"""
+        return self._to_dict([p.to_dict() for p in self.problems])
+    
+    def _save_snapshot(self) -> Dict[str, Any]:
+        """保存用の辞書（問題文は Problem._save_snapshot を参照）"""
+        return self._to_dict([p._save_snapshot() for p in self.problems])
+    
+    def _to_dict(self, problems: List[Dict[str, Any]]) -> Dict[str, Any]:
         return {
             "version": "1.0",
             "title": self.title,
             "cover_content": self.cover_content,
-            "problems": [p.to_dict() for p in self.problems],
+            "problems": problems,
             "created_at": self.created_at,
             "updated_at": self.updated_at
         }
@@ -104,35 +200,117 @@ class Project:
         return project
     
     def save(self, file_path: Path):
-        """プロジェクトを保存（プラットフォーム互換）"""
-        self.file_path = file_path
-        self.updated_at = datetime.now().isoformat()
+        """プロジェクトを保存（第2版: zip形式、画像はバイナリで格納）
         
-        # UTF-8で統一（Windows でも BOM なし）
-        with open(file_path, 'w', encoding='utf-8', newline='\n') as f:
-            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        一時ファイルに書き出してから置き換え、前の版は .bak として残す（ProjectSave を参照）。
+        """
+        ProjectSave(self, file_path).run()
+    
+    def save_in_background(self, file_path: Path) -> 'ProjectSave':
+        """プロジェクトをバックグラウンドのスレッドで保存
+        
+        呼び出した時点の内容を保存する。完了したら（is_done()）、呼び出し元のスレッドで
+        finish() を呼ぶこと。
+        
+        Returns:
+            開始した保存（ProjectSave）
+        """
+        task = ProjectSave(self, file_path)
+        task.start()
+        return task
     
     @classmethod
     def load(cls, file_path: Path) -> 'Project':
-        """プロジェクトを読み込み（プラットフォーム互換）"""
-        # UTF-8 で読み込み（Windows の BOM も自動処理）
-        encodings = ['utf-8-sig', 'utf-8', 'cp932', 'shift-jis']
-        
-        for encoding in encodings:
-            try:
-                with open(file_path, 'r', encoding=encoding) as f:
-                    data = json.load(f)
-                
-                project = cls.from_dict(data)
-                project.file_path = file_path
-                return project
-            except (UnicodeDecodeError, json.JSONDecodeError):
-                continue
+        """プロジェクトを読み込み（第1版のJSONもそのまま読める。次の保存で第2版になる）"""
+        document = open_project_file(file_path)
+        if isinstance(document, ProjectArchive):
+            # 問題文は最初に参照した時に読み込む
+            project = cls.from_dict(document.project_data())
+            for problem, source in zip(project.problems, document.sources()):
+                problem._content = None
+                problem._attach(source)
+        else:
+            project = cls.from_dict(document)
         
-        # すべて失敗した場合
-        raise ValueError(f"プロジェクトファイルを読み込めませんでした: {file_path}")
+        project.file_path = file_path
+        return project
     
     def is_modified(self) -> bool:
         """変更されているかチェック"""
         # 簡易実装：更新日時をチェック
         return True  # 後で実装
+
+
+class ProjectSave:
+    """プロジェクトの保存
+    
+    作成した時点のプロジェクトの内容を複製しておき、zip への変換と書き出しは
+    バックグラウンドのスレッドで行う。複製するのはメモリにある（編集した）問題文だけで、
+    編集していない問題は読み込み元（ContentSource）を覚えておき、書き出しのスレッドで
+    元のファイルから問題文と画像のエントリをそのまま写す。書き出しは同じディレクトリの
+    一時ファイルに fsync まで済ませてから保存先に置き換え、前の版は .bak として残す。
+    
+    使い方:
+        task = project.save_in_background(path)
+        # 定期的に確認し、完了したら呼び出し元のスレッドで後処理する
+        if task.is_done():
+            task.finish()   # 失敗した場合は例外を送出
+    """
+    
+    def __init__(self, project: 'Project', file_path: Path):
+        """
+        Args:
+            project: プロジェクト
+            file_path: 保存先
+        """
+        project.file_path = file_path
+        project.updated_at = datetime.now().isoformat()
+        
+        self.project = project
+        self.file_path = Path(file_path)
+        self.problems = list(project.problems)
+        # 保存中に編集されても影響しないよう、開始時点の内容を複製する
+        self.data = project._save_snapshot()
+        self.error: Optional[BaseException] = None
+        self._thread: Optional[threading.Thread] = None
+        self._finished = False
+    
+    def start(self):
+        """バックグラウンドで書き出しを開始"""
+        # 書きかけで終了しないよう daemon にはしない
+        self._thread = threading.Thread(target=self._write, name="project-save")
+        self._thread.start()
+    
+    def run(self):
+        """このスレッドで書き出し、後処理まで行う"""
+        self._write()
+        self.finish()
+    
+    def is_done(self) -> bool:
+        """書き出しが終わったか"""
+        return self._thread is None or not self._thread.is_alive()
+    
+    def finish(self):
+        """書き出しの完了を待ち、保存した問題を保存先から読み直せるようにする
+        
+        Raises:
+            書き出しで発生した例外
+        """
+        if self._thread is not None:
+            self._thread.join()
+        if self._finished:
+            return
+        self._finished = True
+        if self.error is not None:
+            raise self.error
+        
+        archive = ProjectArchive(self.file_path)
+        for problem, source, saved in zip(self.problems, archive.sources(), self.data["problems"]):
+            problem._attach_saved(source, saved["content"])
+    
+    def _write(self):
+        """zip に変換して書き出す"""
+        try:
+            write_archive(self.data, self.file_path)
+        except BaseException as e:
+            self.error = e
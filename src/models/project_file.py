@@ -0,0 +1,525 @@
+# -*- coding: utf-8 -*-
+"""プロジェクトファイル（.mep 第2版）の読み書き
+
+第2版の .mep は zip 形式で、次のエントリを持つ。
+
+    manifest.json        題名・表紙・問題ごとの属性と、画像の一覧
+    problems/0001.md     問題文（1問1エントリ）
+    images/<sha256>.png  画像の中身（バイナリのまま、無圧縮）
+
+問題文に data URI（data:image/png;base64,...）で埋め込まれた画像は、
+保存時に中身のSHA-256で images/ に1つだけ書き出し、問題文には
+mep-image:<sha256> という参照を残す。読み込み時に data URI へ戻すので、
+エディタや出力からは第1版（JSON）と同じ問題文に見える。
+
+読み込み時は manifest.json だけを読み（ProjectArchive）、問題文は最初に
+参照された時にそのエントリだけを読む。読み込んだ問題文は ContentCache（LRU）で
+数を制限し、編集していないものはメモリから捨てて必要になったら読み直す。
+"""
+
+import base64
+import binascii
+import codecs
+import hashlib
+import io
+import os
+import re
+import shutil
+import struct
+import threading
+import zipfile
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from . import serializer
+
+# 形式の名前と版
+FORMAT_NAME = 'mep'
+FORMAT_VERSION = 2
+
+MANIFEST_NAME = 'manifest.json'
+IMAGE_SCHEME = 'mep-image:'
+
+# 埋め込み画像（data URI）と、その参照
+DATA_URI_PATTERN = re.compile(r'data:(image/[A-Za-z0-9.+-]+);base64,([A-Za-z0-9+/]+={0,2})')
+IMAGE_REFERENCE_PATTERN = re.compile(re.escape(IMAGE_SCHEME) + r'([0-9a-f]{64})')
+
+# 画像エントリの拡張子
+IMAGE_EXTENSIONS = {
+    'image/png': 'png',
+    'image/jpeg': 'jpg',
+    'image/gif': 'gif',
+    'image/webp': 'webp',
+    'image/svg+xml': 'svg',
+}
+
+# 圧縮の効くテキスト形式の画像（それ以外は圧縮済みなので無圧縮で格納）
+TEXT_IMAGE_TYPES = ('image/svg+xml',)
+
+# 保存時の前の版と、書き出し中の一時ファイル（保存先と同じディレクトリ）の拡張子
+BACKUP_SUFFIX = '.bak'
+TEMP_SUFFIX = '.part'
+
+# メモリに残す問題文の数の既定値
+DEFAULT_CACHE_SIZE = 64
+
+# zip のローカルファイルヘッダ（エントリの中身の直前にある固定長部分）
+LOCAL_HEADER_SIGNATURE = b'PK\x03\x04'
+LOCAL_HEADER_SIZE = 30
+
+# 第1版（JSON）の文字コード判定で、試しに復号する長さ（最初の非ASCII文字から）
+ENCODING_PROBE_SIZE = 4096
+NON_ASCII_PATTERN = re.compile(rb'[\x80-\xff]')
+
+
+def open_project_file(file_path: Union[str, Path]) -> Union['ProjectArchive', Dict[str, Any]]:
+    """プロジェクトファイルを開く
+    
+    先頭のバイト列で版を判定する。第2版は索引（ProjectArchive）を返し、
+    第1版（JSON）はファイルを1回だけ読み、文字コードを判定して1回だけ復号・解析する。
+    
+    Args:
+        file_path: プロジェクトファイル
+    
+    Returns:
+        第2版なら ProjectArchive、第1版なら Project.from_dict() に渡せる辞書
+    
+    Raises:
+        ValueError: 読み込めないファイル
+    """
+    with open(file_path, 'rb') as f:
+        if f.read(len(LOCAL_HEADER_SIGNATURE)) == LOCAL_HEADER_SIGNATURE:
+            raw = None
+        else:
+            f.seek(0)
+            raw = f.read()
+    
+    if raw is None:
+        return ProjectArchive(file_path)
+    return parse_legacy(raw, file_path)
+
+
+def detect_encoding(raw: bytes) -> str:
+    """第1版のファイルの文字コードを判定
+    
+    BOM があれば UTF-8。なければ最初の非ASCII文字から ENCODING_PROBE_SIZE バイトだけを
+    UTF-8 として試しに復号し、失敗したら cp932（Windows の Shift_JIS）とする。
+    
+    Args:
+        raw: ファイルの中身
+    
+    Returns:
+        文字コード名
+    """
+    if raw.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    
+    match = NON_ASCII_PATTERN.search(raw)
+    if match is None:
+        return 'utf-8'
+    
+    probe = raw[match.start():match.start() + ENCODING_PROBE_SIZE]
+    try:
+        # 末尾で途切れた文字は誤りにしない
+        codecs.getincrementaldecoder('utf-8')().decode(probe, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'cp932'
+
+
+def parse_legacy(raw: bytes, file_path: Optional[Union[str, Path]] = None) -> Dict[str, Any]:
+    """第1版（JSON）のファイルの中身を解析
+    
+    Args:
+        raw: ファイルの中身
+        file_path: エラーメッセージに表示するパス
+    
+    Returns:
+        プロジェクトの辞書
+    
+    Raises:
+        ValueError: 復号・解析できない
+    """
+    encoding = detect_encoding(raw)
+    try:
+        # UTF-8 は復号せずにそのまま渡す（JSONライブラリが検証しながら解析する）
+        if encoding == 'utf-8-sig':
+            return serializer.loads(raw[len(codecs.BOM_UTF8):])
+        if encoding == 'utf-8':
+            return serializer.loads(raw)
+        return serializer.loads(raw.decode(encoding))
+    except ValueError as e:
+        raise ValueError(f"プロジェクトファイルを読み込めませんでした: {file_path}（{encoding}: {e}）") from e
+
+
+def extract_images(content: str, images: Dict[str, tuple]) -> str:
+    """問題文の埋め込み画像を取り出し、参照に置き換える
+    
+    Args:
+        content: 問題文
+        images: 取り出した画像（SHA-256 → (MIMEタイプ, 中身)）。同じ画像は1つにまとめる
+    
+    Returns:
+        埋め込み画像を mep-image:<sha256> に置き換えた問題文
+    """
+    if 'data:image/' not in content:
+        return content
+    
+    def replace(match):
+        mime_type, encoded = match.groups()
+        try:
+            data = base64.b64decode(encoded, validate=True)
+        except binascii.Error:
+            return match.group(0)
+        # 読み込み時に同じ文字列へ戻せないもの（パディングの違い等）は埋め込みのまま残す
+        if base64.b64encode(data).decode('ascii') != encoded:
+            return match.group(0)
+        
+        digest = hashlib.sha256(data).hexdigest()
+        stored = images.setdefault(digest, (mime_type, data))
+        if stored[0] != mime_type:
+            return match.group(0)
+        return IMAGE_SCHEME + digest
+    
+    return DATA_URI_PATTERN.sub(replace, content)
+
+
+def restore_images(content: str, data_uris: Dict[str, str]) -> str:
+    """画像の参照を data URI に戻す
+    
+    Args:
+        content: 保存された問題文
+        data_uris: SHA-256 → data URI
+    
+    Returns:
+        埋め込み画像を含む問題文（未知の参照はそのまま残す）
+    """
+    if IMAGE_SCHEME not in content:
+        return content
+    return IMAGE_REFERENCE_PATTERN.sub(lambda match: data_uris.get(match.group(1), match.group(0)),
+                                       content)
+
+
+def backup_path(file_path: Union[str, Path]) -> Path:
+    """保存時に前の版を残すパス（exam.mep → exam.mep.bak）"""
+    file_path = Path(file_path)
+    return file_path.with_name(file_path.name + BACKUP_SUFFIX)
+
+
+def write_archive(data: Dict[str, Any], file_path: Union[str, Path], backup: bool = True):
+    """プロジェクトの辞書（Project.to_dict() の形）を第2版で書き出す
+    
+    同じディレクトリの一時ファイルに書き出して fsync してから保存先に置き換えるので、
+    途中で異常終了しても保存先が書きかけのファイルになることはない。保存先を変更するのは
+    最後の置き換えだけで、前の版は保存先を動かさずにハードリンク（できなければ複製）で
+    .bak として残す。
+    
+    Args:
+        data: プロジェクトの辞書
+        file_path: 保存先
+        backup: 保存先に前の版があれば .bak として残すか
+    
+    Raises:
+        OSError: 書き出し・置き換えに失敗した（置き換えに失敗した場合、保存先は前の版のまま、
+            保存した内容は一時ファイルに残る）
+    """
+    file_path = Path(file_path)
+    temp_path = file_path.with_name(file_path.name + TEMP_SUFFIX)
+    try:
+        with open(temp_path, 'wb') as f:
+            _write_zip(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        
+        if file_path.exists():
+            shutil.copymode(file_path, temp_path)
+            if backup:
+                _write_backup(file_path)
+    except BaseException:
+        if temp_path.exists():
+            temp_path.unlink()
+        raise
+    
+    try:
+        os.replace(temp_path, file_path)
+    except OSError as e:
+        # 書き出し済みの内容は捨てずに一時ファイルとして残す
+        raise OSError(e.errno, f"{file_path} を置き換えられませんでした。"
+                               f"保存した内容は {temp_path} に残っています（{e.strerror}）") from e
+    _fsync_directory(file_path.parent)
+
+
+def _write_backup(file_path: Path):
+    """保存先を動かさずに、前の版を .bak として残す
+    
+    ハードリンクなら複製せずに済み、開いた時のファイルと同じ i-node のままなので
+    ProjectArchive は保存後も .bak から読める。ハードリンクを作れないファイルシステムでは複製する。
+    """
+    backup = backup_path(file_path)
+    temp_backup = backup.with_name(backup.name + TEMP_SUFFIX)
+    if temp_backup.exists():
+        temp_backup.unlink()
+    try:
+        os.link(file_path, temp_backup)
+    except (OSError, AttributeError):
+        shutil.copy2(file_path, temp_backup)
+    # 前の .bak は新しい .bak ができてから置き換える
+    os.replace(temp_backup, backup)
+
+
+def _fsync_directory(directory: Path):
+    """ディレクトリの変更（置き換え）をディスクに書き出す（POSIXのみ）"""
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    try:
+        descriptor = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(descriptor)
+    except OSError:
+        # fsync できないファイルシステム（一部のネットワークドライブ等）
+        pass
+    finally:
+        os.close(descriptor)
+
+
+def _write_zip(data: Dict[str, Any], f):
+    """プロジェクトの辞書を zip 形式でファイルに書き出す
+    
+    問題の content が ContentSource の場合は、読み込み元のファイルから問題文と
+    画像のエントリをそのまま写す（data URI への展開と取り出しをしない）。
+    """
+    images = {}
+    problems = []
+    entries = []
+    for number, problem in enumerate(data.get('problems', []), 1):
+        meta = {key: value for key, value in problem.items() if key != 'content'}
+        meta['entry'] = f'problems/{number:04d}.md'
+        problems.append(meta)
+        content = problem.get('content', '')
+        if isinstance(content, ContentSource):
+            entries.append((meta['entry'], content.read_stored(images)))
+        else:
+            entries.append((meta['entry'], extract_images(content, images)))
+    
+    manifest = {key: value for key, value in data.items() if key not in ('version', 'problems')}
+    manifest['format'] = FORMAT_NAME
+    manifest['version'] = FORMAT_VERSION
+    manifest['problems'] = problems
+    manifest['images'] = {
+        digest: {
+            'entry': f'images/{digest}.{IMAGE_EXTENSIONS.get(mime_type, "bin")}',
+            'mime_type': mime_type,
+        }
+        for digest, (mime_type, _) in images.items()
+    }
+    
+    with zipfile.ZipFile(f, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(MANIFEST_NAME, serializer.dumps(manifest))
+        for name, content in entries:
+            archive.writestr(name, content)
+        for digest, (mime_type, blob) in images.items():
+            compression = zipfile.ZIP_DEFLATED if mime_type in TEXT_IMAGE_TYPES else zipfile.ZIP_STORED
+            archive.writestr(manifest['images'][digest]['entry'], blob, compress_type=compression)
+
+
+class ContentCache:
+    """読み込んだ問題文のLRU
+    
+    容量を超えたら、最も長く参照されていない問題の問題文をメモリから捨てる。
+    編集した問題はファイルから読み直せないので捨てない（Problem._unload が判断する）。
+    """
+    
+    def __init__(self, capacity: int = DEFAULT_CACHE_SIZE):
+        """
+        Args:
+            capacity: メモリに残す問題文の数
+        """
+        self.capacity = capacity
+        self._problems = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def touch(self, problem):
+        """問題文が参照されたことを記録し、容量を超えた分を捨てる"""
+        with self._lock:
+            self._problems[problem] = None
+            self._problems.move_to_end(problem)
+            while len(self._problems) > self.capacity:
+                evicted, _ = self._problems.popitem(last=False)
+                evicted._unload()
+    
+    def discard(self, problem):
+        """問題をLRUから外す"""
+        with self._lock:
+            self._problems.pop(problem, None)
+    
+    def __len__(self) -> int:
+        return len(self._problems)
+
+
+class ContentSource:
+    """問題文の読み込み元（プロジェクトファイルのエントリ）"""
+    
+    __slots__ = ('archive', 'entry')
+    
+    def __init__(self, archive: 'ProjectArchive', entry: str):
+        self.archive = archive
+        self.entry = entry
+    
+    def read(self) -> str:
+        """問題文を読み込む"""
+        return self.archive.read_content(self.entry)
+    
+    def read_stored(self, images: Dict[str, tuple]) -> str:
+        """保存されたままの問題文（画像は参照のまま）を読み込み、参照する画像を取り出す
+        
+        Args:
+            images: 取り出した画像（SHA-256 → (MIMEタイプ, 中身)）。既にある画像は読まない
+        
+        Returns:
+            画像の参照を含む問題文
+        """
+        return self.archive.read_stored(self.entry, images)
+    
+    def touch(self, problem):
+        """問題文が参照されたことをLRUに記録"""
+        self.archive.cache.touch(problem)
+    
+    def forget(self, problem):
+        """問題をLRUから外す（編集して読み込み元と切り離した時）"""
+        self.archive.cache.discard(problem)
+
+
+class ProjectArchive:
+    """第2版のプロジェクトファイルの索引
+    
+    開く時には manifest.json と zip の中央ディレクトリだけを読み、各エントリの
+    位置（バイト範囲）を覚えておく。問題文は最初に参照された時にその範囲だけを
+    読んで展開するので、問題数が多くてもすぐに開ける。
+    """
+    
+    def __init__(self, file_path: Union[str, Path], cache_size: int = None):
+        """
+        Args:
+            file_path: プロジェクトファイル
+            cache_size: メモリに残す問題文の数（Noneは DEFAULT_CACHE_SIZE）
+        
+        Raises:
+            ValueError: 壊れたファイル・新しすぎる版のファイル
+        """
+        self.file_path = Path(file_path)
+        self.cache = ContentCache(DEFAULT_CACHE_SIZE if cache_size is None else cache_size)
+        try:
+            with open(file_path, 'rb') as f, zipfile.ZipFile(f) as archive:
+                self._identity = self._file_identity(os.fstat(f.fileno()))
+                self._entries = {info.filename: info for info in archive.infolist()}
+                manifest = serializer.loads(archive.read(MANIFEST_NAME))
+        except (zipfile.BadZipFile, KeyError, ValueError) as e:
+            raise ValueError(f"プロジェクトファイルを読み込めませんでした: {file_path}（{e}）") from e
+        
+        if manifest.get('format') != FORMAT_NAME:
+            raise ValueError(f"プロジェクトファイルではありません: {file_path}")
+        if manifest.get('version', 0) > FORMAT_VERSION:
+            raise ValueError(f"新しい版のプロジェクトファイルです（第{manifest['version']}版）: {file_path}")
+        self.manifest = manifest
+        self.images = manifest.get('images', {})
+    
+    def project_data(self) -> Dict[str, Any]:
+        """Project.from_dict() に渡せる辞書（問題文を除く）"""
+        data = {key: value for key, value in self.manifest.items()
+                if key not in ('format', 'images', 'problems')}
+        data['problems'] = [{key: value for key, value in meta.items() if key != 'entry'}
+                            for meta in self.manifest.get('problems', [])]
+        return data
+    
+    def sources(self) -> List[ContentSource]:
+        """問題ごとの問題文の読み込み元（manifest の問題の順）"""
+        return [ContentSource(self, meta['entry']) for meta in self.manifest.get('problems', [])]
+    
+    def read_entry(self, name: str) -> bytes:
+        """エントリの中身を、記録した位置から直接読んで展開する
+        
+        Raises:
+            ValueError: エントリがない・ファイルが開いた後に書き換えられた
+        """
+        info = self._entries.get(name)
+        if info is None:
+            raise ValueError(f"プロジェクトファイルに {name} がありません: {self.file_path}")
+        
+        with open(self._locate(), 'rb') as f:
+            f.seek(info.header_offset)
+            header = f.read(LOCAL_HEADER_SIZE)
+            if len(header) < LOCAL_HEADER_SIZE or header[:4] != LOCAL_HEADER_SIGNATURE:
+                raise ValueError(f"プロジェクトファイルが開いた後に変更されています: {self.file_path}")
+            name_length, extra_length = struct.unpack('<HH', header[26:30])
+            f.seek(name_length + extra_length, io.SEEK_CUR)
+            data = f.read(info.compress_size)
+        
+        if info.compress_type == zipfile.ZIP_DEFLATED:
+            data = zlib.decompress(data, -zlib.MAX_WBITS)
+        elif info.compress_type != zipfile.ZIP_STORED:
+            raise ValueError(f"対応していない圧縮形式です: {name}")
+        if zlib.crc32(data) != info.CRC:
+            raise ValueError(f"プロジェクトファイルが開いた後に変更されています: {self.file_path}")
+        return data
+    
+    @staticmethod
+    def _file_identity(stat: os.stat_result) -> tuple:
+        """ファイルの同一性（置き換えられていないか）を判定する値"""
+        return (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+    
+    def _locate(self) -> Path:
+        """開いた時と同じファイルのパス
+        
+        保存で前の版が .bak として残された後も、保存後の問題の読み込み元が切り替わるまでは
+        開いた時のファイルから読めるようにする。見つからなければ元のパスを返す
+        （中身が違えば read_entry が検出する）。
+        """
+        backup = backup_path(self.file_path)
+        for path in (self.file_path, backup):
+            try:
+                if self._file_identity(os.stat(path)) == self._identity:
+                    return path
+            except OSError:
+                continue
+        # ハードリンクを作れず複製した .bak は、大きさと更新日時で判定する
+        try:
+            if self._file_identity(os.stat(backup))[2:] == self._identity[2:]:
+                return backup
+        except OSError:
+            pass
+        return self.file_path
+    
+    def read_content(self, entry: str) -> str:
+        """問題文を読み込み、画像の参照を data URI に戻す"""
+        images = {}
+        content = self.read_stored(entry, images)
+        if not images:
+            return content
+        
+        data_uris = {digest: f"data:{mime_type};base64,{base64.b64encode(blob).decode('ascii')}"
+                     for digest, (mime_type, blob) in images.items()}
+        return restore_images(content, data_uris)
+    
+    def read_stored(self, entry: str, images: Dict[str, tuple]) -> str:
+        """保存されたままの問題文を読み込み、参照する画像を images に取り出す
+        
+        Args:
+            entry: 問題文のエントリ名
+            images: 取り出した画像（SHA-256 → (MIMEタイプ, 中身)）。既にある画像は読まない
+        
+        Returns:
+            画像の参照（mep-image:<sha256>）を含む問題文
+        """
+        content = self.read_entry(entry).decode('utf-8')
+        if IMAGE_SCHEME not in content:
+            return content
+        
+        for digest in set(IMAGE_REFERENCE_PATTERN.findall(content)):
+            image = self.images.get(digest)
+            if image is not None and digest not in images:
+                images[digest] = (image['mime_type'], self.read_entry(image['entry']))
+        return content
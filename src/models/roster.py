@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""名簿（生徒の番号・氏名）
+
+クラス分の個別PDF（exporters.class_set）と一括採点（grading）で共通に使う。
+"""
+
+import csv
+import io
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Union
+
+
+# 名簿CSVの見出しとして認識する名前
+NUMBER_HEADERS = ('番号', '組番号', '出席番号', '受験番号', 'number', 'no')
+NAME_HEADERS = ('氏名', '名前', '生徒名', 'name')
+
+
+@dataclass(frozen=True)
+class Student:
+    """名簿の1行"""
+    number: str
+    name: str
+
+
+def read_csv_rows(path: Union[str, Path]) -> List[List[str]]:
+    """CSVを読み込み、空行を除いた行のリストを返す（Excelで保存したShift_JISも可）
+    
+    Args:
+        path: CSVファイルのパス
+    
+    Returns:
+        行のリスト（各セルは前後の空白を除く）
+    """
+    data = Path(path).read_bytes()
+    try:
+        text = data.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        text = data.decode('cp932')
+    
+    rows = [[cell.strip() for cell in row] for row in csv.reader(io.StringIO(text))]
+    return [row for row in rows if any(row)]
+
+
+def load_roster(path: Union[str, Path]) -> List[Student]:
+    """名簿CSVを読み込む
+    
+    1行目が見出し（番号・氏名 等）の場合はその列を、見出しがない場合は
+    1列目を番号、2列目を氏名として扱う。Excelで保存したShift_JISのCSVも読める。
+    
+    Args:
+        path: CSVファイルのパス
+    
+    Returns:
+        生徒のリスト（名簿の順）
+    
+    Raises:
+        ValueError: 生徒が1人もいない場合
+    """
+    rows = read_csv_rows(path)
+    
+    number_column, name_column = 0, 1
+    if rows:
+        header = [cell.lower() for cell in rows[0]]
+        numbers = [i for i, cell in enumerate(header) if cell in NUMBER_HEADERS]
+        names = [i for i, cell in enumerate(header) if cell in NAME_HEADERS]
+        if numbers or names:
+            number_column = numbers[0] if numbers else -1
+            name_column = names[0] if names else -1
+            rows = rows[1:]
+    
+    def cell(row: List[str], column: int) -> str:
+        return row[column] if 0 <= column < len(row) else ''
+    
+    students = [Student(cell(row, number_column), cell(row, name_column)) for row in rows]
+    if not students:
+        raise ValueError(f"名簿に生徒がいません: {path}")
+    return students
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""JSONの読み書き（高速なライブラリがあれば使う）
+
+プロジェクトファイル・設定ファイルのJSONは、orjson または msgspec が
+インストールされていればそれを使い、なければ標準の json を使う。
+出力は json.dumps(data, ensure_ascii=False, indent=...) をUTF-8にしたものと
+同じ形になる（orjson は字下げが2桁固定で、浮動小数点数の指数の書き方が
+わずかに異なるが、読み込めば同じ値になる）。
+"""
+
+import json
+from typing import Any, List, Optional, Union
+
+# 高速なJSONライブラリの動的インポート
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+
+
+# 優先順のライブラリ名
+BACKENDS = ('orjson', 'msgspec', 'json')
+
+
+def is_available(backend: str) -> bool:
+    """ライブラリが利用可能かチェック"""
+    return {'orjson': ORJSON_AVAILABLE, 'msgspec': MSGSPEC_AVAILABLE, 'json': True}.get(backend, False)
+
+
+def available_backends() -> List[str]:
+    """利用可能なライブラリ（優先順）"""
+    return [backend for backend in BACKENDS if is_available(backend)]
+
+
+_backend = available_backends()[0]
+
+
+def get_backend() -> str:
+    """使用中のライブラリ"""
+    return _backend
+
+
+def set_backend(backend: Optional[str] = None):
+    """使用するライブラリを変更（ベンチマーク・テスト用）
+    
+    Args:
+        backend: BACKENDS のいずれか（Noneは利用可能な中で最も速いもの）
+    
+    Raises:
+        ValueError: 利用できないライブラリ
+    """
+    global _backend
+    if backend is None:
+        backend = available_backends()[0]
+    if not is_available(backend):
+        raise ValueError(f"JSONライブラリ {backend} は利用できません")
+    _backend = backend
+
+
+def dumps(data: Any, indent: Optional[int] = 2) -> bytes:
+    """JSON（UTF-8、非ASCII文字はそのまま）に変換
+    
+    Args:
+        data: 変換する値
+        indent: 字下げの桁数（Noneは改行なし）
+    
+    Returns:
+        UTF-8のJSON
+    """
+    try:
+        if _backend == 'orjson':
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0)
+        if _backend == 'msgspec':
+            encoded = msgspec.json.encode(data)
+            return msgspec.json.format(encoded, indent=indent) if indent else encoded
+    except TypeError:
+        # 文字列以外のキー等、高速なライブラリが扱えない値は標準の json で変換する
+        pass
+    return json.dumps(data, ensure_ascii=False, indent=indent).encode('utf-8')
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """JSONを解析
+    
+    Args:
+        data: UTF-8のJSON、または文字列
+    
+    Returns:
+        解析した値
+    
+    Raises:
+        ValueError: JSONとして解析できない
+    """
+    if _backend == 'orjson':
+        return orjson.loads(data)
+    if _backend == 'msgspec':
+        try:
+            return msgspec.json.decode(data)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+    return json.loads(data)
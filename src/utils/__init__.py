@@ -3,12 +3,22 @@
 
 from .markdown_renderer import MarkdownRenderer
 from .answer_sheet_generator import AnswerSheetGenerator
+from .blank_scanner import BlankScanner, BlankIndex, Blank
+from .html_builder import HTMLBuilder
+from .html_minifier import HTMLMinifier
+from .omr_sheet_generator import OMRSheetGenerator
 from .platform_utils import PlatformUtils
 from .python_detector import PythonDetector
 
 __all__ = [
     'MarkdownRenderer',
     'AnswerSheetGenerator',
+    'BlankScanner',
+    'BlankIndex',
+    'Blank',
+    'HTMLBuilder',
+    'HTMLMinifier',
+    'OMRSheetGenerator',
     'PlatformUtils',
     'PythonDetector'
 ]
\ No newline at end of file
@@ -1,21 +1,27 @@
 # -*- coding: utf-8 -*-
 """解答用紙生成ユーティリティ"""
 
-import re
-from typing import List, Dict, Tuple
+import hashlib
+from collections import OrderedDict
+from typing import List, Dict, Tuple, Union
+
+from ..models import ExportOptions
+from .blank_scanner import BlankScanner
+from .html_builder import HTMLBuilder
 
 
 class AnswerSheetGenerator:
     """解答用紙生成クラス"""
     
-    # 空欄パターン（カタカナ1文字）
-    BLANK_PATTERN = r'[ア-ン]'
-    
-    # 数字の空欄パターン（数字1-2桁）
-    NUMBER_BLANK_PATTERN = r'(?:①|②|③|④|⑤|⑥|⑦|⑧|⑨|⑩|⑪|⑫|⑬|⑭|⑮|⑯|⑰|⑱|⑲|⑳)'
-    
-    def __init__(self):
-        pass
+    def __init__(self, max_entries: int = 1024):
+        """
+        Args:
+            max_entries: キャッシュする抽出結果の最大数
+        """
+        self.scanner = BlankScanner()
+        # 抽出結果のキャッシュ（LRU。問題文のSHA-256 → 空欄。複数の型を生成する際に再抽出しない）
+        self.max_entries = max_entries
+        self._blank_cache = OrderedDict()
     
     def extract_blanks(self, content: str) -> List[str]:
         """問題文から空欄を抽出
@@ -25,28 +31,26 @@ class AnswerSheetGenerator:
         
         Returns:
             抽出された空欄のリスト（順序を保持、重複除去）
+            空欄の書き方は BlankScanner を参照
         """
-        # カタカナの空欄を検索
-        blanks = []
-        seen = set()
-        
-        # カタカナ空欄
-        for match in re.finditer(self.BLANK_PATTERN, content):
-            blank = match.group()
-            if blank not in seen:
-                blanks.append(blank)
-                seen.add(blank)
-        
-        # 丸数字空欄
-        for match in re.finditer(self.NUMBER_BLANK_PATTERN, content):
-            blank = match.group()
-            if blank not in seen:
-                blanks.append(blank)
-                seen.add(blank)
-        
-        return blanks
+        key = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        cached = self._blank_cache.get(key)
+        if cached is not None:
+            self._blank_cache.move_to_end(key)
+            return list(cached)
+        
+        blanks = self._extract_blanks(content)
+        self._blank_cache[key] = blanks
+        if len(self._blank_cache) > self.max_entries:
+            self._blank_cache.popitem(last=False)
+        return list(blanks)
     
-    def generate_answer_sheet_html(self, problems: List, options: dict = None) -> str:
+    def _extract_blanks(self, content: str) -> List[str]:
+        """問題文から空欄を抽出（キャッシュなし）"""
+        return self.scanner.labels(content)
+    
+    def generate_answer_sheet_html(self, problems: List,
+                                   options: Union[ExportOptions, dict] = None) -> str:
         """解答用紙のHTMLを生成
         
         Args:
@@ -56,23 +60,31 @@ class AnswerSheetGenerator:
         Returns:
             解答用紙のHTML
         """
-        if options is None:
-            options = {}
-        
-        html = '<div class="answer-sheet-page">'
-        html += '<h1 class="answer-sheet-title">解答用紙</h1>'
-        html += '<div class="student-info-answer">'
-        html += '<table class="info-table">'
-        html += '<tr><td class="label">受験番号</td><td class="field-answer"></td></tr>'
-        html += '<tr><td class="label">氏名</td><td class="field-answer"></td></tr>'
-        html += '</table>'
-        html += '</div>'
+        options = ExportOptions.coerce(options)
+        
+        title = '解答用紙'
+        if options.form_label:
+            title += f'（{options.form_label}型）'
+        
+        html = HTMLBuilder()
+        html.add('<div class="answer-sheet-page">',
+                 f'<h1 class="answer-sheet-title">{title}</h1>',
+                 '<div class="student-info-answer">',
+                 '<table class="info-table">',
+                 # 空欄の目印（クラス分のPDFで番号・氏名を重ねて印字する位置）
+                 '<tr><td class="label">受験番号</td><td class="field-answer"><div class="student-field" id="student-number-answer"></div></td></tr>',
+                 '<tr><td class="label">氏名</td><td class="field-answer"><div class="student-field" id="student-name-answer"></div></td></tr>',
+                 '</table>',
+                 '</div>')
         
         # 日本語の問題番号変換
         japanese_numbers = ['一', '二', '三', '四', '五', '六', '七', '八', '九', '十']
         
         for i, problem in enumerate(problems, 1):
-            blanks = self.extract_blanks(problem.content)
+            if hasattr(problem, 'blank_index'):
+                blanks = problem.blank_index.labels()
+            else:
+                blanks = self.extract_blanks(problem.content)
             
             if not blanks:
                 continue
@@ -88,27 +100,25 @@ class AnswerSheetGenerator:
             if hasattr(problem, 'score') and problem.score:
                 score_display = f'（{problem.score}点）'
             
-            html += f'<div class="answer-section">'
-            html += f'<h2 class="answer-problem-title">{problem_title} {score_display}</h2>'
-            html += '<table class="answer-table">'
+            html.add('<div class="answer-section">',
+                     f'<h2 class="answer-problem-title">{problem_title} {score_display}</h2>',
+                     '<table class="answer-table">')
             
             # 空欄を4列で表示
             for j in range(0, len(blanks), 4):
-                html += '<tr>'
+                html.add('<tr>')
                 for k in range(4):
                     if j + k < len(blanks):
-                        blank = blanks[j + k]
-                        html += f'<td class="blank-label">{blank}</td>'
-                        html += '<td class="blank-field"></td>'
+                        html.add(f'<td class="blank-label">{blanks[j + k]}</td>',
+                                 '<td class="blank-field"></td>')
                     else:
-                        html += '<td></td><td></td>'
-                html += '</tr>'
+                        html.add('<td></td><td></td>')
+                html.add('</tr>')
             
-            html += '</table>'
-            html += '</div>'
+            html.add('</table>', '</div>')
         
-        html += '</div>'
-        return html
+        html.add('</div>')
+        return html.build()
     
     def get_answer_sheet_styles(self) -> str:
         """解答用紙のスタイルを取得"""
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""問題文の空欄（解答欄）の検出"""
+
+import re
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+
+@dataclass(frozen=True)
+class Blank:
+    """問題文中の空欄1つ
+    
+    Attributes:
+        label: 空欄の記号（'ア'、'①' 等）
+        start: 問題文中の開始位置
+        end: 問題文中の終了位置
+    """
+    label: str
+    start: int
+    end: int
+
+
+class BlankScanner:
+    """問題文を1回だけ走査して、明示された空欄の記号を検出するクラス
+    
+    空欄として扱うのは括弧で囲んだ記号（[ア]、［イ］）、数式中の
+    \\boxed{ウ}・\\fbox{エ}、丸数字（①〜⑳）だけで、「グラフ」「ベクトル」の
+    ような地の文のカタカナは空欄にしない。コードブロック・インラインコード・HTMLタグ
+    （埋め込み画像のdata URIを含む）は読み飛ばす。
+    [アイ] のように複数の記号を並べた場合は、記号ごとに別の空欄になる
+    （共通テスト形式の「アイ」＝2桁の数）。
+    """
+    
+    # 空欄の記号（カタカナ・丸数字）
+    LABEL_CHARS = r'ア-ン①-⑳'
+    
+    # 括弧なしでも空欄として扱う記号（丸数字は地の文の単語と紛れない）
+    BARE_LABEL_CHARS = r'①-⑳'
+    
+    # 既定の括弧（開き, 閉じ）
+    DEFAULT_BRACKETS = (('[', ']'), ('［', '］'))
+    
+    # 数式中で空欄として扱う命令
+    DEFAULT_MATH_COMMANDS = ('boxed', 'fbox', 'framebox')
+    
+    def __init__(self, brackets: Sequence[Tuple[str, str]] = DEFAULT_BRACKETS,
+                 math_commands: Sequence[str] = DEFAULT_MATH_COMMANDS):
+        """
+        Args:
+            brackets: 空欄の記号を囲む括弧（例: ('「', '」') を追加すると「ア」も空欄になる）
+            math_commands: 数式中で空欄として扱う命令
+        """
+        label = f'[{self.LABEL_CHARS}]+'
+        bracket_markers = '|'.join(
+            f'{re.escape(open_)}(?P<b{i}>{label}){re.escape(close)}'
+            for i, (open_, close) in enumerate(brackets)
+        )
+        
+        # 左から順に試し、読み飛ばす領域は丸ごと消費する（1回の走査で済む）
+        alternatives = [
+            r'(?P<code>```[\s\S]*?(?:```|\Z)|`[^`\n]+`)',
+            r'(?P<tag></?[A-Za-z!][^>]*>)',
+            r'(?P<math>\$\$[\s\S]*?\$\$|\\\[[\s\S]*?\\\]|\\\(.*?\\\)|\$[^$\n]+?\$)',
+            r'\\\$',
+        ]
+        if bracket_markers:
+            alternatives.append(bracket_markers)
+        alternatives.append(f'(?P<bare>[{self.BARE_LABEL_CHARS}])')
+        self._pattern = re.compile('|'.join(alternatives))
+        
+        self._math_pattern = None
+        if math_commands:
+            commands = '|'.join(re.escape(command) for command in math_commands)
+            self._math_pattern = re.compile(rf'\\(?:{commands})\s*\{{\s*({label})\s*\}}')
+    
+    def scan(self, content: str, start: int = 0, end: Optional[int] = None,
+             regions: Optional[List[Tuple[int, int, bool]]] = None) -> List[Blank]:
+        """空欄を出現順にすべて検出
+        
+        Args:
+            content: 問題文
+            start: 走査を開始する位置
+            end: 走査を終了する位置（Noneは末尾まで）
+            regions: 指定すると、読み飛ばした領域・数式の領域を
+                (開始位置, 終了位置, 数式か) として追加する
+        
+        Returns:
+            空欄のリスト（出現順、同じ記号も重複して含む）
+        """
+        if end is None:
+            end = len(content)
+        
+        blanks = []
+        for match in self._pattern.finditer(content, start, end):
+            group = match.lastgroup
+            if group is None:
+                continue
+            if group in ('code', 'tag', 'math') and regions is not None:
+                regions.append((match.start(), match.end(), group == 'math'))
+            if group in ('code', 'tag'):
+                continue
+            if group == 'math':
+                if self._math_pattern is not None:
+                    for command in self._math_pattern.finditer(content, match.start(), match.end()):
+                        self._append_labels(blanks, command.group(1), command.start(1))
+                continue
+            self._append_labels(blanks, match.group(group), match.start(group))
+        return blanks
+    
+    def labels(self, content: str) -> List[str]:
+        """空欄の記号を出現順に重複を除いて取得"""
+        return list(dict.fromkeys(blank.label for blank in self.scan(content)))
+    
+    @staticmethod
+    def _append_labels(blanks: List[Blank], label: str, offset: int):
+        """[アイ] のような連続した記号を1文字ずつの空欄にする"""
+        for i, char in enumerate(label):
+            blanks.append(Blank(char, offset + i, offset + i + 1))
+
+
+class BlankIndex:
+    """問題文の空欄の索引
+    
+    エディタでの編集（位置・削除文字数・追加文字数）を受け取り、編集箇所を
+    含む行（数式の内側ならその数式）だけを再走査して空欄の一覧を更新する。数式・コード等の境界になる
+    文字（$ ` \\ < > 改行）を編集した場合は、領域の対応が文書全体で変わり
+    得るため全体を走査し直す。
+    """
+    
+    # 読み飛ばす領域・数式の境界になり得る文字
+    DELIMITERS = frozenset('$`\\<>\n')
+    
+    def __init__(self, content: str = "", scanner: Optional[BlankScanner] = None):
+        """
+        Args:
+            content: 問題文
+            scanner: 空欄の検出に使うスキャナー（Noneは既定の書き方）
+        """
+        self.scanner = scanner or BlankScanner()
+        self.rebuild(content)
+    
+    @property
+    def blanks(self) -> List[Blank]:
+        """空欄のリスト（出現順）"""
+        return list(self._blanks)
+    
+    def labels(self) -> List[str]:
+        """空欄の記号を出現順に重複を除いて取得"""
+        return list(dict.fromkeys(blank.label for blank in self._blanks))
+    
+    def rebuild(self, content: str):
+        """問題文全体を走査し直す"""
+        self._content = content
+        self._regions: List[Tuple[int, int, bool]] = []
+        self._blanks = self.scanner.scan(content, regions=self._regions)
+    
+    def update(self, content: str, position: int, removed: int, added: int) -> bool:
+        """編集を反映
+        
+        Args:
+            content: 編集後の問題文
+            position: 編集した位置
+            removed: 削除した文字数
+            added: 追加した文字数
+        
+        Returns:
+            編集箇所だけの再走査で済んだかどうか（Falseは全体を走査し直した）
+        """
+        old = self._content
+        delta = added - removed
+        edit_end = position + added
+        if (position < 0 or position + removed > len(old)
+                or len(content) != len(old) + delta):
+            self.rebuild(content)
+            return False
+        
+        # 編集した文字とその前後2文字（</ や \\[ の直後の編集）に境界の文字があれば全体を走査し直す
+        changed = old[position:position + removed] + content[max(position - 2, 0):edit_end + 2]
+        if not self.DELIMITERS.isdisjoint(changed):
+            self.rebuild(content)
+            return False
+        
+        # 編集箇所を含む領域（数式・コード等）、または前後の領域
+        starts = [region[0] for region in self._regions]
+        index = bisect_left(starts, position) - 1
+        region = self._regions[index] if index >= 0 else None
+        if region is not None and (position + removed < region[1]
+                                   or (region[1] == len(old) and not region[2])):
+            # 領域の内側の編集（閉じていないコードブロックの末尾への追加を含む）
+            scan_start, old_end, new_end = region[0], region[1], region[1] + delta
+            self._regions[index] = (region[0], new_end, region[2])
+            next_region = index + 1
+        else:
+            # 領域の外側の編集：空欄の記号は改行をまたがないので、編集した行だけ
+            next_region = index + 1
+            gap_start = region[1] if region is not None else 0
+            gap_end = (self._regions[next_region][0] + delta
+                       if next_region < len(self._regions) else len(content))
+            line_end = content.find('\n', edit_end)
+            scan_start = max(gap_start, content.rfind('\n', 0, position) + 1)
+            new_end = min(gap_end, line_end if line_end >= 0 else len(content))
+            old_end = new_end - delta
+        
+        self._regions[next_region:] = [
+            (start + delta, end + delta, is_math)
+            for start, end, is_math in self._regions[next_region:]
+        ]
+        
+        blank_starts = [blank.start for blank in self._blanks]
+        first = bisect_left(blank_starts, scan_start)
+        last = bisect_right(blank_starts, old_end - 1) if old_end > scan_start else first
+        rescanned = self.scanner.scan(content, scan_start, new_end) if new_end > scan_start else []
+        shifted = [
+            Blank(blank.label, blank.start + delta, blank.end + delta)
+            for blank in self._blanks[last:]
+        ]
+        self._blanks[first:] = rescanned + shifted
+        self._content = content
+        return True
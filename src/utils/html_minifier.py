@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""HTML/CSS圧縮ユーティリティ"""
+
+import re
+
+
+class HTMLMinifier:
+    """表示結果を変えずにHTML/CSSの余分な空白を除去するクラス
+    
+    <pre>・<textarea>・<script> の中身、数式（$...$ / $$...$$）、
+    タグの属性値（data URI を含む）は一切変更しない。
+    """
+    
+    # 空白のみのテキストが描画されない親・隣接要素
+    # （インラインブロック化されうる div/h2 等は安全のため含めない）
+    WHITESPACE_INSIGNIFICANT_TAGS = frozenset({
+        'html', 'head', 'body', 'meta', 'title', 'link', 'style', 'script',
+        'table', 'thead', 'tbody', 'tfoot', 'tr', 'colgroup', 'col'
+    })
+    
+    # トークン（先に一致したものが優先）
+    TOKEN_PATTERN = re.compile(
+        r'(?P<preserve><(?P<ptag>pre|textarea|script)\b[^>]*>.*?</(?P=ptag)\s*>)'
+        r'|(?P<style><style\b[^>]*>)(?P<css>.*?)(?P<style_end></style\s*>)'
+        r'|(?P<comment><!--.*?-->)'
+        r'|(?P<tag></?(?P<tname>[a-zA-Z][a-zA-Z0-9]*)\b[^>]*>|<![^>]*>)'
+        r'|(?P<math>\$\$.*?\$\$|\$[^$\n]+?\$)',
+        re.DOTALL | re.IGNORECASE
+    )
+    
+    CSS_COMMENT_PATTERN = re.compile(r'/\*.*?\*/', re.DOTALL)
+    CSS_STRING_PATTERN = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')')
+    # HTML/CSSが空白として扱う文字（全角空白 U+3000・ノーブレークスペース U+00A0 は
+    # 詰められずにそのまま描画されるので含めない。Pythonの \s や isspace() は含んでしまう）
+    WHITESPACE = ' \t\n\r\f'
+    WHITESPACE_PATTERN = re.compile(r'[ \t\n\r\f]+')
+    CSS_PUNCTUATION_PATTERN = re.compile(r'[ \t\n\r\f]*([{};,>])[ \t\n\r\f]*')
+    CSS_COLON_PATTERN = re.compile(r':[ \t\n\r\f]+')
+    
+    def minify(self, html: str) -> str:
+        """HTMLを圧縮
+        
+        Args:
+            html: HTML文字列
+        
+        Returns:
+            圧縮後のHTML文字列
+        """
+        chunks = []
+        # 直前のトークンのタグ名（テキストやコメントの場合はNone）
+        prev_tag = None
+        pending_text = None
+        pos = 0
+        
+        for match in self.TOKEN_PATTERN.finditer(html):
+            if match.start() > pos:
+                text = html[pos:match.start()]
+                if self._is_whitespace(text):
+                    pending_text = text
+                else:
+                    chunks.append(self._collapse_whitespace(text))
+                    prev_tag = None
+            
+            next_tag = self._tag_name(match)
+            if pending_text is not None:
+                if not (prev_tag in self.WHITESPACE_INSIGNIFICANT_TAGS
+                        or next_tag in self.WHITESPACE_INSIGNIFICANT_TAGS):
+                    chunks.append(self._collapse_whitespace(pending_text))
+                pending_text = None
+            
+            if match.group('style'):
+                chunks.append(match.group('style'))
+                chunks.append(self.minify_css(match.group('css')))
+                chunks.append(match.group('style_end'))
+            elif match.group('comment'):
+                # 条件付きコメントは残す
+                if match.group('comment').startswith('<!--['):
+                    chunks.append(match.group('comment'))
+            else:
+                chunks.append(match.group(0))
+            
+            prev_tag = next_tag
+            pos = match.end()
+        
+        tail = html[pos:]
+        if tail and not self._is_whitespace(tail):
+            chunks.append(self._collapse_whitespace(tail))
+        
+        return ''.join(chunks)
+    
+    def minify_css(self, css: str) -> str:
+        """CSSを圧縮（文字列リテラルは保護）
+        
+        Args:
+            css: CSS文字列
+        
+        Returns:
+            圧縮後のCSS文字列
+        """
+        css = self.CSS_COMMENT_PATTERN.sub('', css)
+        parts = self.CSS_STRING_PATTERN.split(css)
+        
+        for i in range(0, len(parts), 2):
+            # 偶数番目が文字列リテラル以外の部分
+            part = self.WHITESPACE_PATTERN.sub(' ', parts[i])
+            part = self.CSS_PUNCTUATION_PATTERN.sub(r'\1', part)
+            part = self.CSS_COLON_PATTERN.sub(':', part)
+            part = part.replace(';}', '}')
+            parts[i] = part
+        
+        return ''.join(parts).strip(self.WHITESPACE)
+    
+    def _tag_name(self, match) -> str:
+        """トークンのタグ名（小文字）を取得"""
+        if match.group('ptag'):
+            return match.group('ptag').lower()
+        if match.group('style'):
+            return 'style'
+        if match.group('tname'):
+            return match.group('tname').lower()
+        return None
+    
+    def _is_whitespace(self, text: str) -> bool:
+        """空白（HTMLの空白文字）だけのテキストか"""
+        return not text.strip(self.WHITESPACE)
+    
+    def _collapse_whitespace(self, text: str) -> str:
+        """連続する空白を1文字にまとめる（改行を含む場合は改行を残す）"""
+        return self.WHITESPACE_PATTERN.sub(
+            lambda m: '\n' if '\n' in m.group() else ' ', text
+        )
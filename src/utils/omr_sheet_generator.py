@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""マーク式解答用紙（OMR）生成ユーティリティ
+
+解答用紙の空欄ごとに、選択肢のマーク欄をミリメートル単位の固定の格子に
+配置する。配置は問題の空欄だけから決まり、各マーク欄のページと中心座標を
+マニフェスト（JSON）に書き出す。読み取り側（grading.omr_reader）は
+画像の探索をせず、マニフェストの座標から配列を切り出すだけで判定できる。
+"""
+
+import html
+import json
+from pathlib import Path
+from typing import Dict, List, Sequence, Union
+
+
+# 用紙の大きさ（幅, 高さ、mm）
+PAGE_SIZES_MM = {
+    'A3': (297.0, 420.0),
+    'A4': (210.0, 297.0),
+    'A5': (148.0, 210.0),
+    'B4': (257.0, 364.0),
+    'B5': (182.0, 257.0),
+    'Letter': (215.9, 279.4),
+    'Legal': (215.9, 355.6),
+}
+
+# マニフェストの形式の版
+MANIFEST_VERSION = 1
+
+
+class OMRSheetGenerator:
+    """マーク式解答用紙の配置・HTML生成クラス"""
+    
+    # 既定の選択肢（共通テスト形式の数値解答）
+    DEFAULT_CHOICES = ('-', '0', '1', '2', '3', '4', '5', '6', '7', '8', '9')
+    
+    # 配置の寸法（mm）
+    MARGIN_MM = 12.0           # 用紙端からの余白
+    MARK_SIZE_MM = 6.0         # 四隅の位置合わせマーク（正方形）の一辺
+    MARK_INSET_MM = 6.0        # 位置合わせマークの用紙端からの距離
+    BUBBLE_DIAMETER_MM = 4.0   # マーク欄の直径
+    BUBBLE_PITCH_MM = 5.5      # マーク欄の間隔
+    ROW_HEIGHT_MM = 6.5        # 1行の高さ
+    LABEL_WIDTH_MM = 16.0      # 空欄名の幅
+    COLUMN_GAP_MM = 8.0        # 列の間隔
+    HEADER_HEIGHT_MM = 90.0    # 1ページ目の見出し（題名・受験番号・氏名）の高さ
+    
+    def __init__(self, choices: Sequence[str] = DEFAULT_CHOICES, number_digits: int = 4):
+        """
+        Args:
+            choices: 空欄ごとの選択肢
+            number_digits: 受験番号のけた数
+        """
+        if not choices:
+            raise ValueError("選択肢を1つ以上指定してください")
+        self.choices = list(choices)
+        self.number_digits = number_digits
+    
+    def layout(self, problems: List, page_size: str = 'A4', title: str = '') -> Dict:
+        """マーク欄を配置し、座標のマニフェストを作成
+        
+        Args:
+            problems: 問題リスト（空欄は blank_index から取得）
+            page_size: 用紙サイズ
+            title: 用紙の題名
+        
+        Returns:
+            マニフェスト（座標はすべて用紙左上からのmm、座標はマーク欄の中心）
+        """
+        width, height = PAGE_SIZES_MM.get(page_size, PAGE_SIZES_MM['A4'])
+        pitch = self.BUBBLE_PITCH_MM
+        column_width = self.LABEL_WIDTH_MM + pitch * len(self.choices)
+        content_width = width - 2 * self.MARGIN_MM
+        columns = max(1, int((content_width + self.COLUMN_GAP_MM) // (column_width + self.COLUMN_GAP_MM)))
+        
+        inset = self.MARK_INSET_MM + self.MARK_SIZE_MM / 2
+        registration_marks = [[inset, inset], [width - inset, inset],
+                              [inset, height - inset], [width - inset, height - inset]]
+        
+        # 受験番号（けたごとに0〜9の縦の列）
+        number_top = self.MARGIN_MM + 24.0
+        student_number = [
+            {
+                'page': 0,
+                'x': self.MARGIN_MM + 20.0 + pitch * i,
+                'y': [number_top + pitch * digit for digit in range(10)],
+            }
+            for i in range(self.number_digits)
+        ]
+        
+        blanks = []
+        headings = []
+        page, column = 0, 0
+        top = self.MARGIN_MM + self.HEADER_HEIGHT_MM
+        y = top
+        # 下の位置合わせマークの読み取り範囲に文字がかからないようにする
+        bottom = height - self.MARK_INSET_MM - self.MARK_SIZE_MM - 6.0 - self.ROW_HEIGHT_MM
+        
+        def next_row():
+            # 1行分進める（列・ページが埋まったら次へ）
+            nonlocal page, column, y, top
+            y += self.ROW_HEIGHT_MM
+            if y > bottom:
+                column += 1
+                if column >= columns:
+                    page, column = page + 1, 0
+                    top = self.MARGIN_MM + self.MARK_SIZE_MM + 6.0
+                y = top
+        
+        for number, problem in enumerate(problems, 1):
+            labels = problem.blank_index.labels()
+            if not labels:
+                continue
+            # 見出しだけが列の最後に残らないようにする
+            if y + self.ROW_HEIGHT_MM > bottom:
+                next_row()
+            left = self.MARGIN_MM + column * (column_width + self.COLUMN_GAP_MM)
+            headings.append({'page': page, 'x': left, 'y': y, 'text': f'第{number}問'})
+            next_row()
+            for label in labels:
+                left = self.MARGIN_MM + column * (column_width + self.COLUMN_GAP_MM)
+                first = left + self.LABEL_WIDTH_MM + pitch / 2
+                blanks.append({
+                    'item_id': f'{number}-{label}',
+                    'problem': number,
+                    'label': label,
+                    'page': page,
+                    'y': y,
+                    'x': [first + pitch * i for i in range(len(self.choices))],
+                })
+                next_row()
+        
+        pages = max([blank['page'] for blank in blanks], default=0) + 1
+        return {
+            'version': MANIFEST_VERSION,
+            'title': title,
+            'page_size': page_size,
+            'page_width_mm': width,
+            'page_height_mm': height,
+            'pages': pages,
+            'choices': self.choices,
+            'bubble_diameter_mm': self.BUBBLE_DIAMETER_MM,
+            'mark_size_mm': self.MARK_SIZE_MM,
+            'registration_marks': registration_marks,
+            'student_number': student_number,
+            'headings': headings,
+            'blanks': blanks,
+        }
+    
+    def generate_html(self, manifest: Dict) -> str:
+        """マニフェストの座標どおりに配置したHTML文書を生成
+        
+        Args:
+            manifest: layout() の結果
+        
+        Returns:
+            HTML文書（@page の余白は0、要素はすべて絶対配置）
+        """
+        width = manifest['page_width_mm']
+        height = manifest['page_height_mm']
+        diameter = manifest['bubble_diameter_mm']
+        mark = manifest['mark_size_mm']
+        pages = [[] for _ in range(manifest['pages'])]
+        
+        def place(page: int, x: float, y: float, css_class: str, text: str = '', style: str = ''):
+            pages[page].append(
+                f'<div class="{css_class}" style="left: {x:.2f}mm; top: {y:.2f}mm;{style}">'
+                f'{html.escape(text)}</div>'
+            )
+        
+        def bubble(page: int, x: float, y: float, text: str):
+            place(page, x - diameter / 2, y - diameter / 2, 'omr-bubble', text)
+        
+        for page in range(manifest['pages']):
+            for x, y in manifest['registration_marks']:
+                place(page, x - mark / 2, y - mark / 2, 'omr-mark')
+            if page > 0:
+                place(page, self.MARGIN_MM + 12.0, self.MARGIN_MM,
+                      'omr-page-header', f"{manifest['title']}　{page + 1}/{manifest['pages']}")
+        
+        # 1ページ目の見出し
+        place(0, self.MARGIN_MM + 12.0, self.MARGIN_MM, 'omr-title', manifest['title'] or '解答用紙')
+        digits = manifest['student_number']
+        if digits:
+            first = digits[0]
+            place(0, self.MARGIN_MM, first['y'][0] - 2.0, 'omr-caption', '受験番号')
+            for digit in digits:
+                place(0, digit['x'] - diameter / 2, digit['y'][0] - diameter / 2 - 7.0, 'omr-digit-box')
+                for value, y in enumerate(digit['y']):
+                    bubble(0, digit['x'], y, str(value))
+            name_left = digits[-1]['x'] + 15.0
+            place(0, name_left, first['y'][0] - 2.0, 'omr-caption', '氏名')
+            place(0, name_left + 12.0, first['y'][0] - 4.0, 'omr-name-box',
+                  style=f" width: {width - self.MARGIN_MM - name_left - 12.0:.2f}mm;")
+        
+        for heading in manifest['headings']:
+            place(heading['page'], heading['x'], heading['y'] - 2.5, 'omr-heading', heading['text'])
+        for blank in manifest['blanks']:
+            place(blank['page'], blank['x'][0] - self.BUBBLE_PITCH_MM / 2 - self.LABEL_WIDTH_MM,
+                  blank['y'] - 2.5, 'omr-label', blank['label'])
+            for x, choice in zip(blank['x'], manifest['choices']):
+                bubble(blank['page'], x, blank['y'], choice)
+        
+        body = ''.join(f'<div class="omr-page">{"".join(elements)}</div>' for elements in pages)
+        return f"""<!DOCTYPE html>
+<html lang="ja">
+<head>
+<meta charset="UTF-8">
+<title>{html.escape(manifest['title'] or '解答用紙')}</title>
+<style>{self.get_styles(width, height, diameter, mark)}</style>
+</head>
+<body>{body}</body>
+</html>"""
+
+    @staticmethod
+    def get_styles(width: float, height: float, diameter: float, mark: float) -> str:
+        """マーク式解答用紙のスタイルを取得"""
+        return f"""
+        @page {{ size: {width}mm {height}mm; margin: 0; }}
+        body {{ margin: 0; font-family: "Noto Sans CJK JP", "Yu Gothic", "Hiragino Sans", sans-serif; }}
+        .omr-page {{
+            position: relative;
+            width: {width}mm;
+            height: {height}mm;
+            overflow: hidden;
+            page-break-after: always;
+        }}
+        .omr-page:last-child {{ page-break-after: auto; }}
+        .omr-page > div {{ position: absolute; box-sizing: border-box; }}
+        .omr-mark {{ width: {mark}mm; height: {mark}mm; background: #000; }}
+        .omr-bubble {{
+            width: {diameter}mm;
+            height: {diameter}mm;
+            border: 0.25mm solid #000;
+            border-radius: 50%;
+            color: #aaa;
+            font-size: 6pt;
+            line-height: {diameter - 0.5}mm;
+            text-align: center;
+        }}
+        .omr-title {{ font-size: 16pt; font-weight: bold; }}
+        .omr-page-header {{ font-size: 9pt; }}
+        .omr-caption, .omr-heading {{ font-size: 10pt; font-weight: bold; }}
+        .omr-label {{ font-size: 10pt; width: 12mm; text-align: center; }}
+        .omr-digit-box {{ width: {diameter}mm; height: 6mm; border: 0.25mm solid #000; }}
+        .omr-name-box {{ height: 10mm; border-bottom: 0.25mm solid #000; }}
+        """
+    
+    @staticmethod
+    def write_manifest(manifest: Dict, path: Union[str, Path]):
+        """マニフェストをJSONで書き出す"""
+        with open(path, 'w', encoding='utf-8', newline='\n') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
@@ -19,6 +19,7 @@ class ProblemEditor(QWidget):
     text_changed = Signal(str)
     score_changed = Signal(str)
     type_changed = Signal(str)
+    blank_count_changed = Signal(int)
     
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -28,6 +29,10 @@ class ProblemEditor(QWidget):
         self.update_timer.timeout.connect(self._do_update_preview)
         self.scroll_position = 0
         self.mathjax_loaded = False
+        self.problem = None  # 編集内容を反映する問題（空欄の索引を保持）
+        self.text_loaded = True  # Falseなら問題文をまだエディタに読み込んでいない（bind_problem）
+        self.blank_count = 0
+        self.tab_title = ""
         self.init_ui()
         self._set_initial_html()
     
@@ -202,6 +207,7 @@ class ProblemEditor(QWidget):
         """)
         
         self.text_editor.textChanged.connect(self.on_text_changed)
+        self.text_editor.document().contentsChange.connect(self._on_contents_change)
         
         editor_layout.addWidget(self.text_editor)
         
@@ -295,6 +301,58 @@ class ProblemEditor(QWidget):
         self.update_timer.stop()
         self.update_timer.start(800)
     
+    def set_problem(self, problem):
+        """編集内容を反映する問題を設定
+        
+        Args:
+            problem: 問題（Problem）
+        """
+        self.problem = problem
+        problem.content = self.text_editor.toPlainText()
+        self._update_blank_count()
+    
+    def bind_problem(self, problem):
+        """問題を設定し、問題文はタブを表示する時（load_problem_text）に読み込む
+        
+        Args:
+            problem: 問題（Problem）
+        """
+        self.problem = problem
+        self.text_loaded = False
+    
+    def load_problem_text(self):
+        """bind_problem で設定した問題の問題文をエディタに読み込む"""
+        if self.text_loaded or self.problem is None:
+            return
+        
+        problem = self.problem
+        # 読み込み自体は編集ではないので、問題に反映しない
+        self.problem = None
+        self.set_text(problem.content)
+        self.problem = problem
+        self.text_loaded = True
+        self._update_blank_count()
+    
+    def _on_contents_change(self, position: int, removed: int, added: int):
+        """編集箇所を問題に反映（空欄の索引は編集箇所だけ走査し直す）"""
+        if self.problem is None:
+            return
+        
+        text = self.text_editor.toPlainText()
+        # Qtの位置はUTF-16単位なので、サロゲートペア（絵文字等）を含む場合は全体を反映
+        if self.text_editor.document().characterCount() - 1 == len(text):
+            self.problem.update_content(text, position, removed, added)
+        else:
+            self.problem.content = text
+        self._update_blank_count()
+    
+    def _update_blank_count(self):
+        """空欄の数が変わったら通知"""
+        count = len(self.problem.blank_index.labels())
+        if count != self.blank_count:
+            self.blank_count = count
+            self.blank_count_changed.emit(count)
+    
     def _save_scroll_position(self):
         """現在のスクロール位置を保存"""
         def callback(result):
@@ -370,6 +428,8 @@ class ProblemEditor(QWidget):
     
     def get_text(self) -> str:
         """エディタのテキストを取得"""
+        if not self.text_loaded:
+            return self.problem.content
         return self.text_editor.toPlainText()
     
     def set_text(self, text: str):
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""ベンチマークスイート（合成プロジェクト・CSV出力）のテスト"""
+
+import base64
+import csv
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.synthetic import make_png, make_project
+from benchmarks import export_suite
+
+
+def test_synthetic_project_has_requested_shape():
+    """指定した大問数・数式数・画像枚数のプロジェクトが生成されることを確認"""
+    project = make_project(problems=3, formulas=4, images=5, image_size=(32, 24))
+    contents = [problem.content for problem in project.problems]
+    
+    assert len(project.problems) == 3
+    assert all(content.count('$$') == 2 * 2 for content in contents)
+    images = re.findall(r'data:image/png;base64,([A-Za-z0-9+/=]+)', "".join(contents))
+    assert len(images) == 5
+    assert base64.b64decode(images[0]).startswith(b"\x89PNG")
+
+
+def test_synthetic_project_is_reproducible():
+    """同じ引数なら同じ内容になることを確認"""
+    a = make_project(problems=2, formulas=2, images=2, image_size=(16, 16))
+    b = make_project(problems=2, formulas=2, images=2, image_size=(16, 16))
+    
+    assert [p.content for p in a.problems] == [p.content for p in b.problems]
+    assert make_png(8, 8, seed=1) != make_png(8, 8, seed=2)
+
+
+def test_suite_writes_csv(tmp_path):
+    """組み合わせごとに別プロセスで計測し、CSVに記録することを確認"""
+    output = tmp_path / "results.csv"
+    export_suite.main(["--problems", "1", "3", "--formulas", "2", "--images", "0",
+                       "--engines", "html", "--output", str(output)])
+    
+    with open(output, encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    
+    assert [row['problems'] for row in rows] == ['1', '3']
+    for row in rows:
+        assert row['engine'] == 'html'
+        assert not row['error']
+        assert float(row['wall_time_s']) >= 0
+        assert int(row['output_bytes']) > 0
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""空欄の検出のテスト"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.models import Problem
+from src.utils import AnswerSheetGenerator, Blank, BlankIndex, BlankScanner
+
+
+def test_prose_katakana_is_not_a_blank():
+    """地の文のカタカナは空欄にならないことを確認"""
+    content = "ベクトル $\\vec{a}$ のグラフを描き、[ア] と［イ］に当てはまる数を答えよ。"
+    
+    assert BlankScanner().labels(content) == ['ア', 'イ']
+
+
+def test_blank_positions():
+    """空欄の位置が問題文中の記号の位置になることを確認"""
+    content = "x = [ア]、y = ［イ］"
+    blanks = BlankScanner().scan(content)
+    
+    assert blanks == [Blank('ア', 5, 6), Blank('イ', 13, 14)]
+    assert [content[b.start:b.end] for b in blanks] == ['ア', 'イ']
+
+
+def test_boxed_blanks_in_math():
+    """数式中は \\boxed・\\fbox だけを空欄とし、添字の括弧等は無視することを確認"""
+    content = "$a_{[ア]} = \\boxed{イ}$ かつ $$\\fbox{ウ} + \\boxed{ \\text{エ} }$$"
+    
+    assert BlankScanner().labels(content) == ['イ', 'ウ']
+
+
+def test_multi_digit_blanks_are_split():
+    """[アイ] は記号ごとに別の空欄になることを確認"""
+    blanks = BlankScanner().scan("答えは [アイ] である。")
+    
+    assert [(b.label, b.start) for b in blanks] == [('ア', 5), ('イ', 6)]
+
+
+def test_code_tags_and_data_uri_are_skipped():
+    """コード・HTMLタグ・埋め込み画像の中は読み飛ばすことを確認"""
+    content = (
+        "```python\nx = [ウ]\n```\n"
+        "`[エ]` <img alt=\"[オ]\" src=\"data:image/png;base64,[カ]AAAA\"> "
+        "価格は \\$3、[キ] と ①\n"
+        "```\n[ク]"  # 閉じていないコードブロックは末尾まで
+    )
+    
+    assert BlankScanner().labels(content) == ['キ', '①']
+
+
+def test_circled_numbers_and_custom_brackets():
+    """丸数字と、追加した括弧の書き方も検出できることを確認"""
+    scanner = BlankScanner(brackets=(('[', ']'), ('「', '」')))
+    
+    assert scanner.labels("② と「ア」、［イ］、[③]") == ['②', 'ア', '③']
+
+
+def test_scan_range():
+    """範囲を指定して走査できることを確認"""
+    content = "[ア] ... [イ] ... [ウ]"
+    
+    assert [b.label for b in BlankScanner().scan(content, 4, 14)] == ['イ']
+
+
+def test_answer_sheet_uses_explicit_blanks():
+    """解答用紙に地の文のカタカナが空欄として出ないことを確認"""
+    generator = AnswerSheetGenerator()
+    
+    assert generator.extract_blanks("グラフの傾きは [ア]、切片は [イ] である。[ア]") == ['ア', 'イ']
+
+
+def test_large_content_is_scanned_quickly():
+    """埋め込み画像を含む数MBの問題文も短時間で走査できることを確認"""
+    image = "<img src=\"data:image/png;base64," + "QUJD" * 750_000 + "\">"
+    paragraph = "ベクトル $x^2 + \\boxed{ア}$ のグラフと [イ] を求めよ。\n"
+    content = image + paragraph * 20_000
+    
+    started = time.perf_counter()
+    blanks = BlankScanner().scan(content)
+    elapsed = time.perf_counter() - started
+    
+    assert len(blanks) == 40_000
+    assert elapsed < 2.0
+
+
+def _edit(index: BlankIndex, content: str, position: int, removed: int, text: str):
+    """編集を反映して、編集後の問題文と部分走査で済んだかを返す"""
+    new_content = content[:position] + text + content[position + removed:]
+    return new_content, index.update(new_content, position, removed, len(text))
+
+
+def test_index_rescans_only_edited_line(monkeypatch):
+    """地の文の編集では編集した行だけを走査し直すことを確認"""
+    content = "$\\boxed{ア}$ の値\n" + "<img src=\"data:image/png;base64,QUJD\">\n" * 100 + "答え [イ]"
+    index = BlankIndex(content)
+    scanned = []
+    original_scan = index.scanner.scan
+    monkeypatch.setattr(index.scanner, "scan",
+                        lambda text, start=0, end=None, regions=None:
+                        scanned.append(end - start) or original_scan(text, start, end, regions))
+    
+    content, partial = _edit(index, content, len(content) - 3, 0, "[ウ] と ")
+    
+    assert partial
+    assert scanned == [len("答え [ウ] と [イ]")]
+    assert [b.label for b in index.blanks] == ['ア', 'ウ', 'イ']
+    assert index.blanks == BlankScanner().scan(content)
+
+
+def test_index_edit_inside_math_and_delimiters():
+    """数式の内側の編集と、境界の文字の編集が正しく反映されることを確認"""
+    content = "$x = \\boxed{ア} + 100 y$ と [イ]"
+    index = BlankIndex(content)
+    
+    content, partial = _edit(index, content, 2, 0, "+ \\boxed{ウ} ")
+    assert not partial  # \\ を含む編集は全体を走査
+    content, partial = _edit(index, content, content.index("100"), 3, "200")
+    assert partial
+    assert index.labels() == ['ウ', 'ア', 'イ']
+    assert index.blanks == BlankScanner().scan(content)
+    
+    # 数式を閉じる $ を消すと [イ] も数式の一部になる
+    content, partial = _edit(index, content, content.index("$ と"), 1, "")
+    assert not partial
+    assert index.blanks == BlankScanner().scan(content)
+
+
+def test_index_matches_full_scan_after_random_edits():
+    """ランダムな編集を繰り返しても、全体を走査した結果と一致することを確認"""
+    pieces = ["ア", "[", "]", "［", "］", "$", "`", "\\", "<", ">", "/", "a", "{", "}",
+              "\n", "①", "グラフ", "\\boxed{ウ}", "[エ]", "$$", "```", "<img ", " "]
+    rng = random.Random(0)
+    scanner = BlankScanner()
+    
+    for _ in range(300):
+        content = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 40)))
+        index = BlankIndex(content)
+        for _ in range(20):
+            position = rng.randint(0, len(content))
+            removed = rng.randint(0, min(3, len(content) - position))
+            text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 2)))
+            content, _ = _edit(index, content, position, removed, text)
+            assert index.blanks == scanner.scan(content)
+
+
+def test_problem_keeps_blank_index():
+    """問題が空欄の索引を保持し、解答用紙の生成でそれを使うことを確認"""
+    problem = Problem(content="[ア] と [イ]")
+    assert problem.blank_index.labels() == ['ア', 'イ']
+    
+    problem.update_content("[ア] と [イ]、[ウ]", 9, 0, 4)
+    assert problem.content == "[ア] と [イ]、[ウ]"
+    assert problem.blank_index.labels() == ['ア', 'イ', 'ウ']
+    
+    problem.content = "[エ]"
+    assert problem.blank_index.labels() == ['エ']
+    
+    generator = AnswerSheetGenerator()
+    generator.extract_blanks = lambda content: pytest.fail("問題文を走査し直している")
+    assert '<td class="blank-label">エ</td>' in generator.generate_answer_sheet_html([problem])
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""クラス分の個別PDF（名簿の番号・氏名の重ね合わせ）のテスト"""
+
+import io
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.models import Project, Problem, ExportOptions
+from src.exporters import HTMLExporter
+from src.exporters.class_set import (
+    ClassSetExporter, Student, load_roster, student_filename, _stamp_students
+)
+from src.cli import build_parser, options_from_args
+
+
+def _text_pdf(texts) -> bytes:
+    """1ページに1つずつ文字列を描いたPDF"""
+    pypdf = pytest.importorskip("pypdf")
+    from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+    
+    writer = pypdf.PdfWriter()
+    for text in texts:
+        page = writer.add_blank_page(595, 842)
+        font = DictionaryObject({
+            NameObject('/Type'): NameObject('/Font'),
+            NameObject('/Subtype'): NameObject('/Type1'),
+            NameObject('/BaseFont'): NameObject('/Helvetica'),
+        })
+        page[NameObject('/Resources')] = DictionaryObject({
+            NameObject('/Font'): DictionaryObject({NameObject('/F1'): writer._add_object(font)})
+        })
+        stream = DecodedStreamObject()
+        stream.set_data(f'BT /F1 12 Tf 50 50 Td ({text}) Tj ET'.encode('ascii'))
+        page[NameObject('/Contents')] = writer._add_object(stream)
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+def _page_texts(data: bytes) -> list:
+    from pypdf import PdfReader
+    return [''.join(page.extract_text().split()) for page in PdfReader(io.BytesIO(data)).pages]
+
+
+def test_load_roster_with_header(tmp_path):
+    """見出し行の列名から番号・氏名の列を判定することを確認"""
+    roster = tmp_path / "3-1.csv"
+    roster.write_text("氏名,出席番号,備考\n山田 太郎,1,\n佐藤 花子,2,欠席\n\n", encoding='utf-8-sig')
+    
+    assert load_roster(roster) == [Student('1', '山田 太郎'), Student('2', '佐藤 花子')]
+
+
+def test_load_roster_without_header_in_cp932(tmp_path):
+    """見出しのないShift_JISのCSV（Excel保存）も読めることを確認"""
+    roster = tmp_path / "roster.csv"
+    roster.write_bytes("3-1-01,山田 太郎\n3-1-02,髙橋 一郎\n".encode('cp932'))
+    
+    assert load_roster(roster) == [Student('3-1-01', '山田 太郎'), Student('3-1-02', '髙橋 一郎')]
+
+
+def test_empty_roster_is_rejected(tmp_path):
+    """生徒がいない名簿はエラーになることを確認"""
+    roster = tmp_path / "empty.csv"
+    roster.write_text("番号,氏名\n", encoding='utf-8')
+    
+    with pytest.raises(ValueError):
+        load_roster(roster)
+
+
+def test_student_filename():
+    """ファイル名に使えない文字が置き換えられることを確認"""
+    assert student_filename("期末試験", 0, Student('3/1', '山田 太郎')) == "期末試験_3_1_山田_太郎.pdf"
+    assert student_filename("期末試験", 4, Student('', '')) == "期末試験_05.pdf"
+
+
+def test_field_markers_in_cover_and_answer_sheet():
+    """表紙と解答用紙の番号・氏名欄に目印のidが出力されることを確認"""
+    project = Project()
+    project.add_problem(Problem(content="$x + 1 = 3$ のとき、$x =$ [ア]"))
+    html = HTMLExporter()._generate_html(project, ExportOptions(generate_answer_sheet=True))
+    
+    for field_id in ('student-number-cover', 'student-name-cover',
+                     'student-number-answer', 'student-name-answer'):
+        assert f'id="{field_id}"' in html
+
+
+def test_find_fields_groups_anchors_by_page():
+    """レイアウト結果のアンカーから欄の位置をページごとに取得することを確認"""
+    document = SimpleNamespace(pages=[
+        SimpleNamespace(anchors={'student-number-cover': (100, 500), 'student-name-cover': (100, 560)}),
+        SimpleNamespace(anchors={'problem-1': (0, 0)}),
+        SimpleNamespace(anchors={'student-name-answer': (150, 200)}),
+    ])
+    
+    assert ClassSetExporter.find_fields(document) == {
+        0: [('number', 100, 500), ('name', 100, 560)],
+        2: [('name', 150, 200)],
+    }
+
+
+def test_stamp_students_merged():
+    """生徒ごとに本体を複製し、欄のあるページにだけ重ねることを確認"""
+    base = _text_pdf(['COVER', 'PROBLEM', 'ANSWER'])
+    overlay = _text_pdf(['S01', 'S01A', 'S02', 'S02A'])
+    
+    merged = _stamp_students(base, overlay, [0, 2], [0, 2])
+    
+    assert _page_texts(merged) == [
+        'COVERS01', 'PROBLEM', 'ANSWERS01A',
+        'COVERS02', 'PROBLEM', 'ANSWERS02A',
+    ]
+
+
+def test_stamp_per_student_in_parallel(tmp_path):
+    """生徒ごとのファイルを複数プロセスで出力できることを確認"""
+    base = _text_pdf(['COVER', 'PROBLEM'])
+    overlay = _text_pdf([f'S{i:02d}' for i in range(5)])
+    paths = [str(tmp_path / f"student{i}.pdf") for i in range(5)]
+    
+    exporter = ClassSetExporter(pdf_exporter=None, workers=2)
+    exporter._stamp(base, overlay, [0], 5, paths, Path(paths[0]))
+    
+    for i, path in enumerate(paths):
+        assert _page_texts(Path(path).read_bytes()) == [f'COVERS{i:02d}', 'PROBLEM']
+
+
+def test_class_set_cli_options():
+    """class-setサブコマンドはPDF（WeasyPrint）のオプションになることを確認"""
+    args = build_parser().parse_args([
+        "class-set", "exam.mep", "--roster", "3-1.csv", "--answer-sheet", "--per-student"
+    ])
+    options = options_from_args(args)
+    
+    assert args.per_student
+    assert options.format == 'pdf'
+    assert options.pdf_engine == 'weasyprint'
+    assert options.generate_answer_sheet
+
+
+def test_class_set_end_to_end(tmp_path):
+    """WeasyPrintで本体を1回だけレンダリングし、全員分を出力することを確認"""
+    pytest.importorskip("weasyprint")
+    pytest.importorskip("pypdf")
+    from src.exporters.pdf_exporter import PDFExporter
+    
+    project = Project()
+    project.add_problem(Problem(content="$x + 1 = 3$ のとき、$x =$ [ア]"))
+    students = [Student(f'{i}', f'生徒{i}') for i in range(1, 4)]
+    output_path = tmp_path / "class.pdf"
+    
+    pdf_exporter = PDFExporter()
+    render_count = pdf_exporter.get_session().render_count
+    ClassSetExporter(pdf_exporter).export(
+        project, students, output_path, ExportOptions(format='pdf', generate_answer_sheet=True)
+    )
+    
+    # 本体と重ね合わせ用の2回だけ
+    assert pdf_exporter.get_session().render_count - render_count == 2
+    texts = _page_texts(output_path.read_bytes())
+    assert len(texts) % len(students) == 0
+    assert any('生徒3' in text for text in texts)
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""コマンドライン一括エクスポートのテスト"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.models import Project, Problem
+from src import cli
+
+REPO_ROOT = Path(__file__).parent.parent
+
+
+def _write_projects(directory: Path, count: int) -> list:
+    paths = []
+    for i in range(count):
+        project = Project()
+        project.title = f"試験{i}"
+        project.cover_content = {'exam_title': f"第{i + 1}回定期考査", 'subject': "数学B"}
+        project.add_problem(Problem(content=f"問題 {i}: $x^{i}$ を微分せよ。", score="10"))
+        path = directory / f"exam{i}.mep"
+        project.save(path)
+        paths.append(path)
+    return paths
+
+
+def test_batch_export_with_worker_pool(tmp_path):
+    """複数ファイルを並列に出力し、ファイルごとの時間を表示することを確認"""
+    _write_projects(tmp_path, 3)
+    output_dir = tmp_path / "out"
+    
+    result = subprocess.run(
+        [sys.executable, "-m", "src.cli", "export", str(tmp_path / "*.mep"),
+         "--format", "html", "--jobs", "2", "--output-dir", str(output_dir), "--answer-sheet"],
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        cwd=REPO_ROOT,
+        timeout=60
+    )
+    
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.count(" 秒  ") == 3
+    assert "完了: 3/3 件" in result.stdout
+    html = (output_dir / "exam1.html").read_text(encoding="utf-8")
+    assert "第2回定期考査" in html
+    assert "数学B" in html
+
+
+def test_failures_are_reported(tmp_path, capsys):
+    """読み込めないファイルは失敗として報告し、終了コード1を返すことを確認"""
+    _write_projects(tmp_path, 1)
+    broken = tmp_path / "broken.mep"
+    broken.write_bytes(b"\xff\xfe not a project")
+    
+    exit_code = cli.main(["export", str(tmp_path / "exam0.mep"), str(broken), "--jobs", "1"])
+    
+    captured = capsys.readouterr()
+    assert exit_code == 1
+    assert "完了: 1/2 件" in captured.out
+    assert "broken.mep" in captured.err
+    assert (tmp_path / "exam0.html").exists()
+
+
+@pytest.mark.parametrize("option, value", [("--image-dpi", "50"), ("--image-quality", "0"),
+                                           ("--pdf-workers", "0")])
+def test_out_of_range_option_is_a_usage_error(tmp_path, capsys, option, value):
+    """範囲外のオプションはトレースバックではなく、使い方のエラー（終了コード2）にすることを確認"""
+    _write_projects(tmp_path, 1)
+    
+    with pytest.raises(SystemExit) as exc_info:
+        cli.main(["export", str(tmp_path / "exam0.mep"), "--format", "pdf", option, value])
+    
+    captured = capsys.readouterr()
+    assert exc_info.value.code == 2
+    assert "Traceback" not in captured.err
+    assert captured.err.strip().splitlines()[-1].endswith(value)
+    assert not (tmp_path / "exam0.pdf").exists()
+
+
+def test_cli_does_not_import_qt(tmp_path):
+    """GUIライブラリを読み込まずに実行できることを確認"""
+    _write_projects(tmp_path, 1)
+    code = (
+        "import sys; from src import cli; "
+        f"cli.main(['export', {str(tmp_path / 'exam0.mep')!r}, '--jobs', '1']); "
+        "print('PySide6' in sys.modules)"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                            encoding="utf-8", cwd=REPO_ROOT, timeout=60)
+    
+    assert result.stdout.strip().endswith("False")
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""複数の型（A型・B型…）生成のテスト"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.models import Project, Problem
+from src.exporters import HTMLExporter
+
+
+def _project() -> Project:
+    project = Project()
+    project.title = "期末試験"
+    project.add_problem(Problem(content="問題Pの本文 ①", score="10"))
+    project.add_problem(Problem(content="問題Qの本文 ② ③", score="20"))
+    project.add_problem(Problem(content="問題Rの本文 ④", score="30"))
+    return project
+
+
+def test_each_problem_is_rendered_once():
+    """10型生成しても各問題のレンダリングは1回であることを確認"""
+    exporter = HTMLExporter()
+    calls = []
+    original_render = exporter.renderer.render
+    exporter.renderer.render = lambda text: calls.append(text) or original_render(text)
+    
+    forms = [[i % 3, (i + 1) % 3, (i + 2) % 3] for i in range(10)]
+    documents = exporter.generate_forms(_project(), forms, {'generate_answer_sheet': True})
+    
+    assert len(documents) == 10
+    assert len(calls) == 3
+
+
+def test_form_order_labels_and_answer_sheet():
+    """型ごとに問題順・型名・解答用紙が反映されることを確認"""
+    exporter = HTMLExporter()
+    forms = [
+        {'label': 'A', 'problems': [0, 1, 2]},
+        {'label': 'B', 'problems': [2, 0]},
+    ]
+    form_a, form_b = exporter.generate_forms(_project(), forms, {'generate_answer_sheet': True})
+    
+    assert form_a.index("問題Pの本文") < form_a.index("問題Qの本文") < form_a.index("問題Rの本文")
+    assert form_b.index("問題Rの本文") < form_b.index("問題Pの本文")
+    assert "問題Qの本文" not in form_b
+    assert '<p class="exam-form">B型</p>' in form_b
+    assert '<div class="form-header">B型</div>' in form_b
+    assert "解答用紙（B型）" in form_b
+    # B型の第一問は元の問題R（空欄④）
+    answer_sheet = form_b[form_b.index("解答用紙（B型）"):]
+    assert answer_sheet.index("④") < answer_sheet.index("①")
+
+
+def test_export_forms_writes_one_file_per_form(tmp_path):
+    """型ごとにファイルが出力されることを確認"""
+    paths = HTMLExporter().export_forms(_project(), tmp_path / "exam.html", [[0, 1, 2], [1, 2, 0]])
+    
+    assert [p.name for p in paths] == ["exam_A.html", "exam_B.html"]
+    assert all(p.exists() for p in paths)
+
+
+def test_out_of_range_problem_index():
+    """存在しない問題番号を指定するとエラーになることを確認"""
+    with pytest.raises(ValueError):
+        HTMLExporter().generate_forms(_project(), [[0, 5]])
+
+
+def test_fragment_and_blank_caches_are_bounded():
+    """使い回すエクスポーターでも、編集のたびの古い版の本文をキャッシュに残し続けないことを確認"""
+    exporter = HTMLExporter(max_fragments=3)
+    exporter.answer_generator.max_entries = 3
+    project = _project()
+    
+    for version in range(10):
+        project.problems[0].content = f"問題Pの本文 第{version}版 ①"
+        documents = exporter.generate_forms(project, [[0, 1, 2], [2, 1, 0]], {'generate_answer_sheet': True})
+        assert all(f"第{version}版" in html for html in documents)
+    
+    assert len(exporter._fragment_cache) == 3
+    assert len(exporter.answer_generator._blank_cache) <= 3
+    assert not any("第0版" in fragment for fragment in exporter._fragment_cache.values())
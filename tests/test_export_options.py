@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""エクスポートオプションのテスト"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.models import Project, Problem, ExportOptions
+from src.exporters import HTMLExporter
+
+
+def test_unknown_option_is_rejected():
+    """不明なキーは無視せずエラーにすることを確認"""
+    with pytest.raises(ValueError, match="show_answers"):
+        ExportOptions.from_dict({'font_size': 12, 'show_answers': True})
+
+
+def test_options_are_hashable_and_comparable():
+    """同じ内容のオプションは同じキーとして扱えることを確認"""
+    a = ExportOptions.from_dict({'font_size': 14, 'exam_title': '期末試験'})
+    b = ExportOptions(font_size=14, exam_title='期末試験')
+    
+    assert a == b
+    assert hash(a) == hash(b)
+    assert {a: 'cached'}[b] == 'cached'
+    assert a.fingerprint == b.fingerprint
+    assert a.replace(font_size=16).fingerprint != a.fingerprint
+
+
+def test_fingerprint_is_stable_across_processes():
+    """フィンガープリントがプロセスをまたいで同じであることを確認"""
+    code = (
+        "import sys; sys.path.insert(0, %r); "
+        "from src.models import ExportOptions; "
+        "print(ExportOptions(font_size=14, exam_title='期末試験').fingerprint)"
+    ) % str(Path(__file__).parent.parent)
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, timeout=30)
+    
+    assert result.stdout.strip() == ExportOptions(font_size=14, exam_title='期末試験').fingerprint
+
+
+def test_font_size_only_invalidates_template_layer():
+    """フォントサイズの変更で問題の断片が再レンダリングされないことを確認"""
+    project = Project()
+    project.add_problem(Problem(content="$x^2$ の値を求めよ。"))
+    project.add_problem(Problem(content="$y^2$ の値を求めよ。"))
+    
+    exporter = HTMLExporter()
+    calls = []
+    original_render = exporter.renderer.render
+    exporter.renderer.render = lambda text: calls.append(text) or original_render(text)
+    
+    small = ExportOptions(font_size=10)
+    large = small.replace(font_size=16)
+    assert small.fragment_fingerprint == large.fragment_fingerprint
+    assert small.template_fingerprint != large.template_fingerprint
+    
+    small_html = exporter._generate_html(project, small)
+    large_html = exporter._generate_html(project, large)
+    
+    assert len(calls) == 2
+    assert "font-size: 10pt;" in small_html
+    assert "font-size: 16pt;" in large_html
+
+
+def test_dict_options_are_still_accepted(tmp_path):
+    """従来の辞書形式のオプションも受け付けることを確認"""
+    project = Project()
+    project.add_problem(Problem(content="本文"))
+    output_path = tmp_path / "exam.html"
+    
+    HTMLExporter().export(project, output_path, {'show_cover': False, 'exam_title': '小テスト'})
+    
+    assert 'class="cover-page"' not in output_path.read_text(encoding='utf-8')
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""一括採点のテスト"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+np = pytest.importorskip("numpy")
+
+from src.models import Project, Problem
+from src.grading import AnswerKey, Grader, KeyItem
+from src.cli import main
+
+
+def _project() -> Project:
+    project = Project()
+    project.add_problem(Problem(content="グラフの傾きは [ア]、切片は [イ]", problem_type="required"))
+    project.add_problem(Problem(content="$x = \\boxed{ウ}$", problem_type="optional"))
+    project.add_problem(Problem(content="$y = \\boxed{エ}$", problem_type="optional"))
+    return project
+
+
+def _key() -> AnswerKey:
+    answers = {'1-ア': ('2', 5.0), '1-イ': ('-3', 5.0), '2-ウ': ('4', 10.0), '3-エ': ('1', 10.0)}
+    return AnswerKey.from_project(_project(), answers)
+
+
+def test_answer_key_from_project_blanks():
+    """解答キーの項目が解答用紙と同じ空欄になることを確認"""
+    key = AnswerKey.from_project(_project())
+    
+    assert key.item_ids == ['1-ア', '1-イ', '2-ウ', '3-エ']
+    assert key.problem_types == {1: 'required', 2: 'optional', 3: 'optional'}
+
+
+def test_grade_with_optional_problems():
+    """選択問題は得点の高いものだけが合計に含まれることを確認"""
+    responses = np.array([
+        ['2', '-3', '4', '1'],   # 全問正解 → 選択問題は1問分
+        ['2', '0', '', '1'],     # 第3問を選択
+        ['0', '0', '0', '0'],
+    ])
+    result = Grader(_key(), optional_count=1).grade(responses)
+    
+    assert result.correct.tolist() == [
+        [True, True, True, True], [True, False, False, True], [False, False, False, False]
+    ]
+    assert result.problem_totals.tolist() == [[10, 10, 10], [5, 0, 10], [0, 0, 0]]
+    assert result.counted.tolist() == [[True, True, False], [True, False, True], [True, True, False]]
+    assert result.totals.tolist() == [20, 15, 0]
+    
+    assert Grader(_key(), optional_count=2).grade(responses).totals.tolist() == [30, 15, 0]
+
+
+def test_item_statistics():
+    """正答率と識別力（上位の生徒ほど正答する空欄で正）を確認"""
+    key = AnswerKey([KeyItem(1, 'ア', '1', 1.0), KeyItem(1, 'イ', '1', 1.0), KeyItem(1, 'ウ', '1', 1.0)])
+    responses = np.array([['1', '1', '1'], ['1', '1', '0'], ['1', '0', '0'], ['1', '0', '0']])
+    statistics = Grader(key).grade(responses).item_statistics()
+    
+    assert statistics.difficulty.tolist() == [1.0, 0.5, 0.25]
+    assert np.isnan(statistics.discrimination[0])  # 全員正解は相関なし
+    assert statistics.discrimination[1] > 0
+    assert statistics.upper_lower.tolist() == [0.0, 1.0, 1.0]
+
+
+def test_grade_csv_end_to_end(tmp_path):
+    """CLIで解答キーを作成し、Shift_JIS・全角の解答CSVを採点できることを確認"""
+    project_path = tmp_path / "exam.mep"
+    _project().save(project_path)
+    key_path = tmp_path / "key.csv"
+    assert main(["answer-key", str(project_path), "--output", str(key_path)]) == 0
+    
+    lines = key_path.read_text(encoding='utf-8-sig').splitlines()
+    assert lines[0] == "問題,空欄,正答,配点"
+    answers = {'ア': '2', 'イ': '-3', 'ウ': '4', 'エ': '1'}
+    filled = [lines[0]] + [f"{line.rstrip(',')},{answers[line.split(',')[1]]},10" for line in lines[1:]]
+    key_path.write_text("\n".join(filled), encoding='utf-8')
+    
+    responses_path = tmp_path / "answers.csv"
+    responses_path.write_bytes(
+        "番号,氏名,1-ア,1-イ,2-ウ,3-エ\n1,山田 太郎,２,－３,4,\n2,佐藤 花子,2,3,,1\n".encode('cp932')
+    )
+    assert main(["grade", str(project_path), "--key", str(key_path),
+                 "--responses", str(responses_path)]) == 0
+    
+    scores = (tmp_path / "answers_scores.csv").read_text(encoding='utf-8-sig').splitlines()
+    assert scores == [
+        "番号,氏名,第1問,第2問,第3問,合計",
+        "1,山田 太郎,20,10,(0),30",
+        "2,佐藤 花子,10,(0),10,20",
+    ]
+    items = (tmp_path / "answers_items.csv").read_text(encoding='utf-8-sig').splitlines()
+    assert items[1].startswith("1-ア,2,10,1.000,")
+
+
+def test_student_names_are_not_normalized(tmp_path):
+    """解答は表記を揃えるが、番号・氏名（全角数字・全角空白）はそのまま出力することを確認"""
+    key_path = tmp_path / "key.csv"
+    key_path.write_text("問題,空欄,正答,配点\n１,ア,２,5\n1,イ,-3,5\n2,ウ,4,10\n3,エ,1,10\n", encoding='utf-8')
+    responses_path = tmp_path / "answers.csv"
+    responses_path.write_text("番号,氏名,１-ア,1-イ,2-ウ,3-エ\n０１,山田　太郎,２,－３,　4,\n", encoding='utf-8')
+    
+    key = AnswerKey.load(key_path, _project())
+    result = Grader(key).grade_csv(responses_path)
+    result.write_scores(tmp_path / "scores.csv")
+    
+    scores = (tmp_path / "scores.csv").read_text(encoding='utf-8-sig').splitlines()
+    assert scores[1] == "０１,山田　太郎,10,10,(0),20"
+
+
+def test_missing_answer_in_key_is_rejected(tmp_path):
+    """正答のない空欄がある解答キーはエラーになることを確認"""
+    key_path = tmp_path / "key.csv"
+    AnswerKey.from_project(_project()).write_template(key_path)
+    
+    with pytest.raises(ValueError):
+        AnswerKey.load(key_path, _project())
+
+
+def test_grade_ten_thousand_students_quickly():
+    """1万人×200空欄を1秒以内に採点できることを確認"""
+    items = [KeyItem(i // 10 + 1, 'アイウエオカキクケコ'[i % 10], str(i % 10), 2.0) for i in range(200)]
+    key = AnswerKey(items, {20: 'optional', 19: 'optional'})
+    answers = np.array([item.answer for item in items])
+    rng = np.random.default_rng(0)
+    responses = np.where(rng.random((10_000, 200)) < 0.6, answers, 'x')
+    
+    start = time.perf_counter()
+    result = Grader(key).grade(responses)
+    statistics = result.item_statistics()
+    elapsed = time.perf_counter() - start
+    
+    assert result.totals.shape == (10_000,)
+    assert statistics.difficulty.shape == (200,)
+    assert elapsed < 1.0
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""HTML組み立て（HTMLBuilder）のテスト"""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils import HTMLBuilder
+from benchmarks import html_assembly_benchmark
+
+
+def test_builder_joins_chunks_in_order():
+    """追加した順に連結されることを確認"""
+    builder = HTMLBuilder()
+    builder.add('<table>', '<tr>').extend(f'<td>{label}</td>' for label in 'アイ')
+    builder.add('</tr>', '</table>')
+    
+    assert len(builder) == 6
+    assert builder.build() == '<table><tr><td>ア</td><td>イ</td></tr></table>'
+    
+    builder.clear()
+    assert builder.build() == ''
+
+
+def test_assembly_matches_committed_baseline_size():
+    """組み立て結果の大きさが、コミットされた基準値と一致することを確認（出力が変わっていない）"""
+    with open(html_assembly_benchmark.BASELINE_PATH, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    
+    results = html_assembly_benchmark.run([50], blanks=40, repeat=1)
+    
+    for name in ('answer_sheet_bytes', 'problem_pages_bytes'):
+        assert results['50x40'][name] == baseline['50x40'][name]
+
+
+def test_benchmark_reports_regressions():
+    """基準値より大きさが変わった・遅くなった場合に報告することを確認"""
+    result = {'answer_sheet_ms': 50.0, 'answer_sheet_bytes': 10,
+              'problem_pages_ms': 1.0, 'problem_pages_bytes': 20}
+    baseline = {'answer_sheet_ms': 10.0, 'answer_sheet_bytes': 10,
+                'problem_pages_ms': 1.0, 'problem_pages_bytes': 21}
+    
+    problems = html_assembly_benchmark.compare({'1x1': result}, {'1x1': baseline}, tolerance=3.0)
+    
+    assert len(problems) == 2
+    assert html_assembly_benchmark.compare({'1x1': result}, {'1x1': result}, tolerance=3.0) == []
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""HTML圧縮出力のテスト"""
+
+import gzip
+import re
+import sys
+from html.parser import HTMLParser
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.models import Project, Problem
+from src.exporters import HTMLExporter
+from src.utils import HTMLMinifier
+
+
+# HTMLが詰める空白（全角空白・ノーブレークスペースは詰めずに描画される）
+ASCII_WHITESPACE = r'[ \t\n\r\f]+'
+
+IMAGE_DATA_URI = "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg=="
+
+
+class _RenderModel(HTMLParser):
+    """描画に影響する要素だけを抜き出す簡易パーサー"""
+    
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.items = []
+        self.raw_depth = 0
+    
+    def handle_starttag(self, tag, attrs):
+        if tag in ('pre', 'textarea', 'script', 'style'):
+            self.raw_depth += 1
+        self.items.append(('start', tag, tuple(attrs)))
+    
+    def handle_endtag(self, tag):
+        if tag in ('pre', 'textarea', 'script', 'style'):
+            self.raw_depth -= 1
+        self.items.append(('end', tag))
+    
+    def handle_data(self, data):
+        if self.raw_depth:
+            self.items.append(('raw', data))
+            return
+        collapsed = re.sub(ASCII_WHITESPACE, ' ', data)
+        if collapsed.strip(' '):
+            self.items.append(('text', collapsed))
+
+
+def _render_model(html: str) -> list:
+    parser = _RenderModel()
+    parser.feed(html)
+    items = []
+    for item in parser.items:
+        # CSSはコメントと空白を除いて比較
+        if item[0] == 'raw' and items and items[-1][:2] == ('start', 'style'):
+            css = re.sub(r'/\*.*?\*/', '', item[1], flags=re.DOTALL)
+            item = ('raw', re.sub(r'\s+', '', css).replace(';}', '}'))
+        # 隣接するテキストを結合（空白の正規化後に比較するため）
+        if item[0] == 'text' and items and items[-1][0] == 'text':
+            items[-1] = ('text', re.sub(ASCII_WHITESPACE, ' ', items[-1][1] + item[1]))
+            continue
+        items.append(item)
+    return items
+
+
+def _sample_project() -> Project:
+    project = Project()
+    project.title = "圧縮テスト"
+    project.add_problem(Problem(
+        content=(
+            "# 二次関数\n\n"
+            "関数 $f(x) = x^2   -  2x$ について答えよ。\n\n"
+            "$$\n\\int_0^1   f(x)\\,dx\n$$\n\n"
+            "```\ndef f(x):\n    return x ** 2\n```\n\n"
+            f'<img src="{IMAGE_DATA_URI}" alt="図" width="200" />\n'
+        ),
+        score="20",
+        problem_type="required"
+    ))
+    project.add_problem(Problem(content="［ア］ と ［イ］ に当てはまる数を答えよ。", score="10"))
+    return project
+
+
+def test_minified_export_renders_identically(tmp_path):
+    """圧縮の有無で描画結果が変わらないことを確認"""
+    project = _sample_project()
+    plain_path = tmp_path / "plain.html"
+    minified_path = tmp_path / "minified.html"
+    
+    exporter = HTMLExporter()
+    plain_stats = exporter.export(project, plain_path, {'generate_answer_sheet': True})
+    minified_stats = exporter.export(
+        project, minified_path, {'generate_answer_sheet': True, 'minify_html': True}
+    )
+    
+    plain = plain_path.read_text(encoding='utf-8')
+    minified = minified_path.read_text(encoding='utf-8')
+    
+    assert _render_model(plain) == _render_model(minified)
+    assert minified_stats['original_size'] == plain_stats['output_size']
+    assert minified_stats['output_size'] < plain_stats['output_size']
+    assert minified_stats['compressed_size'] is None
+
+
+def test_protected_regions_are_untouched(tmp_path):
+    """<pre>・数式・data URI がそのまま残ることを確認"""
+    project = _sample_project()
+    output_path = tmp_path / "exam.html"
+    exporter = HTMLExporter()
+    plain = exporter._generate_html(project, {})
+    exporter.export(project, output_path, {'minify_html': True})
+    minified = output_path.read_text(encoding='utf-8')
+    
+    display_math = re.search(r'<div class="math-display">(.*?)</div>', plain, re.DOTALL).group(1)
+    assert "\n\n" in display_math
+    assert display_math in minified
+    assert "$f(x) = x^2   -  2x$" in minified
+    assert "def f(x):\n    return x ** 2" in minified
+    assert IMAGE_DATA_URI in minified
+
+
+def test_gzip_output(tmp_path):
+    """gzip版が出力され、展開するとHTMLと一致することを確認"""
+    project = _sample_project()
+    output_path = tmp_path / "exam.html"
+    stats = HTMLExporter().export(project, output_path, {'minify_html': True, 'gzip_output': True})
+    
+    gz_path = tmp_path / "exam.html.gz"
+    assert gz_path.exists()
+    assert gzip.decompress(gz_path.read_bytes()) == output_path.read_bytes()
+    assert stats['compressed_size'] == gz_path.stat().st_size
+    assert stats['compressed_size'] < stats['output_size']
+
+
+def test_inline_whitespace_is_kept():
+    """インライン要素間の空白は1文字に縮めても残すことを確認"""
+    minifier = HTMLMinifier()
+    html = "<p><span>a</span>\n      <span>b</span></p>\n    <table>\n  <tr>\n <td>x</td>\n </tr>\n</table>"
+    
+    assert minifier.minify(html) == "<p><span>a</span>\n<span>b</span></p><table><tr><td>x</td></tr></table>"
+
+
+def test_full_width_and_no_break_spaces_are_kept():
+    """全角空白・ノーブレークスペースは詰めずに残すことを確認"""
+    minifier = HTMLMinifier()
+    html = ("<p>（１）\u3000次の問に答えよ。\u3000\u3000A  B</p>\n"
+            "<table>\n<tr><td>\u3000</td><td>\u00a0\u00a0</td></tr>\n</table>")
+    
+    minified = minifier.minify(html)
+    
+    assert minified == ("<p>（１）\u3000次の問に答えよ。\u3000\u3000A B</p>"
+                        "<table><tr><td>\u3000</td><td>\u00a0\u00a0</td></tr></table>")
+    assert _render_model(minified) == _render_model(html)
+    assert _render_model("<p>A\u3000\u3000B</p>") != _render_model("<p>A B</p>")
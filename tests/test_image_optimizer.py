@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""埋め込み画像の縮小・再圧縮のテスト"""
+
+import base64
+import io
+import random
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+Image = pytest.importorskip("PIL.Image")
+
+from src.models import Project, Problem, ExportOptions
+from src.exporters import HTMLExporter
+from src.exporters.image_optimizer import ImageOptimizer, content_width_mm
+
+
+def _photo_bytes(width: int, height: int) -> bytes:
+    """写真に近い（色数の多い）PNG画像"""
+    pixels = random.Random(width * height).randbytes(width * height * 3)
+    image = Image.frombytes('RGB', (width, height), pixels)
+    output = io.BytesIO()
+    image.save(output, format='PNG')
+    return output.getvalue()
+
+
+def _img_tag(data: bytes, width: str = '') -> str:
+    width_attr = f' width="{width}"' if width else ''
+    return f'<img src="data:image/png;base64,{base64.b64encode(data).decode("ascii")}"{width_attr} alt="写真" />'
+
+
+def _decoded_images(html: str) -> list:
+    return [
+        Image.open(io.BytesIO(base64.b64decode(data)))
+        for data in re.findall(r'src="data:image/\w+;base64,([^"]+)"', html)
+    ]
+
+
+def test_content_width():
+    """用紙サイズと余白から本文領域の幅を求めることを確認"""
+    assert content_width_mm('A4', '20mm') == pytest.approx(170.0)
+    assert content_width_mm('B5', '15mm 25mm') == pytest.approx(132.0)
+    assert content_width_mm('A4', '10mm 5mm 10mm 15mm') == pytest.approx(190.0)
+
+
+def test_photo_is_resampled_to_printed_width():
+    """大きな写真が表示幅×解像度まで縮小され、JPEGで再圧縮されることを確認"""
+    optimizer = ImageOptimizer()
+    html = optimizer.optimize_html(_img_tag(_photo_bytes(1600, 1200), width='384'), 170.0, dpi=150)
+    
+    # width="384"（CSSの384px = 4インチ）を150dpiで印刷 → 600px
+    (image,) = _decoded_images(html)
+    assert image.format == 'JPEG'
+    assert image.size == (600, 450)
+    assert 'width="384"' in html
+    assert 'alt="写真"' in html
+
+
+def test_width_is_capped_by_content_area():
+    """width属性がない画像は本文領域の幅に合わせて縮小されることを確認"""
+    html = ImageOptimizer().optimize_html(_img_tag(_photo_bytes(3000, 1000)), 127.0, dpi=200)
+    
+    (image,) = _decoded_images(html)
+    assert image.width == 1000
+
+
+def test_small_images_and_transparency_are_kept():
+    """小さな画像は拡大せず、透過画像はPNGのまま保存することを確認"""
+    small = _photo_bytes(100, 80)
+    optimizer = ImageOptimizer()
+    html = optimizer.optimize_html(_img_tag(small), 170.0, dpi=150)
+    assert _decoded_images(html)[0].size == (100, 80)
+    
+    transparent = Image.new('RGBA', (2000, 1000), (255, 0, 0, 128))
+    output = io.BytesIO()
+    transparent.save(output, format='PNG')
+    html = optimizer.optimize_html(_img_tag(output.getvalue()), 170.0, dpi=150)
+    
+    (image,) = _decoded_images(html)
+    assert image.format == 'PNG'
+    assert image.mode == 'RGBA'
+    assert image.width == 1004
+
+
+def test_same_image_is_processed_once():
+    """同じ画像・同じ大きさの変換はキャッシュされることを確認"""
+    tag = _img_tag(_photo_bytes(1200, 900))
+    optimizer = ImageOptimizer()
+    optimizer.optimize_html(tag + tag, 170.0, dpi=150)
+    optimizer.optimize_html(tag, 170.0, dpi=150)
+    assert (optimizer.misses, optimizer.hits) == (1, 2)
+    
+    optimizer.optimize_html(tag, 170.0, dpi=300)
+    assert optimizer.misses == 2
+
+
+def test_export_shrinks_embedded_photos(tmp_path):
+    """エクスポート時に image_dpi を指定すると出力サイズが小さくなることを確認"""
+    project = Project()
+    project.add_problem(Problem(content="次の図を見て答えよ。\n\n" + _img_tag(_photo_bytes(1600, 1200))))
+    
+    original_path = tmp_path / "original.html"
+    optimized_path = tmp_path / "optimized.html"
+    HTMLExporter().export(project, original_path, ExportOptions())
+    HTMLExporter().export(project, optimized_path, ExportOptions(image_dpi=150, image_quality=80))
+    
+    assert optimized_path.stat().st_size < original_path.stat().st_size / 4
+    assert "次の図を見て答えよ。" in optimized_path.read_text(encoding='utf-8')
+
+
+def test_invalid_image_options():
+    """範囲外の解像度・画質は拒否されることを確認"""
+    with pytest.raises(ValueError):
+        ExportOptions(image_dpi=50)
+    with pytest.raises(ValueError):
+        ExportOptions(image_quality=100)
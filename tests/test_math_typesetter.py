@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""数式の事前組版のテスト"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pytest.importorskip("latex2mathml")
+
+from src.models import Project, Problem
+from src.exporters import HTMLExporter
+from src.exporters.math_typesetter import MathTypesetter
+
+
+def _math_project() -> Project:
+    project = Project()
+    project.add_problem(Problem(content="関数 $f(x) = x^2$ について\n\n$$\n\\int_0^1 f(x)\\,dx\n$$\n"))
+    project.add_problem(Problem(content="同じ数式 $f(x) = x^2$ を再利用\n\n```\nprice = '$5 and $6'\n```\n"))
+    return project
+
+
+def test_pretypeset_export_has_no_scripts(tmp_path):
+    """事前組版したHTMLにスクリプトとTeXソースが残らないことを確認"""
+    output_path = tmp_path / "exam.html"
+    HTMLExporter().export(_math_project(), output_path, {'pretypeset_math': True})
+    html = output_path.read_text(encoding='utf-8')
+    
+    assert "<script" not in html
+    assert '<math xmlns="http://www.w3.org/1998/Math/MathML" display="block">' in html
+    assert '<span class="math-inline"><math' in html
+    assert "$f(x) = x^2$" not in html
+    # コードブロック中の$は数式として扱わない
+    assert "$5 and $6" in html
+
+
+def test_default_export_keeps_mathjax(tmp_path):
+    """オプション未指定時は従来どおりMathJaxを読み込むことを確認"""
+    output_path = tmp_path / "exam.html"
+    HTMLExporter().export(_math_project(), output_path)
+    html = output_path.read_text(encoding='utf-8')
+    
+    assert 'id="MathJax-script"' in html
+    assert "<math" not in html
+
+
+def test_formula_cache_is_reused():
+    """同じ数式は再変換されないことを確認"""
+    typesetter = MathTypesetter()
+    first = typesetter.typeset("a^2 + b^2 = c^2_{cache}")
+    hits = MathTypesetter.cache_info().hits
+    
+    assert typesetter.typeset("a^2 + b^2 = c^2_{cache}") == first
+    assert MathTypesetter.cache_info().hits == hits + 1
+
+
+def test_invalid_formula_falls_back_to_source():
+    """変換できない数式はTeXソースを表示することを確認"""
+    result = MathTypesetter().typeset("\\frac{1}{", display=False)
+    
+    assert result == '<code class="math-source">$\\frac{1}{$</code>'
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""マーク式解答用紙（OMR）の配置と読み取りのテスト"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+np = pytest.importorskip("numpy")
+
+from src.models import Project, Problem
+from src.utils import OMRSheetGenerator
+from src.grading import OMRReader, AnswerKey, Grader
+from src.grading.grader import load_responses
+
+DPI = 100
+
+
+def _project(blank_count: int = 3) -> Project:
+    project = Project()
+    project.title = "期末試験"
+    for start in range(0, blank_count, 10):
+        content = " ".join(f"[{label}]" for label in "アイウエオカキクケコ"[:blank_count - start])
+        project.add_problem(Problem(content=f"次の [ ] に当てはまる数を答えよ。{content}"))
+    return project
+
+
+def _scan(manifest: dict, page: int, filled, shift=(0.0, 0.0)) -> 'np.ndarray':
+    """用紙を DPI で描いた画像（位置合わせマークと、塗りつぶしたマーク欄）
+    
+    shift（mm）だけ用紙がずれて読み取られた状態を再現する。
+    """
+    scale = DPI / 25.4
+    height = int(manifest['page_height_mm'] * scale)
+    width = int(manifest['page_width_mm'] * scale)
+    image = np.full((height, width), 255, dtype=np.uint8)
+    ys, xs = np.mgrid[0:height, 0:width]
+    
+    half = manifest['mark_size_mm'] / 2
+    for x, y in manifest['registration_marks']:
+        x, y = x + shift[0], y + shift[1]
+        image[int((y - half) * scale):int((y + half) * scale),
+              int((x - half) * scale):int((x + half) * scale)] = 0
+    radius = manifest['bubble_diameter_mm'] / 2 * 0.9 * scale
+    for x, y in filled:
+        cx, cy = (x + shift[0]) * scale, (y + shift[1]) * scale
+        image[(xs - cx) ** 2 + (ys - cy) ** 2 <= radius ** 2] = 30
+    return image
+
+
+def test_layout_is_deterministic_and_on_grid():
+    """配置が問題の空欄だけから決まり、マーク欄が用紙内の固定間隔に並ぶことを確認"""
+    generator = OMRSheetGenerator()
+    manifest = generator.layout(_project(25).problems, 'A4', '期末試験')
+    
+    assert manifest == generator.layout(_project(25).problems, 'A4', '期末試験')
+    assert [blank['item_id'] for blank in manifest['blanks']][:3] == ['1-ア', '1-イ', '1-ウ']
+    assert len(manifest['blanks']) == 25
+    for blank in manifest['blanks']:
+        assert np.allclose(np.diff(blank['x']), generator.BUBBLE_PITCH_MM)
+        assert 0 < blank['x'][0] and blank['x'][-1] < manifest['page_width_mm']
+        assert blank['y'] < manifest['page_height_mm'] - generator.MARK_INSET_MM - generator.MARK_SIZE_MM
+    
+    html = generator.generate_html(manifest)
+    first = manifest['blanks'][0]
+    left = first['x'][0] - manifest['bubble_diameter_mm'] / 2
+    top = first['y'] - manifest['bubble_diameter_mm'] / 2
+    assert f'left: {left:.2f}mm; top: {top:.2f}mm;' in html
+    assert '@page { size: 210.0mm 297.0mm; margin: 0; }' in html
+
+
+def test_many_blanks_span_pages():
+    """空欄が多い場合は列・ページを送ることを確認"""
+    manifest = OMRSheetGenerator().layout(_project(200).problems)
+    
+    assert manifest['pages'] > 1
+    positions = {(blank['page'], blank['x'][0], blank['y']) for blank in manifest['blanks']}
+    assert len(positions) == 200
+
+
+def test_read_shifted_scan():
+    """ずれて読み取られた画像でも、位置合わせマークで補正して読み取れることを確認"""
+    manifest = OMRSheetGenerator().layout(_project(12).problems)
+    choices = manifest['choices']
+    answers = {}
+    filled = []
+    for i, blank in enumerate(manifest['blanks']):
+        if i == 3:
+            continue  # 無記入
+        marks = [i % len(choices)] if i != 5 else [1, 2]  # 6つ目は二重マーク
+        answers[blank['item_id']] = choices[marks[0]] if len(marks) == 1 else '*'
+        filled += [(blank['x'][m], blank['y']) for m in marks]
+    for digit, value in zip(manifest['student_number'], [0, 4, 2, 7]):
+        filled.append((digit['x'], digit['y'][value]))
+    
+    reader = OMRReader(manifest)
+    images = [_scan(manifest, page, [p for p in filled], shift=(3.0, -2.0))
+              for page in range(manifest['pages'])]
+    sheet = reader.read_sheet(images)
+    
+    assert sheet.number == '0427'
+    assert sheet.answers == {
+        blank['item_id']: answers.get(blank['item_id'], '') for blank in manifest['blanks']
+    }
+
+
+def test_reader_output_feeds_grader(tmp_path):
+    """読み取り結果のCSVをそのまま採点できることを確認"""
+    project = _project(3)
+    manifest = OMRSheetGenerator().layout(project.problems)
+    reader = OMRReader(manifest)
+    marked = [(manifest['blanks'][0]['x'][2], manifest['blanks'][0]['y']),   # '1'
+              (manifest['blanks'][1]['x'][0], manifest['blanks'][1]['y'])]   # '-'
+    sheet = reader.read_sheet([_scan(manifest, 0, marked)])
+    
+    path = tmp_path / "answers.csv"
+    reader.write_responses([sheet], path)
+    key = AnswerKey.from_project(project, {'1-ア': ('1', 5.0), '1-イ': ('-', 5.0), '1-ウ': ('3', 5.0)})
+    students, responses = load_responses(path, key.item_ids)
+    
+    assert Grader(key).grade(responses, students).totals.tolist() == [10.0]
+
+
+def test_manifest_round_trip(tmp_path):
+    """マニフェストをJSONに書き出して読み取りに使えることを確認"""
+    generator = OMRSheetGenerator(choices="ABCD", number_digits=0)
+    manifest = generator.layout(_project(2).problems, 'B5')
+    path = tmp_path / "exam_omr.json"
+    generator.write_manifest(manifest, path)
+    
+    reader = OMRReader.load(path)
+    blank = manifest['blanks'][1]
+    sheet = reader.read_sheet([_scan(manifest, 0, [(blank['x'][3], blank['y'])])])
+    
+    assert json.loads(path.read_text(encoding='utf-8'))['page_size'] == 'B5'
+    assert sheet.number == ''
+    assert sheet.answers == {'1-ア': '', '1-イ': 'D'}
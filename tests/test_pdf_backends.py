@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""PDF出力ライブラリの遅延検出のテスト"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.exporters import pdf_backends
+
+ROOT = Path(__file__).parent.parent
+
+
+def test_import_does_not_load_pdf_libraries():
+    """エクスポーターの読み込みでPDFライブラリが読み込まれず、警告も出ないことを確認"""
+    code = (
+        "import sys\n"
+        "import src.exporters\n"
+        "print(','.join(name for name in ('weasyprint', 'xhtml2pdf', 'pypdf') if name in sys.modules))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-W", "error::ImportWarning", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    
+    assert result.stdout.strip() == ""
+    assert "Warning" not in result.stderr
+
+
+def test_probe_runs_only_once(monkeypatch):
+    """ライブラリの検出は初回だけ行い、結果を保持することを確認"""
+    imported = []
+    
+    def recording_import(name):
+        imported.append(name)
+        if name == "missing_pdf_library":
+            raise ImportError(f"No module named '{name}'")
+    
+    monkeypatch.setattr(pdf_backends, "BACKEND_MODULES",
+                        {'present': ('json',), 'missing': ('missing_pdf_library',)})
+    monkeypatch.setattr(pdf_backends, "_results", {})
+    monkeypatch.setattr(pdf_backends, "_errors", {})
+    monkeypatch.setattr(pdf_backends.importlib, "import_module", recording_import)
+    
+    assert not pdf_backends.is_probed('present')
+    for _ in range(3):
+        assert pdf_backends.is_available('present')
+        assert not pdf_backends.is_available('missing')
+    
+    assert imported == ['json', 'missing_pdf_library']
+    assert pdf_backends.unavailable_reason('present') is None
+    assert pdf_backends.unavailable_reason('missing').startswith("ImportError")
+
+
+def test_background_probe(monkeypatch):
+    """バックグラウンドの検出が済むと、問い合わせ時に読み込みが発生しないことを確認"""
+    monkeypatch.setattr(pdf_backends, "BACKEND_MODULES", {'present': ('json',)})
+    monkeypatch.setattr(pdf_backends, "_results", {})
+    monkeypatch.setattr(pdf_backends, "_errors", {})
+    
+    pdf_backends.start_background_probe().join(timeout=30)
+    
+    assert pdf_backends.is_probed('present')
+    monkeypatch.setattr(pdf_backends.importlib, "import_module", lambda name: 1 / 0)
+    assert pdf_backends.is_available('present')
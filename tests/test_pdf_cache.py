@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""レンダリング済みPDFページのキャッシュのテスト"""
+
+import io
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.models import Project, Problem, ExportOptions
+from src.exporters import pdf_backends, pdf_cache, pdf_sections
+from src.exporters.pdf_cache import PDFSectionCache
+from src.exporters.pdf_exporter import PDFExporter
+
+pypdf = pytest.importorskip("pypdf")
+
+
+def _blank_pdf() -> bytes:
+    writer = pypdf.PdfWriter()
+    writer.add_blank_page(595, 842)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def rendered(monkeypatch):
+    """セクションのレンダリングを記録する（WeasyPrintの代わりに白紙1ページを返す）"""
+    calls = []
+    
+    def fake_render_section(html_content, css_key, css_text, session=None):
+        calls.append(html_content)
+        return _blank_pdf()
+    
+    monkeypatch.setitem(pdf_backends._results, "weasyprint", True)
+    monkeypatch.setattr(pdf_sections, "_render_section", fake_render_section)
+    return calls
+
+
+def _make_project() -> Project:
+    project = Project()
+    for i in range(8):
+        project.add_problem(Problem(content=f"問題{i + 1}: $x^{i}$ を微分せよ。", score="10"))
+    return project
+
+
+def test_only_edited_page_is_rendered_again(tmp_path, rendered):
+    """1問だけ修正した再出力では、そのページだけをレンダリングすることを確認"""
+    exporter = PDFExporter(session=object(), cache=PDFSectionCache(tmp_path / "cache"))
+    options = ExportOptions(format='pdf', pdf_cache=True)
+    project = _make_project()
+    
+    exporter.export(project, tmp_path / "first.pdf", options)
+    assert len(rendered) == 9  # 表紙 + 8ページ
+    
+    rendered.clear()
+    project.problems[6].content = "問題7: $x^6$ を積分せよ。"
+    exporter.export(project, tmp_path / "second.pdf", options)
+    
+    assert len(rendered) == 1
+    assert "を積分せよ" in rendered[0]
+    assert exporter.section_renderer.last_stats == {'sections': 9, 'cached': 8}
+    assert len(pypdf.PdfReader(tmp_path / "second.pdf").pages) == 9
+
+
+def test_template_change_invalidates_all_pages(tmp_path, rendered):
+    """テンプレート層のオプションを変えると全ページをレンダリングし直すことを確認"""
+    exporter = PDFExporter(session=object(), cache=PDFSectionCache(tmp_path / "cache"))
+    project = _make_project()
+    
+    exporter.export(project, tmp_path / "a.pdf", ExportOptions(format='pdf', pdf_cache=True))
+    rendered.clear()
+    exporter.export(project, tmp_path / "b.pdf",
+                    ExportOptions(format='pdf', pdf_cache=True, font_size=14))
+    
+    assert len(rendered) == 9
+
+
+def test_stylesheet_or_renderer_change_invalidates_pages(tmp_path, rendered, monkeypatch):
+    """オプションが同じでも、CSSの定義やWeasyPrintの版が変われば全ページをレンダリングし直すことを確認"""
+    exporter = PDFExporter(session=object(), cache=PDFSectionCache(tmp_path / "cache"))
+    options = ExportOptions(format='pdf', pdf_cache=True)
+    project = _make_project()
+    exporter.export(project, tmp_path / "a.pdf", options)
+    
+    # アプリの更新でCSSの定義が変わった
+    html_exporter = exporter._get_html_exporter()
+    document_styles = html_exporter._document_styles
+    monkeypatch.setattr(html_exporter, "_document_styles",
+                        lambda *args: document_styles(*args) + "\n.problem { margin: 0; }")
+    rendered.clear()
+    exporter.export(project, tmp_path / "b.pdf", options)
+    assert len(rendered) == 9
+    
+    # WeasyPrintを更新した
+    monkeypatch.setattr(pdf_cache, "weasyprint_version", lambda: "999.0")
+    rendered.clear()
+    exporter.export(project, tmp_path / "c.pdf", options)
+    assert len(rendered) == 9
+
+
+def test_cache_keeps_most_recently_used_entries(tmp_path):
+    """上限を超えると最近使っていないエントリから削除されることを確認"""
+    cache = PDFSectionCache(tmp_path, max_entries=2)
+    for i, key in enumerate(['a', 'b', 'c']):
+        cache.put(key, b"%PDF " + key.encode())
+        os.utime(tmp_path / f"{key}.pdf", (1000 + i, 1000 + i))
+    
+    assert cache.get('a') == b"%PDF a"  # 参照で更新日時が新しくなる
+    cache.prune()
+    
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None
+    assert not list(tmp_path.glob('*.tmp'))
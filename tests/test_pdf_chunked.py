@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""分割レンダリング（メモリ使用量の上限）のテスト"""
+
+import io
+import sys
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.models import Project, Problem, ExportOptions
+from src.exporters import pdf_backends, pdf_sections
+from src.exporters.pdf_exporter import PDFExporter
+
+pypdf = pytest.importorskip("pypdf")
+
+# レイアウト中に1ページあたり確保するメモリ（WeasyPrintのレイアウトの代わり）
+LAYOUT_BYTES_PER_PAGE = 2 * 1024 * 1024
+
+
+def _blank_pdf(pages: int) -> bytes:
+    writer = pypdf.PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(595, 842)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def rendered(monkeypatch):
+    """ページ数に比例したメモリを確保してからPDFを返すレンダリングに置き換える"""
+    page_counts = []
+    
+    def fake_render_section(html_content, css_key, css_text, session=None):
+        pages = max(1, html_content.count('<div class="problem-page">'))
+        layout = bytearray(pages * LAYOUT_BYTES_PER_PAGE)
+        page_counts.append(pages)
+        data = _blank_pdf(pages)
+        del layout
+        return data
+    
+    monkeypatch.setitem(pdf_backends._results, "weasyprint", True)
+    monkeypatch.setattr(pdf_sections, "_render_section", fake_render_section)
+    return page_counts
+
+
+def _make_project(problems: int) -> Project:
+    project = Project()
+    for i in range(problems):
+        project.add_problem(Problem(content=f"問題{i + 1}: $x^{i}$ を微分せよ。", score="10"))
+    return project
+
+
+def test_peak_memory_is_bounded_by_largest_chunk(tmp_path, rendered):
+    """ピークメモリが最大のひとまとまり分に収まることを確認"""
+    exporter = PDFExporter(session=object())
+    output_path = tmp_path / "book.pdf"
+    options = ExportOptions(format='pdf', show_cover=False, pdf_chunk_pages=3)
+    project = _make_project(30)
+    
+    tracemalloc.start()
+    try:
+        exporter.export(project, output_path, options)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    
+    assert max(rendered) == 3
+    assert sum(rendered) == 30
+    assert len(pypdf.PdfReader(output_path).pages) == 30
+    # 全30ページ分（60MB）ではなく、3ページ分（6MB）＋結合処理の分だけ
+    assert peak < 2 * 3 * LAYOUT_BYTES_PER_PAGE
+
+
+def test_spooled_sections_are_removed(tmp_path, rendered, monkeypatch):
+    """分割レンダリングの一時ファイルが出力後に削除されることを確認"""
+    spool_dirs = []
+    original_mkdtemp = pdf_sections.tempfile.mkdtemp
+    
+    def recording_mkdtemp(*args, **kwargs):
+        path = original_mkdtemp(*args, **kwargs)
+        spool_dirs.append(Path(path))
+        return path
+    
+    monkeypatch.setattr(pdf_sections.tempfile, "mkdtemp", recording_mkdtemp)
+    
+    PDFExporter(session=object()).export(
+        _make_project(5), tmp_path / "exam.pdf", ExportOptions(format='pdf', pdf_chunk_pages=2)
+    )
+    
+    assert len(spool_dirs) == 1
+    assert not spool_dirs[0].exists()
+    assert len(pypdf.PdfReader(tmp_path / "exam.pdf").pages) == 6  # 表紙 + 5ページ
+
+
+def test_negative_chunk_pages_is_rejected():
+    """負のページ数は拒否されることを確認"""
+    with pytest.raises(ValueError):
+        ExportOptions(format='pdf', pdf_chunk_pages=-1)
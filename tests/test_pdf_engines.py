@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""PDF出力エンジンの選択のテスト"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.models import Project, Problem, ExportOptions
+from src.exporters import pdf_backends, pdf_exporter
+from src.exporters.pdf_exporter import PDFExporter
+
+
+def _make_project() -> Project:
+    project = Project()
+    project.add_problem(Problem(content="$$\\int_0^1 x^2\\,dx$$ を求めよ。", score="10"))
+    return project
+
+
+def test_unknown_engine_is_rejected():
+    """不明なエンジン名はエラーにすることを確認"""
+    with pytest.raises(ValueError, match="chromium"):
+        ExportOptions(format='pdf', pdf_engine='chromium')
+
+
+def test_weasyprint_is_preferred_over_webengine(monkeypatch):
+    """自動選択ではセクション単位のレンダリングと中断に対応するWeasyPrintを優先することを確認"""
+    monkeypatch.setitem(pdf_backends._results, "weasyprint", True)
+    monkeypatch.setattr(pdf_exporter, "webengine_usable", lambda: True)
+    exporter = PDFExporter()
+    
+    assert exporter.is_available() == (True, "weasyprint")
+    assert exporter.is_available("webengine") == (True, "webengine")
+
+
+def test_webengine_is_used_without_weasyprint(monkeypatch):
+    """WeasyPrintがなく、QApplicationが起動していればQtWebEngineを選ぶことを確認"""
+    monkeypatch.setitem(pdf_backends._results, "weasyprint", False)
+    monkeypatch.setitem(pdf_backends._results, "xhtml2pdf", True)
+    monkeypatch.setattr(pdf_exporter, "webengine_usable", lambda: True)
+    exporter = PDFExporter()
+    
+    assert exporter.is_available() == (True, "webengine")
+    
+    monkeypatch.setattr(pdf_exporter, "webengine_usable", lambda: False)
+    assert exporter.is_available() == (True, "xhtml2pdf")
+    assert exporter.is_available("webengine") == (False, None)
+
+
+def test_webengine_is_not_usable_without_qt():
+    """Qtを読み込んでいないプロセス（CLI等）ではQtWebEngineを選ばないことを確認"""
+    if 'PySide6.QtWidgets' in sys.modules:
+        pytest.skip("Qtが読み込まれている")
+    assert pdf_exporter.webengine_usable() is False
+    assert 'PySide6.QtWidgets' not in sys.modules
+
+
+def test_webengine_receives_html_with_mathjax(tmp_path, monkeypatch):
+    """QtWebEngineにはCSSとMathJaxを埋め込んだHTMLを渡すことを確認"""
+    monkeypatch.setattr(pdf_exporter, "webengine_usable", lambda: True)
+    received = []
+    monkeypatch.setattr(PDFExporter, "export_with_webengine",
+                        lambda self, html, path, callback=None, options=None: received.append(html))
+    
+    PDFExporter().export(_make_project(), tmp_path / "exam.pdf",
+                         ExportOptions(format='pdf', pdf_engine='webengine'))
+    
+    assert len(received) == 1
+    assert "<style>" in received[0]
+    assert 'id="MathJax-script"' in received[0]
+
+
+def test_unavailable_engine_is_reported(tmp_path, monkeypatch):
+    """指定したエンジンが使えない場合はエンジン名を含むエラーにすることを確認"""
+    monkeypatch.setattr(pdf_exporter, "webengine_usable", lambda: False)
+    
+    with pytest.raises(ImportError, match="webengine"):
+        PDFExporter().export(_make_project(), tmp_path / "exam.pdf",
+                             ExportOptions(format='pdf', pdf_engine='webengine'))
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""セクション単位の並列PDFレンダリングのテスト"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.models import Project, Problem, ExportOptions
+from src.exporters import HTMLExporter, pdf_backends
+from src.exporters.pdf_exporter import PDFExporter
+from src.exporters.pdf_cache import PDFSectionCache
+
+
+class _RecordingSession:
+    pages = []
+    
+    def __init__(self):
+        self.rendered = []
+    
+    def stylesheet(self, key, css_factory):
+        return css_factory()
+    
+    def render(self, html_content, stylesheets=None):
+        self.rendered.append(html_content)
+        return self
+    
+    def write_pdf(self, target):
+        Path(target).write_bytes(b"%PDF-1.7 fake")
+
+
+def _make_project(problem_count: int) -> Project:
+    project = Project()
+    for i in range(problem_count):
+        project.add_problem(Problem(content=f"問題{i + 1}: $x^{i}$ を微分せよ。［ア］", score="10"))
+    return project
+
+
+def test_sections_split_at_page_breaks():
+    """表紙・問題ページのまとまり・解答用紙がそれぞれ独立したドキュメントになることを確認"""
+    exporter = HTMLExporter()
+    options = ExportOptions(generate_answer_sheet=True)
+    
+    sections = exporter.generate_sections(_make_project(5), options, pages_per_section=2)
+    
+    names = [name for name, _ in sections]
+    assert names == ['cover', 'pages-1-2', 'pages-3-4', 'pages-5', 'answer-sheet']
+    for _, html in sections:
+        assert html.startswith('<!DOCTYPE html>')
+        assert html.rstrip().endswith('</html>')
+    assert '問題1' in sections[1][1] and '問題2' in sections[1][1]
+    assert '問題3' not in sections[1][1]
+    assert 'answer-sheet-page' in sections[-1][1]
+
+
+def test_sections_do_not_end_with_page_break():
+    """単独でレイアウトしたセクションの末尾に空白ページが入らないことを確認"""
+    exporter = HTMLExporter()
+    options = ExportOptions(generate_answer_sheet=True)
+    
+    sections = exporter.generate_sections(_make_project(3), options, inline_styles=False)
+    
+    for name, html in sections:
+        body = html.split('<body>')[1].split('</body>')[0]
+        assert not body.rstrip().endswith(HTMLExporter.PAGE_BREAK), name
+    # 一括生成では表紙の後の改ページは残る
+    assert HTMLExporter.PAGE_BREAK in exporter._generate_cover(_make_project(3), options)
+
+
+def test_problem_pages_join_to_single_document_body():
+    """ページ単位の生成を連結すると一括生成と同じになることを確認"""
+    exporter = HTMLExporter()
+    options = ExportOptions(problems_per_page=2)
+    problems = _make_project(5).problems
+    
+    pages = exporter._generate_problem_pages(problems, options)
+    
+    assert len(pages) == 3
+    assert exporter._generate_problems(problems, options) == \
+        '<div class="page-break"></div>'.join(pages)
+
+
+def test_page_numbers_are_a_template_option():
+    """ページ番号はテンプレート層のCSSとして追加されることを確認"""
+    exporter = HTMLExporter()
+    plain = ExportOptions()
+    numbered = ExportOptions(page_numbers=True)
+    
+    assert plain.template_fingerprint != numbered.template_fingerprint
+    assert 'counter(page)' not in exporter._document_styles(plain, False)
+    assert 'counter(page)' in exporter._document_styles(numbered, False)
+
+
+def test_invalid_worker_count_is_rejected():
+    """プロセス数は1以上であることを確認"""
+    with pytest.raises(ValueError):
+        ExportOptions(pdf_workers=0)
+
+
+def test_falls_back_to_single_document_without_pypdf(tmp_path, monkeypatch):
+    """PDF結合ライブラリがない場合は一括レンダリングになることを確認"""
+    monkeypatch.setitem(pdf_backends._results, "weasyprint", True)
+    monkeypatch.setitem(pdf_backends._results, "pypdf", False)
+    session = _RecordingSession()
+    
+    PDFExporter(session=session).export(_make_project(3), tmp_path / "exam.pdf",
+                                        ExportOptions(format='pdf', pdf_workers=4))
+    
+    assert len(session.rendered) == 1
+    assert '問題1' in session.rendered[0] and '問題3' in session.rendered[0]
+
+
+@pytest.mark.parametrize("sectioned_options", [
+    {'pdf_workers': 2},
+    {'pdf_cache': True},  # 問題ページ1枚ごとのセクション
+])
+def test_sectioned_output_matches_single_document(tmp_path, sectioned_options):
+    """並列レンダリングの結果が一括レンダリングと同じページ数・通し番号になることを確認"""
+    pytest.importorskip("weasyprint")
+    pypdf = pytest.importorskip("pypdf")
+    
+    project = _make_project(6)
+    options = ExportOptions(format='pdf', generate_answer_sheet=True, page_numbers=True)
+    exporter = PDFExporter(cache=PDFSectionCache(tmp_path / "cache"))
+    try:
+        exporter.export(project, tmp_path / "single.pdf", options)
+        exporter.export(project, tmp_path / "sectioned.pdf", options.replace(**sectioned_options))
+    finally:
+        exporter.close()
+    
+    single = pypdf.PdfReader(tmp_path / "single.pdf")
+    sectioned = pypdf.PdfReader(tmp_path / "sectioned.pdf")
+    total = len(single.pages)
+    assert len(sectioned.pages) == total
+    assert f"{total} / {total}" in sectioned.pages[-1].extract_text()
+    assert "/ " not in sectioned.pages[0].extract_text()
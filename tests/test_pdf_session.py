@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""PDFレンダリングセッションのテスト"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.models import Project, Problem, ExportOptions
+from src.exporters import HTMLExporter, pdf_backends
+from src.exporters.pdf_exporter import PDFExporter
+
+
+class _RecordingSession:
+    """CSSの解析回数とレンダリングに渡された内容を記録するセッション"""
+    
+    pages = []
+    
+    def __init__(self):
+        self.parsed = []
+        self.rendered = []
+        self._stylesheets = {}
+    
+    def stylesheet(self, key, css_factory):
+        if key not in self._stylesheets:
+            self.parsed.append(key)
+            self._stylesheets[key] = css_factory()
+        return self._stylesheets[key]
+    
+    def render(self, html_content, stylesheets=None):
+        self.rendered.append((html_content, stylesheets))
+        return self
+    
+    def write_pdf(self, target):
+        Path(target).write_bytes(b"%PDF-1.7 fake")
+
+
+def _make_project() -> Project:
+    project = Project()
+    project.add_problem(Problem(content="$x^2$ を微分せよ。［ア］", score="10"))
+    return project
+
+
+def test_html_without_inline_styles():
+    """外部CSSを適用する場合は<style>を埋め込まないことを確認"""
+    exporter = HTMLExporter()
+    html = exporter._generate_html(_make_project(), ExportOptions(), inline_styles=False)
+    
+    assert "<style>" not in html
+    assert "<style>" in exporter._generate_html(_make_project(), ExportOptions())
+
+
+def test_stylesheets_are_parsed_once_per_template(tmp_path, monkeypatch):
+    """同じテンプレート層のオプションではCSSを再解析しないことを確認"""
+    monkeypatch.setitem(pdf_backends._results, "weasyprint", True)
+    session = _RecordingSession()
+    exporter = PDFExporter(session=session)
+    project = _make_project()
+    
+    exporter.export(project, tmp_path / "a.pdf", ExportOptions(format='pdf', exam_title="前期"))
+    exporter.export(project, tmp_path / "b.pdf", ExportOptions(format='pdf', exam_title="後期"))
+    assert len(session.parsed) == 1
+    
+    exporter.export(project, tmp_path / "c.pdf", ExportOptions(format='pdf', font_size=14))
+    assert len(session.parsed) == 2
+    
+    html_content, stylesheets = session.rendered[-1]
+    assert "<style>" not in html_content
+    assert "font-size: 14pt" in stylesheets[0]
+
+
+def test_real_session_reuses_font_config_and_css():
+    """WeasyPrintのセッションでフォント設定とCSSが使い回されることを確認"""
+    pytest.importorskip("weasyprint")
+    from src.exporters.pdf_session import PDFRenderSession
+    
+    session = PDFRenderSession()
+    stylesheet = session.stylesheet('base', lambda: "body { font-size: 12pt; }")
+    assert session.stylesheet('base', lambda: pytest.fail("再解析された")) is stylesheet
+    
+    first = session.render("<p>1</p>", [stylesheet])
+    second = session.render("<p>2</p>", [stylesheet])
+    assert len(first.pages) == len(second.pages) == 1
+    assert session.render_count == 2
+    assert session.stylesheet_count == 1
+
+
+def test_form_options_are_applied_to_stylesheets(tmp_path, monkeypatch):
+    """型ごとに上書きした文字サイズが、その型のPDFのCSSに反映されることを確認"""
+    monkeypatch.setitem(pdf_backends._results, "weasyprint", True)
+    session = _RecordingSession()
+    exporter = PDFExporter(session=session)
+    project = _make_project()
+    project.add_problem(Problem(content="2問目 ［イ］", score="10"))
+    
+    paths = exporter.export_forms(project, tmp_path / "exam.pdf",
+                                  [[0, 1], {'problems': [1, 0], 'options': {'font_size': 17}}],
+                                  ExportOptions(format='pdf', font_size=11))
+    
+    assert [path.name for path in paths] == ["exam_A.pdf", "exam_B.pdf"]
+    (_, form_a), (_, form_b) = session.rendered
+    assert "font-size: 11pt" in form_a[0]
+    assert "font-size: 17pt" in form_b[0]
+    assert "font-size: 17pt" not in form_a[0]
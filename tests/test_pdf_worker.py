@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""PDF出力のバックグラウンド実行のテスト"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.models import Project, Problem, Student
+from src.exporters import pdf_backends
+from src.exporters.pdf_exporter import PDFExporter
+from src.exporters.pdf_worker import PDFExportProcess
+
+
+class _FakeDocument:
+    pages = [object(), object(), object()]
+    
+    def write_pdf(self, target):
+        Path(target).write_bytes(b"%PDF-1.7 fake")
+
+
+class _FakeSession:
+    def stylesheet(self, key, css_factory):
+        return css_factory()
+    
+    def render(self, html_content, stylesheets=None):
+        return _FakeDocument()
+
+
+def _make_project() -> Project:
+    project = Project()
+    project.add_problem(Problem(content="$x^2$ を微分せよ。", score="10"))
+    return project
+
+
+def _wait_for_exit(process: PDFExportProcess, timeout: float = 10):
+    deadline = time.monotonic() + timeout
+    while not process.reap_cancelled():
+        assert time.monotonic() < deadline, "PDF出力プロセスが終了しませんでした"
+        time.sleep(0.05)
+
+
+def _wait_for_result(process: PDFExportProcess, timeout: float = 60) -> list:
+    messages = []
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        messages.extend(process.poll())
+        if messages and messages[-1][0] in ('done', 'error'):
+            return messages
+        time.sleep(0.05)
+    raise AssertionError("PDF出力プロセスが終了しませんでした")
+
+
+def test_progress_stages_are_reported_in_order(tmp_path, monkeypatch):
+    """レイアウト・ページ数確定・書き出しの順に進捗が通知されることを確認"""
+    monkeypatch.setitem(pdf_backends._results, "weasyprint", True)
+    
+    events = []
+    output_path = tmp_path / "exam.pdf"
+    PDFExporter(session=_FakeSession()).export(_make_project(), output_path,
+                         progress_callback=lambda stage, detail: events.append((stage, detail)))
+    
+    assert events == [('html', None), ('layout', None), ('pages', 3), ('write', None)]
+    assert [stage for stage, _ in events] == [name for name, _ in PDFExporter.STAGES]
+    assert output_path.read_bytes().startswith(b"%PDF")
+
+
+def test_worker_reports_error_without_losing_process(tmp_path):
+    """ワーカー側の失敗がエラーメッセージとして届き、一時ファイルが残らないことを確認"""
+    output_path = tmp_path / "exam.pdf"
+    process = PDFExportProcess(_make_project(), output_path)
+    # 存在しないディレクトリへの出力は環境によらず失敗する
+    process.output_path = str(tmp_path / "missing" / "exam.pdf")
+    process.start()
+    
+    messages = _wait_for_result(process)
+    
+    kind, message, _ = messages[-1]
+    assert kind == 'error'
+    assert message
+    assert not process.is_running()
+    assert not Path(PDFExportProcess.temp_path_for(process.output_path)).exists()
+
+
+def test_cancel_stops_process_and_removes_partial_file(tmp_path):
+    """キャンセルでプロセスが停止し、書き出し途中のファイルが削除されることを確認"""
+    output_path = tmp_path / "exam.pdf"
+    process = PDFExportProcess(_make_project(), output_path)
+    process.start()
+    # 書き出し途中の状態を再現
+    Path(PDFExportProcess.temp_path_for(str(output_path))).write_bytes(b"%PDF-partial")
+    
+    started = time.monotonic()
+    process.cancel()
+    
+    assert time.monotonic() - started < 0.5  # 終了を待たずに戻る
+    assert not process.is_running()
+    _wait_for_exit(process)
+    assert not Path(PDFExportProcess.temp_path_for(str(output_path))).exists()
+    assert not output_path.exists()
+
+
+def test_cancel_removes_student_files_written_by_this_export(tmp_path):
+    """生徒ごとの出力をキャンセルすると今回書き出したファイルだけが削除されることを確認"""
+    students = [Student('1', '山田'), Student('2', '佐藤')]
+    process = PDFExportProcess(_make_project(), tmp_path, students=students, per_student=True)
+    first, second = process.output_paths()
+    first.write_bytes(b"%PDF-previous")
+    process.start()
+    # 1人目は前回の出力のまま、2人目は今回書き出した状態を再現
+    second.write_bytes(b"%PDF-new")
+    
+    process.cancel()
+    _wait_for_exit(process)
+    
+    assert first.read_bytes() == b"%PDF-previous"
+    assert not second.exists()
@@ -0,0 +1,367 @@
+# -*- coding: utf-8 -*-
+"""プロジェクトファイル（.mep 第2版）のテスト"""
+
+import base64
+import json
+import sys
+import threading
+import zipfile
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.synthetic import make_png
+from src.models import Project, Problem
+from src.models import project as project_module
+from src.models import project_file
+from src.models.project_file import FORMAT_VERSION, MANIFEST_NAME
+
+
+def _data_uri(seed: int) -> str:
+    """埋め込み画像の data URI"""
+    return "data:image/png;base64," + base64.b64encode(make_png(16, 16, seed=seed)).decode("ascii")
+
+
+def _project() -> Project:
+    """同じ画像を2つの問題で使うプロジェクト"""
+    project = Project()
+    project.title = "画像の多い試験"
+    project.cover_content = {"school": "第一高校"}
+    project.add_problem(Problem("第1問", f"図1 ![図]({_data_uri(1)})\n\n[ア]", "20", "optional"))
+    project.add_problem(Problem("第2問", f'<img src="{_data_uri(1)}" alt="同じ図" /> と <img src="{_data_uri(2)}" />'))
+    project.add_problem(Problem("第3問", "画像なし $x^2$"))
+    return project
+
+
+def test_save_writes_zip_with_binary_images(tmp_path):
+    """zip形式で保存し、画像は重複なくバイナリで格納することを確認"""
+    path = tmp_path / "exam.mep"
+    _project().save(path)
+    
+    with zipfile.ZipFile(path) as archive:
+        manifest = json.loads(archive.read(MANIFEST_NAME))
+        names = archive.namelist()
+        images = [name for name in names if name.startswith("images/")]
+        
+        assert manifest["version"] == FORMAT_VERSION
+        assert len(manifest["problems"]) == 3
+        assert len(images) == 2
+        assert all(archive.read(name).startswith(b"\x89PNG") for name in images)
+        assert all(archive.getinfo(name).compress_type == zipfile.ZIP_STORED for name in images)
+        assert "base64" not in archive.read("problems/0002.md").decode("utf-8")
+
+
+def test_round_trip(tmp_path):
+    """保存して読み込むと、問題文（埋め込み画像を含む）と属性が元に戻ることを確認"""
+    path = tmp_path / "exam.mep"
+    original = _project()
+    original.save(path)
+    
+    loaded = Project.load(path)
+    
+    assert loaded.to_dict() == original.to_dict()
+    assert loaded.file_path == path
+
+
+def test_legacy_json_is_migrated(tmp_path):
+    """第1版（JSON）のファイルを読み込め、次の保存で第2版になることを確認"""
+    path = tmp_path / "old.mep"
+    original = _project()
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(original.to_dict(), f, ensure_ascii=False, indent=2)
+    
+    project = Project.load(path)
+    assert [p.content for p in project.problems] == [p.content for p in original.problems]
+    
+    project.save(path)
+    assert zipfile.is_zipfile(path)
+    assert Project.load(path).to_dict() == project.to_dict()
+
+
+@pytest.mark.parametrize("encoding", ["utf-8-sig", "utf-8", "cp932", "shift_jis"])
+def test_legacy_json_is_read_once(tmp_path, monkeypatch, encoding):
+    """第1版のファイルは文字コードによらず、1回だけ読み込み・1回だけ解析することを確認"""
+    original = Project()
+    original.title = "第1回定期考査（旧形式）"
+    for i in range(50):
+        original.add_problem(Problem(f"問題{i + 1}", f"関数 $f(x)$ の値を求めよ。答えは［ア］である。" * 20))
+    path = tmp_path / "old.mep"
+    path.write_bytes(json.dumps(original.to_dict(), ensure_ascii=False, indent=2).encode(encoding))
+    
+    opened = []
+    parsed = []
+    original_loads = project_file.serializer.loads
+    monkeypatch.setattr(project_file, "open",
+                        lambda *args, **kwargs: opened.append(args) or open(*args, **kwargs), raising=False)
+    monkeypatch.setattr(project_file.serializer, "loads",
+                        lambda *args, **kwargs: parsed.append(1) or original_loads(*args, **kwargs))
+    
+    project = Project.load(path)
+    
+    assert project.title == original.title
+    assert [p.content for p in project.problems] == [p.content for p in original.problems]
+    assert len(opened) == 1
+    assert len(parsed) == 1
+
+
+def test_broken_legacy_file_is_rejected(tmp_path):
+    """JSONとして読めないファイルは ValueError にすることを確認"""
+    path = tmp_path / "broken.mep"
+    path.write_bytes("{壊れた".encode("cp932"))
+    
+    with pytest.raises(ValueError):
+        Project.load(path)
+
+
+def test_non_canonical_base64_stays_inline(tmp_path):
+    """元に戻せない base64（改行入り等）は埋め込みのまま残すことを確認"""
+    encoded = base64.b64encode(make_png(8, 8)).decode("ascii")
+    content = f"![a](data:image/png;base64,{encoded[:20]}\n{encoded[20:]}) ![b](data:image/png;base64,QUJD=)"
+    project = Project()
+    project.add_problem(Problem(content=content))
+    path = tmp_path / "exam.mep"
+    
+    project.save(path)
+    
+    assert Project.load(path).problems[0].content == content
+
+
+def test_newer_version_is_rejected(tmp_path):
+    """新しい版のファイルは読み込まずに ValueError にすることを確認"""
+    path = tmp_path / "future.mep"
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr(MANIFEST_NAME, json.dumps({"format": "mep", "version": FORMAT_VERSION + 1}))
+    
+    with pytest.raises(ValueError):
+        Project.load(path)
+
+
+def test_problems_are_loaded_on_first_access(tmp_path, monkeypatch):
+    """開いた時には問題文を読まず、参照した問題だけを読み込むことを確認"""
+    path = tmp_path / "bank.mep"
+    original = Project()
+    for i in range(500):
+        original.add_problem(Problem(f"問題{i + 1}", f"第{i + 1}問 [ア] と [イ]", "10"))
+    original.save(path)
+    
+    read = []
+    original_read_entry = project_file.ProjectArchive.read_entry
+    monkeypatch.setattr(project_file.ProjectArchive, "read_entry",
+                        lambda self, name: read.append(name) or original_read_entry(self, name))
+    
+    project = Project.load(path)
+    
+    assert len(project.problems) == 500
+    assert project.problems[499].score == "10"
+    assert read == []
+    assert not any(problem.content_loaded for problem in project.problems)
+    
+    assert project.problems[41].content == "第42問 [ア] と [イ]"
+    assert read == ["problems/0042.md"]
+    assert [p.content_loaded for p in project.problems].count(True) == 1
+
+
+def test_unmodified_content_is_evicted(tmp_path, monkeypatch):
+    """LRUの容量を超えたら、編集していない問題文だけをメモリから捨てることを確認"""
+    monkeypatch.setattr(project_file, "DEFAULT_CACHE_SIZE", 2)
+    path = tmp_path / "exam.mep"
+    original = _project()
+    original.add_problem(Problem("第4問", "[エ]"))
+    original.save(path)
+    
+    project = Project.load(path)
+    first, second, third, fourth = project.problems
+    first.content = first.content + "（改）"
+    assert second.blank_index.labels() == []
+    third.content
+    fourth.content
+    
+    # 第2問は捨てられ、編集した第1問は残る
+    assert first.content_loaded and not second.content_loaded
+    assert second.content == original.problems[1].content
+    assert second.blank_index.labels() == []
+    assert first.content.endswith("（改）")
+    
+    # 保存すると、編集した問題も保存先から読み直せるようになる
+    project.save(path)
+    for problem in project.problems:
+        problem.content
+    assert sum(p.content_loaded for p in project.problems) == 2
+    assert Project.load(path).problems[0].content.endswith("（改）")
+
+
+def test_changed_file_is_detected(tmp_path):
+    """開いた後にファイルが書き換えられたら、古い位置を読まずに ValueError にすることを確認"""
+    path = tmp_path / "exam.mep"
+    _project().save(path)
+    project = Project.load(path)
+    
+    other = Project()
+    other.add_problem(Problem(content="別の試験 " * 100))
+    other.save(tmp_path / "other.mep")
+    path.write_bytes((tmp_path / "other.mep").read_bytes())
+    
+    with pytest.raises(ValueError):
+        project.problems[0].content
+
+
+def test_save_replaces_file_and_keeps_backup(tmp_path):
+    """保存先を置き換え、前の版を .bak に残し、一時ファイルを残さないことを確認"""
+    path = tmp_path / "exam.mep"
+    legacy = _project()
+    path.write_text(json.dumps(legacy.to_dict(), ensure_ascii=False), encoding="utf-8")
+    
+    project = Project.load(path)
+    project.problems[0].content = "[ア] 改訂版"
+    project.save(path)
+    
+    backup = project_file.backup_path(path)
+    assert backup.name == "exam.mep.bak"
+    assert json.loads(backup.read_text(encoding="utf-8")) == legacy.to_dict()
+    assert Project.load(path).problems[0].content == "[ア] 改訂版"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["exam.mep", "exam.mep.bak"]
+
+
+def test_failed_save_keeps_original(tmp_path, monkeypatch):
+    """書き出しの途中で失敗しても、元のファイルと読み込み前の問題文が残ることを確認"""
+    path = tmp_path / "exam.mep"
+    original = _project()
+    original.save(path)
+    original_bytes = path.read_bytes()
+    project = Project.load(path)
+    
+    def broken_write(data, f):
+        f.write(b"PK\x03\x04 half written")
+        raise OSError("ディスクがいっぱいです")
+    monkeypatch.setattr(project_file, "_write_zip", broken_write)
+    
+    with pytest.raises(OSError):
+        project.save(path)
+    
+    assert path.read_bytes() == original_bytes
+    assert not project_file.backup_path(path).exists()
+    assert not path.with_name("exam.mep.part").exists()
+    assert [p.content for p in project.problems] == [p.content for p in original.problems]
+
+
+def test_failed_final_replace_keeps_original_and_saved_data(tmp_path, monkeypatch):
+    """保存先の置き換えに失敗しても、保存先（前の版）と保存した内容の両方が残ることを確認"""
+    path = tmp_path / "exam.mep"
+    original = _project()
+    original.save(path)
+    original_bytes = path.read_bytes()
+    
+    replace = project_file.os.replace
+    def broken_replace(src, dst):
+        if Path(dst) == path:
+            raise PermissionError(13, "別のプロセスが使用中です")
+        replace(src, dst)
+    monkeypatch.setattr(project_file.os, "replace", broken_replace)
+    
+    project = Project.load(path)
+    project.problems[0].content = "[ア] 改訂版"
+    with pytest.raises(OSError, match="exam.mep.part"):
+        project.save(path)
+    
+    monkeypatch.setattr(project_file.os, "replace", replace)
+    assert path.read_bytes() == original_bytes
+    assert project_file.backup_path(path).read_bytes() == original_bytes
+    assert Project.load(path.with_name("exam.mep.part")).problems[0].content == "[ア] 改訂版"
+
+
+def test_backup_is_copied_without_hard_links(tmp_path, monkeypatch):
+    """ハードリンクを作れない場合は前の版を複製し、読み込み前の問題文を .bak から読めることを確認"""
+    path = tmp_path / "exam.mep"
+    original = _project()
+    original.save(path)
+    original_bytes = path.read_bytes()
+    project = Project.load(path)
+    
+    def no_link(src, dst):
+        raise OSError("ハードリンクに対応していません")
+    monkeypatch.setattr(project_file.os, "link", no_link)
+    
+    other = Project()
+    other.add_problem(Problem(content="別の試験"))
+    project_file.write_archive(other.to_dict(), path)
+    
+    assert project_file.backup_path(path).read_bytes() == original_bytes
+    assert project.problems[1].content == original.problems[1].content
+
+
+def test_unloaded_problems_are_read_from_backup_until_reattached(tmp_path):
+    """保存で前の版を .bak に残した後も、読み込み前の問題文を開いた時のファイルから読めることを確認"""
+    path = tmp_path / "exam.mep"
+    original = _project()
+    original.save(path)
+    project = Project.load(path)
+    
+    # 書き出しが終わり、読み込み元の切り替え（finish）の前
+    other = Project()
+    other.add_problem(Problem(content="別の試験"))
+    project_file.write_archive(other.to_dict(), path)
+    
+    assert project.problems[1].content == original.problems[1].content
+
+
+def test_background_save_uses_snapshot(tmp_path, monkeypatch):
+    """バックグラウンドの保存は開始時点の内容を書き出し、保存中の編集は失わないことを確認"""
+    path = tmp_path / "exam.mep"
+    project = _project()
+    release = threading.Event()
+    write_archive = project_module.write_archive
+    monkeypatch.setattr(project_module, "write_archive",
+                        lambda data, file_path: release.wait(5) and write_archive(data, file_path))
+    monkeypatch.setattr(project_file, "DEFAULT_CACHE_SIZE", 1)
+    
+    task = project.save_in_background(path)
+    project.problems[0].content = "保存中の編集 [イ]"
+    assert not task.is_done()
+    release.set()
+    task.finish()
+    
+    assert task.is_done()
+    assert Project.load(path).problems[0].content.startswith("図1")
+    # 編集した問題は保存先と切り離されたまま（LRUで捨てられない）
+    for problem in project.problems[1:]:
+        problem.content
+    assert project.problems[0].content == "保存中の編集 [イ]"
+    assert project.problems[1].content == _project().problems[1].content
+
+
+def test_save_copies_unloaded_problems_without_reading_them(tmp_path, monkeypatch):
+    """保存の開始時に未読み込みの問題文を読まず、書き出しのスレッドで元のファイルから写すことを確認"""
+    path = tmp_path / "exam.mep"
+    original = _project()
+    original.save(path)
+    project = Project.load(path)
+    project.problems[2].content = "画像なし $x^3$"
+    
+    reads = []
+    read_content = project_file.ProjectArchive.read_content
+    monkeypatch.setattr(project_file.ProjectArchive, "read_content",
+                        lambda self, entry: reads.append(entry) or read_content(self, entry))
+    release = threading.Event()
+    write_archive = project_module.write_archive
+    monkeypatch.setattr(project_module, "write_archive",
+                        lambda data, file_path: release.wait(5) and write_archive(data, file_path))
+    
+    task = project.save_in_background(path)
+    # 保存中の編集は保存しないが、失わない
+    project.problems[1].content = "保存中の編集"
+    release.set()
+    task.finish()
+    
+    assert reads == []
+    assert not project.problems[0].content_loaded
+    saved = Project.load(path)
+    assert [p.content for p in saved.problems] == [original.problems[0].content,
+                                                 original.problems[1].content,
+                                                 "画像なし $x^3$"]
+    assert saved.problems[0].title == "第1問" and saved.problems[0].problem_type == "optional"
+    with zipfile.ZipFile(path) as archive:
+        assert len([name for name in archive.namelist() if name.startswith("images/")]) == 2
+    assert project.problems[1].content == "保存中の編集"
+    assert project.problems[0].content == original.problems[0].content
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""JSONの読み書き（serializer）のテスト"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.synthetic import make_project
+from src.models import Project, serializer
+
+
+@pytest.fixture(params=serializer.available_backends())
+def backend(request):
+    """利用可能なライブラリを順に使う"""
+    serializer.set_backend(request.param)
+    yield request.param
+    serializer.set_backend()
+
+
+def test_round_trip(backend):
+    """変換して解析すると元の値に戻ることを確認"""
+    data = make_project(3, formulas=2, images=1, image_size=(8, 8)).to_dict()
+    data["values"] = [1.5, 1e-7, None, True, {}, [], "①\\\"\n"]
+    
+    encoded = serializer.dumps(data)
+    
+    assert isinstance(encoded, bytes)
+    assert serializer.loads(encoded) == data
+    assert serializer.loads(encoded.decode("utf-8")) == data
+    assert serializer.loads(serializer.dumps(data, indent=None)) == data
+
+
+def test_output_matches_stdlib(backend):
+    """プロジェクトの辞書は標準の json と同じバイト列になることを確認"""
+    data = make_project(3, formulas=2).to_dict()
+    
+    assert serializer.dumps(data) == json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def test_unsupported_values_fall_back_to_stdlib(backend):
+    """文字列以外のキーは標準の json で変換することを確認"""
+    assert serializer.loads(serializer.dumps({1: "a"})) == {"1": "a"}
+
+
+def test_invalid_json_raises_value_error(backend):
+    """解析できないJSONは ValueError になることを確認"""
+    with pytest.raises(ValueError):
+        serializer.loads(b"{\"title\": ")
+
+
+def test_project_round_trip_with_each_backend(backend, tmp_path):
+    """どのライブラリでも保存・読み込みできることを確認"""
+    project = make_project(2, formulas=2, images=1, image_size=(8, 8))
+    path = tmp_path / "exam.mep"
+    
+    project.save(path)
+    
+    assert Project.load(path).to_dict() == project.to_dict()
+
+
+def test_unknown_backend_is_rejected():
+    """利用できないライブラリを指定すると ValueError になることを確認"""
+    with pytest.raises(ValueError):
+        serializer.set_backend("simplejson")